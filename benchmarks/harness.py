@@ -0,0 +1,254 @@
+# benchmarks/harness.py
+# Benchmark Suite - load, statistics, smoothing and chart timings over synthetic price files
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is not reported
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 100 points is the cap the JS writers keep; larger files stand in for merged or archived history
+SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+MAX_SIZE = 10_000_000
+GENERATE_CHUNK = 100_000
+TIMESTAMP_SAMPLE = 10_000
+START_TIME = datetime(2025, 11, 17, 13, 35, 25)
+
+def _js_number(value):
+    """Format a float the way JSON.stringify does (integral values without a fraction)"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _js_timestamp(moment):
+    """Date.toLocaleString() in the en-US locale, e.g. '11/17/2025, 1:35:25 PM'"""
+    hour = moment.hour % 12 or 12
+    suffix = 'AM' if moment.hour < 12 else 'PM'
+    return f"{moment.month}/{moment.day}/{moment.year}, {hour}:{moment.minute:02d}:{moment.second:02d} {suffix}"
+
+ENTRY = '''    {
+      "price": %s,
+      "timestamp": "%s",
+      "volume24h": %s,
+      "totalTransactions": %d,
+      "marketConditions": {
+        "concentrationRisk": "%.1f",
+        "velocityRisk": "%.1f",
+        "largeTransferRisk": "%.1f"
+      },
+      "priceChangeFromLastTx": "%.2f"
+    }'''
+
+def generate_price_file(path, points, seed=0):
+    """Write ``points`` price records to ``path`` in the layout of JSON.stringify(data, null, 2).
+
+    Prices wander around the $100 peg, several records can share a second,
+    and volume and transaction counts only grow, as in the central bank's file.
+    """
+    rng = np.random.default_rng(seed)
+    epoch = START_TIME.timestamp()
+    last_second = 0
+    volume, transactions, price = 1_030_033.0, 21, 100.0
+    deviation = 0.0
+    with open(path, 'w') as f:
+        f.write('{\n  "priceHistory": [\n')
+        for start in range(0, points, GENERATE_CHUNK):
+            count = min(GENERATE_CHUNK, points - start)
+            deviation_steps = deviation + np.cumsum(rng.normal(0, 0.05, count))
+            deviation = deviation_steps[-1]
+            prices = np.round(100 + 10 * np.tanh(deviation_steps / 10), 2)
+            seconds = last_second + np.cumsum(rng.integers(0, 3, count))
+            last_second = seconds[-1]
+            trades = rng.random(count) < 0.05
+            volumes = volume + np.cumsum(np.where(trades, rng.integers(100, 30_000, count), 0))
+            counts = transactions + np.cumsum(trades)
+            volume, transactions = volumes[-1], counts[-1]
+            risks = rng.uniform(0, 100, (count, 3))
+            changes = (prices / prices.mean() - 1) * 100
+
+            stamps = {}
+            entries = []
+            for i in range(count):
+                second = int(seconds[i])
+                if second not in stamps:
+                    stamps[second] = _js_timestamp(datetime.fromtimestamp(epoch + second))
+                entries.append(ENTRY % (_js_number(prices[i]), stamps[second], _js_number(volumes[i]),
+                                        counts[i], risks[i, 0], risks[i, 1], risks[i, 2], changes[i]))
+            if start:
+                f.write(',\n')
+            f.write(',\n'.join(entries))
+            price = prices[-1]
+        f.write('\n  ],\n  "operationHistory": [],\n')
+        f.write(f'  "lastPrice": {_js_number(price)},\n  "lastTransactionPrice": {_js_number(price)},\n')
+        f.write(f'  "timestamp": "{datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]}Z",\n')
+        f.write('  "system": "PHX Central Bank"\n}')
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux, bytes on macOS), or None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class _Recorder:
+    def __init__(self, size):
+        self.size = size
+        self.results = []
+
+    def time(self, stage, func, calls=1):
+        started = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - started
+        peak = _peak_rss_mb()
+        self.results.append({'size': self.size, 'stage': stage, 'seconds': seconds,
+                             'per_call_us': seconds / calls * 1e6 if calls > 1 else None,
+                             'peak_rss_mb': None if peak is None else round(peak, 1)})
+        return value
+
+def run_child(path, size, figures):
+    """Measure every stage for one file in this (fresh) process and print the results as JSON"""
+    record = _Recorder(size)
+    import matplotlib
+    matplotlib.use('Agg')
+    terminal = record.time('import', lambda: __import__('phx_price_terminal'))
+    import matplotlib.pyplot as plt
+
+    # Loading: cold parse, sidecar write, no-op refresh and a cold start from the sidecar
+    shutil.rmtree(path + terminal.CACHE_SUFFIX, ignore_errors=True)
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    record.time('load_data', lambda: analyzer.load_data(verbose=False, persist=False))
+    record.time('write_sidecar', analyzer._write_sidecar)
+    record.time('load_data_refresh', lambda: analyzer.load_data(verbose=False, persist=False))
+    cached = terminal.ProfessionalPHXAnalyzer(path)
+    record.time('load_data_sidecar', lambda: cached.load_data(verbose=False, persist=False))
+
+    # Timestamp parsing on distinct strings, one call at a time and as one batch
+    sample = min(size, TIMESTAMP_SAMPLE)
+    stamps = [_js_timestamp(datetime.fromtimestamp(START_TIME.timestamp() + i)) for i in range(sample)]
+    parser = terminal.ProfessionalPHXAnalyzer(path)
+    record.time('parse_timestamp', lambda: [parser.parse_timestamp(s) for s in stamps], calls=sample)
+    parser = terminal.ProfessionalPHXAnalyzer(path)
+    record.time('parse_timestamps', lambda: parser.parse_timestamps(stamps), calls=sample)
+
+    record.time('get_statistics', analyzer.get_statistics)
+    record.time('get_statistics_warm', analyzer.get_statistics)
+
+    # Smoothing the whole series, after importing scipy so it is not counted. A short warm-up
+    # call is not enough: repeated seconds can leave too few distinct x for smooth_data to fit
+    import scipy.interpolate
+    import scipy.signal
+    x, y = analyzer._date_numbers(), analyzer.price_history
+    for method in terminal.SMOOTHING_METHODS:
+        record.time(f'smooth_data[{method}]', lambda: analyzer.smooth_data(x, y, method=method))
+
+    # Chart builders, then a full Agg draw of the figure they built
+    for name in figures:
+        fig = record.time(f'build[{name}]', lambda: analyzer.build_figure(name))
+        record.time(f'draw[{name}]', lambda: fig.savefig(io.BytesIO(), format='png',
+                                                         dpi=terminal.REPORT_DPI))
+        plt.close(fig)
+    print(json.dumps(record.results))
+
+def _metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def compare(results, baseline, tolerance):
+    """Stages at least ``tolerance`` (a fraction) slower than in ``baseline``, ignoring sub-ms timings"""
+    before = {(row['size'], row['stage']): row['seconds'] for row in baseline['results']}
+    regressions = []
+    for row in results:
+        old = before.get((row['size'], row['stage']))
+        if old is not None and row['seconds'] > 0.001 and row['seconds'] > old * (1 + tolerance):
+            regressions.append({'size': row['size'], 'stage': row['stage'],
+                                'baseline_s': old, 'seconds': row['seconds'],
+                                'slowdown': row['seconds'] / old if old else None})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark phx_price_terminal on synthetic price files")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES),
+                        help=f"price points per file (default {' '.join(map(str, SIZES))}; up to {MAX_SIZE})")
+    parser.add_argument('--figures', nargs='*', help="chart builders to time (default: all report figures)")
+    parser.add_argument('--workdir', default=os.path.join(ROOT, 'benchmarks', 'data'),
+                        help="where generated files are kept and reused")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the JSON results here instead of stdout")
+    parser.add_argument('--compare', metavar='BASELINE', help="JSON results of an earlier run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="slowdown fraction that counts as a regression (default 0.25)")
+    parser.add_argument('--child', nargs=2, metavar=('FILE', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.figures is None:
+        import phx_price_terminal
+        args.figures = list(phx_price_terminal.REPORT_FIGURES)
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.figures)
+        return 0
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    for size in args.sizes:
+        if not 0 < size <= MAX_SIZE:
+            parser.error(f"sizes must be between 1 and {MAX_SIZE}")
+        path = os.path.join(args.workdir, f'phx_price_{size}_{args.seed}.json')
+        if not os.path.exists(path):
+            print(f"GENERATING {size} POINTS -> {path}", file=sys.stderr)
+            generate_price_file(path + '.tmp', size, args.seed)
+            os.replace(path + '.tmp', path)
+
+        # A fresh interpreter per size keeps peak RSS and import effects separate
+        print(f"BENCHMARKING {size} POINTS", file=sys.stderr)
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', path, str(size),
+                                '--figures', *args.figures],
+                               capture_output=True, text=True)
+        if child.returncode != 0:
+            print(child.stderr, file=sys.stderr)
+            return 1
+        results.extend(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    report = {'meta': _metadata(), 'results': results}
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report['regressions'] = compare(results, json.load(f), args.tolerance)
+        for row in report['regressions']:
+            print(f"REGRESSION: {row['stage']} AT {row['size']} POINTS "
+                  f"{row['baseline_s'] * 1000:.1f} ms -> {row['seconds'] * 1000:.1f} ms", file=sys.stderr)
+        exit_code = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
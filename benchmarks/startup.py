@@ -0,0 +1,111 @@
+# benchmarks/startup.py
+# Startup Benchmark - time from launch to the first market summary
+
+import argparse
+import json
+import os
+import statistics
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the text summary must not pull in; importing any of them is a regression.
+# pandas is allowed only on a cold parse, where it converts the timestamps.
+HEAVY_MODULES = ('matplotlib', 'scipy', 'pandas')
+COLD_PARSE_MODULES = ('pandas',)
+
+# Child process: import the terminal, load the file and print the summary, then report timings
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import phx_price_terminal as terminal
+imported = time.perf_counter()
+analyzer = terminal.ProfessionalPHXAnalyzer({data_file!r})
+with open('/dev/null' if sys.platform != 'win32' else 'nul', 'w') as sink:
+    stdout, sys.stdout = sys.stdout, sink
+    try:
+        analyzer.load_data(verbose=False, persist={persist!r})
+        analyzer.print_market_summary()
+    finally:
+        sys.stdout = stdout
+summarized = time.perf_counter()
+print(json.dumps({{
+    'import_s': imported - started,
+    'first_summary_s': summarized - started,
+    'heavy_modules': sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+'''
+
+def parse_importtime(stderr, top=10):
+    """Largest cumulative import costs from `-X importtime` output, as (module, seconds)"""
+    costs = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # The script's imports and their direct imports; deeper ones are included in their parent
+        if name.startswith('    '):
+            continue
+        costs[name.strip()] = int(cumulative) / 1e6
+    return sorted(costs.items(), key=lambda item: -item[1])[:top]
+
+def run_once(data_file, cold=False):
+    """One launch in a fresh interpreter; ``cold`` parses a copy of the file with no binary sidecar"""
+    workdir = None
+    if cold:
+        workdir = tempfile.mkdtemp(prefix='phx_startup_')
+        data_file = shutil.copy(data_file, workdir)
+    try:
+        probe = PROBE.format(root=ROOT, data_file=data_file, persist=not cold, heavy=HEAVY_MODULES)
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe],
+                                capture_output=True, text=True, check=True)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['imports'] = parse_importtime(result.stderr)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-first-summary of phx_price_terminal")
+    parser.add_argument('data_file', nargs='?', default=os.path.join(ROOT, 'phx_price.json'))
+    parser.add_argument('--runs', type=int, default=5, help="runs to take the median over (default 5)")
+    parser.add_argument('--cold', action='store_true', help="parse the JSON without the binary sidecar each run")
+    parser.add_argument('--budget', type=float, help="fail when the median time-to-first-summary exceeds this many seconds")
+    parser.add_argument('--json', action='store_true', help="print one machine-readable JSON object")
+    args = parser.parse_args()
+
+    runs = [run_once(args.data_file, cold=args.cold) for _ in range(args.runs)]
+    allowed = COLD_PARSE_MODULES if args.cold else ()
+    heavy = sorted({module for run in runs for module in run['heavy_modules'] if module not in allowed})
+    result = {
+        'data_file': args.data_file,
+        'runs': args.runs,
+        'import_s': statistics.median(run['import_s'] for run in runs),
+        'cold': args.cold,
+        'first_summary_s': statistics.median(run['first_summary_s'] for run in runs),
+        'heavy_modules': heavy,
+        'slowest_imports': runs[-1]['imports'],
+    }
+    failed = bool(heavy) or (args.budget is not None and result['first_summary_s'] > args.budget)
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"TIME TO FIRST SUMMARY (median of {args.runs}): {result['first_summary_s'] * 1000:.1f} ms")
+        print(f"  MODULE IMPORT:  {result['import_s'] * 1000:.1f} ms")
+        print("  SLOWEST TOP-LEVEL IMPORTS:")
+        for name, seconds in result['slowest_imports']:
+            print(f"    {name:<24} {seconds * 1000:8.1f} ms")
+        if heavy:
+            print(f"REGRESSION: SUMMARY PATH IMPORTED {', '.join(heavy)}")
+        if args.budget is not None and result['first_summary_s'] > args.budget:
+            print(f"REGRESSION: OVER BUDGET OF {args.budget * 1000:.0f} ms")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
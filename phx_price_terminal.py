@@ -1,24 +1,1895 @@
 # phx_price_terminal.py
 # Professional Trading Terminal - PHX Price Analysis (Enhanced)
 
+import argparse
+import csv
+import functools
+import importlib
 import json
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from datetime import datetime
+from collections import OrderedDict, deque
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timedelta
 import numpy as np
 import os
-import pandas as pd
-from matplotlib.gridspec import GridSpec
-import matplotlib.ticker as ticker
-from scipy.interpolate import make_interp_spline
-from matplotlib.widgets import RectangleSelector
+import sys
+import threading
+import time
+import ctypes
+import ctypes.util
+import struct
+
+try:
+    import fcntl
+except ImportError:  # Windows: archive appends are only serialized within one process
+    fcntl = None
+
+class _LazyModule:
+    """Module proxy that imports on first attribute access.
+    
+    Keeps matplotlib and pandas out of the text-only and scripting paths.
+    """
+    
+    def __init__(self, name):
+        self._name = name
+    
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+pd = _LazyModule('pandas')
+plt = _LazyModule('matplotlib.pyplot')
+mdates = _LazyModule('matplotlib.dates')
+ticker = _LazyModule('matplotlib.ticker')
+gridspec = _LazyModule('matplotlib.gridspec')
+mcolors = _LazyModule('matplotlib.colors')
+asyncio = _LazyModule('asyncio')
+
+# Files at least this large are parsed incrementally rather than with json.load
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Binary sidecar of the parsed columns, kept next to the JSON file
+CACHE_SUFFIX = '.cache'
+CACHE_VERSION = 3
+
+# History archive: rows the JS writers shift out of priceHistory, in hourly segments compacted per day
+ARCHIVE_SUFFIX = '.archive'
+ARCHIVE_VERSION = 1
+ARCHIVE_RETENTION_DAYS = 365
+HOUR_NS = 3600 * 10**9
+DAY_NS = 24 * HOUR_NS
+
+# Reads of a file being rewritten in place are retried this many times, backing off from READ_BACKOFF seconds
+READ_RETRIES = 4
+READ_BACKOFF = 0.02
+TAIL_CHECK_BYTES = 64
+
+# Snapshots written next to the data file that can stand in when it is unreadable
+FALLBACK_FILES = ('phx_bank_data.json.fallback', 'phx_wallet_data.json.fallback')
+
+# Live mode polls the watcher this often and widens the view with this much headroom
+LIVE_INTERVAL_MS = 50
+LIVE_HEADROOM = 0.1
+
+# Zoom and pan apply at most once per frame; fitted y-limits get this margin
+FRAME_INTERVAL_MS = 16
+Y_FIT_MARGIN = 0.05
+
+# Formats produced by Date.toLocaleString() in the JS writers
+TIMESTAMP_FORMATS = ('%m/%d/%Y, %I:%M:%S %p', '%m/%d/%Y, %H:%M:%S')
+NAT_NS = np.iinfo(np.int64).min
+# Distinct timestamp strings memoized before the memo is cleared, so long-running modes stay bounded
+TIMESTAMP_CACHE_SIZE = 100_000
+
+# Opt-in stage timers, enabled by --instrument or this environment variable
+INSTRUMENT_ENV = 'PHX_INSTRUMENT'
+PROFILE_TOP = 25
+
+class StageTimings:
+    """Call counts, total and worst latency per named stage, plus plain counters.
+    
+    Stages nest (``load_data`` includes ``parse_timestamps``), so totals are
+    inclusive. When disabled, instrumented calls cost one attribute check.
+    """
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+    
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+    
+    def record(self, name, seconds):
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = [1, seconds, seconds]
+        else:
+            stage[0] += 1
+            stage[1] += seconds
+            stage[2] = max(stage[2], seconds)
+    
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def stage(self, name):
+        """Context manager timing the enclosed block as ``name``"""
+        return _StageTimer(self, name)
+    
+    def print_breakdown(self):
+        """Print stages by total time, then counters"""
+        if not self.stages and not self.counters:
+            print("NO STAGES RECORDED YET")
+            return
+        print(f"{'STAGE':<32} {'CALLS':>7} {'TOTAL MS':>10} {'MEAN MS':>9} {'MAX MS':>9}")
+        print("-" * 80)
+        for name, (calls, total, worst) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+            print(f"{name:<32} {calls:7d} {total * 1000:10.1f} {total / calls * 1000:9.2f} {worst * 1000:9.2f}")
+        for name, value in sorted(self.counters.items()):
+            print(f"{name:<32} {value:7d}")
+        print("-" * 80)
+
+class _StageTimer:
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+    
+    def __enter__(self):
+        self.started = time.perf_counter() if self.timings.enabled else None
+        return self
+    
+    def __exit__(self, *exc):
+        if self.started is not None:
+            self.timings.record(self.name, time.perf_counter() - self.started)
+
+INSTRUMENTATION = StageTimings(enabled=os.environ.get(INSTRUMENT_ENV, '') not in ('', '0'))
+
+def instrumented(name):
+    """Decorator recording each call of the wrapped function as stage ``name`` when instrumentation is on"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not INSTRUMENTATION.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                INSTRUMENTATION.record(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+_JSON_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+
+class _JSONStream:
+    """Chunked reader over a JSON text that decodes one value at a time"""
+    
+    def __init__(self, f, chunk_size=STREAM_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+    
+    def _fill(self, size=None):
+        """Drop consumed text and read the next chunk, returning False at EOF"""
+        if self.eof:
+            return False
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+    
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("UNEXPECTED END OF JSON DATA")
+    
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"EXPECTED '{char}' AT OFFSET {self.pos}")
+        self.pos += 1
+    
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self.buf, self.pos)
+                # A number may be cut short by the buffer edge, e.g. '104' of '104.5' or
+                # '104.' (decoded as 104), so it counts only once a non-number character follows
+                truncated = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                             and (end == len(self.buf) or self.buf[end] in _NUMBER_CHARS))
+                if not truncated or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically so large values are not re-decoded many times
+            self._fill(max(self.chunk_size, len(self.buf) - self.pos))
+
+def iter_price_history(path, metadata=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield priceHistory records from a price file without loading the whole document.
+    
+    Other top-level keys are decoded into ``metadata`` when a dict is given.
+    """
+    with open(path, 'r') as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if key == 'priceHistory' and stream.peek() == '[':
+                stream.expect('[')
+                if stream.peek() != ']':
+                    while True:
+                        yield stream.value()
+                        if stream.peek() == ',':
+                            stream.expect(',')
+                        else:
+                            break
+                stream.expect(']')
+            else:
+                value = stream.value()
+                if metadata is not None:
+                    metadata[key] = value
+            if stream.peek() == ',':
+                stream.expect(',')
+            else:
+                break
+        stream.expect('}')
+
+def _to_float(value):
+    """Convert a numeric or numeric-string field, returning NaN when absent or invalid"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _to_epoch_ns(value):
+    """Convert a datetime, datetime64 or ISO string to epoch nanoseconds"""
+    return int(np.datetime64(value, 'ns').view(np.int64))
+
+def merge_price_columns(parts):
+    """Merge columnar price histories from several sources into one time-ordered series.
+    
+    Identical (timestamp, price, totalTransactions) records are dropped with
+    a hash-based pass, then a stable sort on the timestamp orders the rest.
+    Each source is already time-ordered, so the sort (timsort) reduces to a
+    k-way merge of those runs. Returns (columns, duplicates dropped).
+    """
+    parts = [part for part in parts if len(part['price'])]
+    if not parts:
+        return {name: np.empty(0, dtype) for name, dtype in PriceSeriesStore.COLUMNS.items()}, 0
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in PriceSeriesStore.COLUMNS}
+    keys = pd.DataFrame({'timestamp_ns': columns['timestamp_ns'], 'price': columns['price'],
+                         'total_transactions': columns['total_transactions']})
+    keep = np.flatnonzero(~keys.duplicated().to_numpy())
+    order = keep[np.argsort(columns['timestamp_ns'][keep], kind='stable')]
+    return {name: column[order] for name, column in columns.items()}, len(columns['price']) - len(keep)
+
+class PriceSeriesStore:
+    """Columnar price history held in contiguous NumPy arrays.
+    
+    Columns grow geometrically so appends are amortized O(1), and the
+    accessors return views of the filled region rather than copies.
+    """
+    
+    COLUMNS = {
+        'price': np.float64,
+        'timestamp_ns': np.int64,
+        'volume24h': np.float64,
+        'total_transactions': np.int64,
+        'concentration_risk': np.float64,
+        'velocity_risk': np.float64,
+        'large_transfer_risk': np.float64,
+    }
+    TIME_COLUMN = 'timestamp_ns'
+    
+    def __init__(self, capacity=256):
+        self._size = 0
+        self._shared = False
+        self._columns = {name: np.empty(capacity, dtype=dtype)
+                         for name, dtype in self.COLUMNS.items()}
+    
+    def attach(self, columns):
+        """Use existing (e.g. memory-mapped, read-only) arrays as the column storage.
+        
+        The arrays are copied into private buffers on the first write.
+        """
+        self._columns = {name: columns[name] for name in self.COLUMNS}
+        self._size = len(next(iter(self._columns.values())))
+        self._shared = True
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def capacity(self):
+        return len(next(iter(self._columns.values())))
+    
+    @property
+    def nbytes(self):
+        """Bytes used by the filled region of all columns"""
+        return sum(column[:self._size].nbytes for column in self._columns.values())
+    
+    def clear(self):
+        self._size = 0
+        if self._shared:
+            self.__init__()
+    
+    def _reserve(self, required):
+        """Ensure room for ``required`` rows, doubling capacity as needed"""
+        if required <= self.capacity and not self._shared:
+            return
+        capacity = max(self.capacity, 1)
+        while capacity < required:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        self._shared = False
+    
+    def extend(self, columns):
+        """Append equal-length arrays keyed by column name; missing columns are zero-filled"""
+        count = len(next(iter(columns.values())))
+        self._reserve(self._size + count)
+        end = self._size + count
+        for name, column in self._columns.items():
+            if name in columns:
+                column[self._size:end] = columns[name]
+            else:
+                column[self._size:end] = 0
+        self._size = end
+    
+    def extend_entries(self, entries, timestamps_ns):
+        """Append priceHistory records, with timestamps already converted to epoch ns"""
+        count = len(entries)
+        conditions = [entry.get('marketConditions') or {} for entry in entries]
+        self.extend({
+            'price': np.fromiter((entry['price'] for entry in entries), np.float64, count),
+            'timestamp_ns': timestamps_ns,
+            'volume24h': np.fromiter((_to_float(entry.get('volume24h')) for entry in entries),
+                                     np.float64, count),
+            'total_transactions': np.fromiter((entry.get('totalTransactions') or 0 for entry in entries),
+                                              np.int64, count),
+            'concentration_risk': np.fromiter((_to_float(c.get('concentrationRisk')) for c in conditions),
+                                              np.float64, count),
+            'velocity_risk': np.fromiter((_to_float(c.get('velocityRisk')) for c in conditions),
+                                         np.float64, count),
+            'large_transfer_risk': np.fromiter((_to_float(c.get('largeTransferRisk')) for c in conditions),
+                                               np.float64, count),
+        })
+    
+    def column(self, name):
+        """Zero-copy view of the filled region of a column"""
+        return self._columns[name][:self._size]
+    
+    def columns(self, start=0, stop=None):
+        """Zero-copy views of every column over rows [start, stop)"""
+        return {name: column[start:self._size if stop is None else stop]
+                for name, column in self._columns.items()}
+    
+    def range_slice(self, start=None, end=None):
+        """Rows whose timestamp lies in [start, end], found by binary search.
+        
+        Timestamps must be sorted, as the JS oracles append them and merge_price_columns emits them.
+        """
+        timestamps = self.column(self.TIME_COLUMN)
+        lo = 0 if start is None else np.searchsorted(timestamps, _to_epoch_ns(start), side='left')
+        hi = len(timestamps) if end is None else np.searchsorted(timestamps, _to_epoch_ns(end), side='right')
+        return slice(int(lo), int(hi))
+    
+    @property
+    def prices(self):
+        return self.column('price')
+    
+    @property
+    def timestamps(self):
+        """Timestamps as a datetime64[ns] view, usable directly by matplotlib and pandas"""
+        return self.column(self.TIME_COLUMN).view('datetime64[ns]')
+
+class PriceArchive:
+    """Append-only price history in time-partitioned binary segments.
+    
+    Rows are fixed-size records (one field per store column) appended to a
+    segment per hour. A background pass compacts the hours of finished days
+    into one segment per day and deletes days past the retention window.
+    Segment names carry their time span, so range reads only map the
+    segments that overlap the window.
+    """
+    
+    RECORD = np.dtype(list(PriceSeriesStore.COLUMNS.items()))
+    SPANS = {'hour': HOUR_NS, 'day': DAY_NS}
+    
+    def __init__(self, directory, retention_days=ARCHIVE_RETENTION_DAYS):
+        self.directory = directory
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._compactor = None
+    
+    def __getstate__(self):
+        """Pickle without the lock and compaction thread, e.g. for spawned report workers"""
+        state = self.__dict__.copy()
+        del state['_lock'], state['_compactor']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._compactor = None
+    
+    @contextmanager
+    def _locked(self):
+        """Serialize writers across threads and, where flock exists, across processes"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, 'lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _check_version(self, create=False):
+        """Whether the directory holds segments this version can read, writing the marker if ``create``"""
+        meta_path = os.path.join(self.directory, 'meta.json')
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f).get('version') == ARCHIVE_VERSION
+        except (OSError, ValueError):
+            if not create:
+                return False
+        os.makedirs(self.directory, exist_ok=True)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'version': ARCHIVE_VERSION, 'fields': list(self.RECORD.names)}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        return True
+    
+    def _segment_path(self, kind, start_ns):
+        unit = 'h' if kind == 'hour' else 'D'
+        label = np.datetime_as_string(np.datetime64(int(start_ns), 'ns'), unit=unit)
+        return os.path.join(self.directory, f"{kind}-{label}.seg")
+    
+    def segments(self):
+        """(start_ns, end_ns, path) of every segment in time order; hours already compacted are skipped"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        found = []
+        for name in names:
+            if not name.endswith('.seg'):
+                continue
+            kind, _, label = name[:-len('.seg')].partition('-')
+            if kind not in self.SPANS:
+                continue
+            try:
+                start_ns = int(np.datetime64(label, 'ns').view(np.int64))
+            except ValueError:
+                continue
+            found.append((start_ns, start_ns + self.SPANS[kind], os.path.join(self.directory, name)))
+        days = {start_ns for start_ns, end_ns, _ in found if end_ns - start_ns == DAY_NS}
+        return sorted(segment for segment in found
+                      if segment[1] - segment[0] == DAY_NS or segment[0] // DAY_NS * DAY_NS not in days)
+    
+    def _read_segment(self, path):
+        """Records of a segment, memory-mapped; a torn trailing record is ignored"""
+        try:
+            rows = os.path.getsize(path) // self.RECORD.itemsize
+        except OSError:
+            rows = 0
+        if rows == 0:
+            return np.empty(0, self.RECORD)
+        return np.memmap(path, self.RECORD, 'r', shape=(rows,))
+    
+    def __len__(self):
+        return sum(os.path.getsize(path) // self.RECORD.itemsize for _, _, path in self.segments())
+    
+    def _tail(self):
+        """Records sharing the newest archived timestamp"""
+        segments = self.segments()
+        if not segments:
+            return np.empty(0, self.RECORD)
+        records = self._read_segment(segments[-1][2])
+        if len(records) == 0:
+            return records
+        timestamps = records['timestamp_ns']
+        return np.array(records[np.searchsorted(timestamps, timestamps[-1], side='left'):])
+    
+    def _unseen(self, columns):
+        """Rows of ``columns`` newer than the archive, as records in time order.
+        
+        Rows at the newest archived timestamp count as seen when an archived row
+        there has the same (price, totalTransactions), as in merge_price_columns.
+        """
+        timestamps = np.asarray(columns['timestamp_ns'])
+        tail = self._tail()
+        if len(tail):
+            last_ns = tail['timestamp_ns'][-1]
+            candidates = np.flatnonzero(timestamps >= last_ns)
+        else:
+            candidates = np.arange(len(timestamps))
+        if len(candidates) == 0:
+            return np.empty(0, self.RECORD)
+        candidates = candidates[np.argsort(timestamps[candidates], kind='stable')]
+        records = np.empty(len(candidates), self.RECORD)
+        for name in self.RECORD.names:
+            records[name] = columns[name][candidates] if name in columns else 0
+        
+        if len(tail):
+            seen = {}
+            for key in zip(tail['price'].tolist(), tail['total_transactions'].tolist()):
+                seen[key] = seen.get(key, 0) + 1
+            keep = np.ones(len(records), dtype=bool)
+            for i in np.flatnonzero(records['timestamp_ns'] == last_ns):
+                key = (float(records['price'][i]), int(records['total_transactions'][i]))
+                if seen.get(key):
+                    seen[key] -= 1
+                    keep[i] = False
+            records = records[keep]
+        return records
+    
+    def append(self, columns):
+        """Archive the rows of ``columns`` (store column arrays) not archived yet; returns how many.
+        
+        Rows older than the newest archived one are skipped, keeping every segment sorted.
+        """
+        if len(columns['price']) == 0:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        with self._locked():
+            if not self._check_version(create=not self.segments()):
+                raise ValueError(f"ARCHIVE '{self.directory}' HAS AN UNSUPPORTED FORMAT")
+            records = self._unseen(columns)
+            hours = records['timestamp_ns'] // HOUR_NS
+            for chunk in np.split(records, np.flatnonzero(np.diff(hours)) + 1):
+                if len(chunk) == 0:
+                    continue
+                path = self._segment_path('hour', chunk['timestamp_ns'][0] // HOUR_NS * HOUR_NS)
+                with open(path, 'ab') as f:
+                    # Drop a record torn by a crash mid-append before adding to it
+                    f.seek(0, os.SEEK_END)
+                    f.truncate(f.tell() - f.tell() % self.RECORD.itemsize)
+                    f.write(chunk.tobytes())
+        if len(records):
+            self.compact_in_background()
+        return len(records)
+    
+    def compact_in_background(self):
+        """Start a compaction thread unless one is still running"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name='phx-archive-compaction', daemon=True)
+        self._compactor.start()
+    
+    def compact(self):
+        """Merge the hourly segments of finished days and delete days past retention.
+        
+        A daily segment is written whole and renamed into place before its hours
+        are removed, so readers always see each row exactly once.
+        Returns (days compacted, segments deleted).
+        """
+        compacted = deleted = 0
+        if not self._check_version():
+            return compacted, deleted
+        with self._locked():
+            segments = self.segments()
+            if not segments:
+                return compacted, deleted
+            latest_day = segments[-1][0] // DAY_NS * DAY_NS
+            
+            hours_by_day = {}
+            for start_ns, end_ns, path in segments:
+                if end_ns - start_ns == HOUR_NS and start_ns < latest_day:
+                    hours_by_day.setdefault(start_ns // DAY_NS * DAY_NS, []).append(path)
+            for day, paths in hours_by_day.items():
+                daily_path = self._segment_path('day', day)
+                records = np.concatenate([self._read_segment(path) for path in paths])
+                with open(daily_path + '.tmp', 'wb') as f:
+                    f.write(records.tobytes())
+                os.replace(daily_path + '.tmp', daily_path)
+                compacted += 1
+            
+            # Compacted hours, hours a daily segment already covers, expired days and partial writes
+            cutoff = latest_day - self.retention_days * DAY_NS if self.retention_days else None
+            starts = {path: start_ns for start_ns, _, path in segments}
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                start_ns = starts.get(path)
+                covered = name.startswith('hour-') and name.endswith('.seg') and \
+                    (start_ns is None or start_ns < latest_day)
+                expired = cutoff is not None and start_ns is not None and start_ns < cutoff
+                if covered or expired or name.endswith('.seg.tmp'):
+                    # Segments still mapped may be locked on Windows; retry next time
+                    try:
+                        os.remove(path)
+                        deleted += 1
+                    except OSError:
+                        pass
+        return compacted, deleted
+    
+    def chunks(self, start_ns=None, stop_ns=None):
+        """Yield the records in [start_ns, stop_ns) one overlapping segment at a time"""
+        for segment_start, segment_end, path in self.segments():
+            if (stop_ns is not None and segment_start >= stop_ns) or \
+               (start_ns is not None and segment_end <= start_ns):
+                continue
+            records = self._read_segment(path)
+            timestamps = records['timestamp_ns']
+            lo = 0 if start_ns is None else np.searchsorted(timestamps, start_ns, side='left')
+            hi = len(records) if stop_ns is None else np.searchsorted(timestamps, stop_ns, side='left')
+            if hi > lo:
+                yield records[lo:hi]
+    
+    def query(self, start=None, end=None):
+        """Store columns of the archived rows with timestamps in [start, end] (datetimes or ISO strings)"""
+        start_ns = None if start is None else _to_epoch_ns(start)
+        stop_ns = None if end is None else _to_epoch_ns(end) + 1
+        records = list(self.chunks(start_ns, stop_ns))
+        records = np.concatenate(records) if records else np.empty(0, self.RECORD)
+        return {name: np.ascontiguousarray(records[name]) for name in self.RECORD.names}
+
+def _bar_vertices(left, right, bottom, top):
+    """(n, 4, 2) rectangle vertices for one PolyCollection, instead of n Rectangle patches"""
+    left, right, bottom, top = np.broadcast_arrays(left, right, bottom, top)
+    return np.stack([np.column_stack([left, bottom]), np.column_stack([left, top]),
+                     np.column_stack([right, top]), np.column_stack([right, bottom])], axis=1)
+
+def _add_bars(ax, left, right, bottom, top, colors, **kwargs):
+    """Draw bars as a single PolyCollection with per-bar RGBA colors and autoscale to them.
+    
+    The baseline is made sticky, as ``ax.bar`` does, so autoscaling adds no margin below it.
+    """
+    from matplotlib.collections import PolyCollection
+    
+    bars = PolyCollection(_bar_vertices(left, right, bottom, top), facecolors=colors,
+                          edgecolors='none', **kwargs)
+    if np.ndim(bottom) == 0:
+        bars.sticky_edges.y.append(bottom)
+    ax.add_collection(bars)
+    ax.autoscale_view()
+    return bars
+
+def _rgba(color, alpha):
+    """(n, 4) RGBA array of one color with per-element alpha"""
+    alpha = np.asarray(alpha, dtype=np.float64)
+    rgba = np.empty((len(alpha), 4))
+    rgba[:, :3] = mcolors.to_rgb(color)
+    rgba[:, 3] = alpha
+    return rgba
+
+def _collapse_duplicates(x, y):
+    """Average y over runs of equal x so interpolators see strictly increasing abscissae"""
+    if len(x) < 2 or np.all(np.diff(x) > 0):
+        return x, y
+    if np.any(np.diff(x) < 0):
+        order = np.argsort(x, kind='stable')
+        x, y = x[order], y[order]
+    starts = np.flatnonzero(np.r_[True, np.diff(x) != 0])
+    counts = np.diff(np.r_[starts, len(x)])
+    return x[starts], np.add.reduceat(y, starts) / counts
+
+def _bucket_means(x, y, buckets):
+    """Reduce a series to at most ``buckets`` points by averaging equal-count runs"""
+    if len(x) <= buckets:
+        return x, y
+    starts = np.linspace(0, len(x), buckets, endpoint=False).astype(np.int64)
+    counts = np.diff(np.r_[starts, len(x)])
+    return np.add.reduceat(x, starts) / counts, np.add.reduceat(y, starts) / counts
+
+def _smooth_pchip(x, y, x_out):
+    """Monotone piecewise cubic (no overshoot between points)"""
+    from scipy.interpolate import PchipInterpolator
+    return PchipInterpolator(x, y)(x_out)
+
+def _smooth_akima(x, y, x_out):
+    """Akima spline: cubic pieces fitted from a five-point neighbourhood"""
+    from scipy.interpolate import Akima1DInterpolator
+    return Akima1DInterpolator(x, y)(x_out)
+
+def _smooth_savgol(x, y, x_out):
+    """Savitzky-Golay filter over a short window, resampled linearly onto x_out"""
+    from scipy.signal import savgol_filter
+    window = min(11, len(y) if len(y) % 2 else len(y) - 1)
+    return np.interp(x_out, x, savgol_filter(y, window, min(3, window - 1)))
+
+# Local-support smoothers: each maps (x, y, x_out) to y_out in time linear in len(x)
+SMOOTHING_METHODS = {
+    'pchip': _smooth_pchip,
+    'akima': _smooth_akima,
+    'savgol': _smooth_savgol,
+    'linear': lambda x, y, x_out: np.interp(x_out, x, y),
+}
+SMOOTH_CACHE_SIZE = 128
+
+class DecimationPyramid:
+    """Min/max summaries of a series over blocks of 4, 16, 64, ... points.
+    
+    A range query picks the coarsest level that still gives about one block
+    per output pixel and returns the positions of each block's low and high,
+    so peaks and troughs survive the reduction.
+    """
+    
+    FANOUT = 4
+    
+    def __init__(self, y=()):
+        self.size = 0
+        self.levels = []
+        self.extend(y)
+    
+    def extend(self, y):
+        """Bring the pyramid up to date with ``y``, the indexed series after appends.
+        
+        Only the blocks touched by the new points are recomputed at each level.
+        """
+        y = np.asarray(y, dtype=np.float64)
+        dirty = self.size
+        prev_lows = prev_highs = None
+        prev_len = self.size = len(y)
+        block = 1
+        level = 0
+        while prev_len > 1:
+            block *= self.FANOUT
+            first = dirty // self.FANOUT
+            if prev_lows is None:
+                lows = highs = np.arange(first * self.FANOUT, prev_len)
+            else:
+                lows, highs = prev_lows[first * self.FANOUT:], prev_highs[first * self.FANOUT:]
+            pad = (-len(lows)) % self.FANOUT
+            if pad:
+                lows = np.concatenate([lows, np.repeat(lows[-1], pad)])
+                highs = np.concatenate([highs, np.repeat(highs[-1], pad)])
+            lows = lows.reshape(-1, self.FANOUT)
+            highs = highs.reshape(-1, self.FANOUT)
+            rows = np.arange(len(lows))
+            lows = lows[rows, np.argmin(y[lows], axis=1)]
+            highs = highs[rows, np.argmax(y[highs], axis=1)]
+            
+            if level < len(self.levels):
+                _, old_lows, old_highs = self.levels[level]
+                lows = np.concatenate([old_lows[:first], lows])
+                highs = np.concatenate([old_highs[:first], highs])
+                self.levels[level] = (block, lows, highs)
+            else:
+                self.levels.append((block, lows, highs))
+            prev_lows, prev_highs, prev_len = lows, highs, len(lows)
+            dirty = first
+            level += 1
+    
+    def indices(self, start, stop, buckets):
+        """Sorted positions in [start, stop) to draw with roughly ``buckets`` buckets"""
+        start, stop = max(start, 0), min(stop, self.size)
+        if stop - start <= 2 * buckets:
+            return np.arange(start, stop)
+        
+        for block, lows, highs in self.levels:
+            if (stop - start) / block <= buckets:
+                break
+        first, last = start // block, -(-stop // block)
+        pairs = np.stack([lows[first:last], highs[first:last]], axis=1)
+        return np.sort(pairs, axis=1).ravel()
+    
+    def extrema(self, y, start, stop):
+        """(min, max) of ``y[start:stop]`` in O(log n), as in a FANOUT-ary segment tree.
+        
+        Climbing one level at a time, only the partial blocks at either end are
+        scanned; the whole blocks between them are left to the coarser level.
+        """
+        start, stop = max(start, 0), min(stop, self.size)
+        if stop <= start:
+            return np.nan, np.nan
+        low, high = np.inf, -np.inf
+        lows = highs = None
+        for level in range(len(self.levels) + 1):
+            inner_start = -(-start // self.FANOUT) * self.FANOUT
+            inner_stop = stop // self.FANOUT * self.FANOUT
+            whole = level < len(self.levels) and inner_start < inner_stop
+            spans = ((start, inner_start), (inner_stop, stop)) if whole else ((start, stop),)
+            for lo, hi in spans:
+                if hi <= lo:
+                    continue
+                if lows is None:
+                    low, high = min(low, y[lo:hi].min()), max(high, y[lo:hi].max())
+                else:
+                    low, high = min(low, y[lows[lo:hi]].min()), max(high, y[highs[lo:hi]].max())
+            if not whole:
+                return low, high
+            start, stop = inner_start // self.FANOUT, inner_stop // self.FANOUT
+            _, lows, highs = self.levels[level]
+        return low, high
+
+class _RollingWindow:
+    """Fixed-size window with compensated running sum, rolling variance and monotonic min/max"""
+    
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self._compensation = 0.0
+        self.m2 = 0.0
+        self._index = 0
+        self._mins = deque()
+        self._maxs = deque()
+    
+    def _add_to_total(self, value):
+        # Kahan summation keeps the running sum exact enough over millions of ticks
+        y = value - self._compensation
+        t = self.total + y
+        self._compensation = (t - self.total) - y
+        self.total = t
+    
+    def push(self, value):
+        n = len(self.values)
+        old_mean = self.total / n if n else 0.0
+        if n == self.size:
+            oldest = self.values.popleft()
+            self._add_to_total(value - oldest)
+            new_mean = self.total / n
+            self.m2 += (value - oldest) * (value - new_mean + oldest - old_mean)
+        else:
+            self._add_to_total(value)
+            new_mean = self.total / (n + 1)
+            self.m2 += (value - old_mean) * (value - new_mean)
+        self.m2 = max(self.m2, 0.0)
+        self.values.append(value)
+        
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._mins.append((self._index, value))
+        self._maxs.append((self._index, value))
+        expired = self._index - self.size
+        while self._mins[0][0] <= expired:
+            self._mins.popleft()
+        while self._maxs[0][0] <= expired:
+            self._maxs.popleft()
+        self._index += 1
+    
+    @property
+    def full(self):
+        return len(self.values) == self.size
+    
+    @property
+    def mean(self):
+        return self.total / self.size if self.full else np.nan
+    
+    @property
+    def std(self):
+        """Sample standard deviation, matching pandas' rolling std"""
+        return np.sqrt(self.m2 / (self.size - 1)) if self.full and self.size > 1 else np.nan
+    
+    @property
+    def min(self):
+        return self._mins[0][1] if self.full else np.nan
+    
+    @property
+    def max(self):
+        return self._maxs[0][1] if self.full else np.nan
+
+class _DerivedColumns(PriceSeriesStore):
+    """Growable columns derived from the price store, such as matplotlib date numbers"""
+    
+    COLUMNS = {'date_num': np.float64}
+
+class _IndicatorColumns(PriceSeriesStore):
+    """Growable per-tick indicator outputs, aligned with the price column"""
+    
+    COLUMNS = {name: np.float64 for name in (
+        'ma5', 'ma10', 'ma20', 'std20', 'min20', 'max20', 'ema12', 'ema26')}
+
+def _merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """Combine (count, mean, M2) of two samples (Chan et al. parallel Welford)"""
+    count = count_a + count_b
+    if count == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * count_b / count
+    m2 = m2_a + m2_b + delta * delta * count_a * count_b / count
+    return count, mean, m2
+
+# Quantile sketches answer within this relative error using at most SKETCH_MAX_BINS bins per sign
+SKETCH_ACCURACY = 0.001
+SKETCH_MAX_BINS = 4096
+SKETCH_MIN_VALUE = 1e-9
+SUMMARY_PERCENTILES = (1, 5, 50, 95, 99)
+
+class _SketchStore:
+    """Counts of consecutive log-spaced keys in a NumPy array, collapsing the lowest keys when full"""
+    
+    def __init__(self, max_bins):
+        self.max_bins = max_bins
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+    
+    def add(self, keys, counts=None):
+        """Add one count per key (or the matching ``counts``), widening or collapsing the range"""
+        if not len(keys):
+            return
+        lo, hi = int(keys.min()), int(keys.max())
+        end = self.offset + len(self.counts)
+        if not len(self.counts) or lo < self.offset or hi >= end:
+            if len(self.counts):
+                lo, hi = min(lo, self.offset), max(hi, end - 1)
+            
+            # Too wide: fold everything below the retained range into its lowest bin
+            lo = max(lo, hi - self.max_bins + 1)
+            grown = np.zeros(hi - lo + 1, dtype=np.int64)
+            if len(self.counts):
+                old_keys = np.maximum(np.arange(self.offset, end), lo)
+                np.add.at(grown, old_keys - lo, self.counts)
+            self.offset, self.counts = lo, grown
+        
+        positions = np.maximum(keys, self.offset) - self.offset
+        if counts is not None:
+            np.add.at(self.counts, positions, counts)
+        elif len(positions) < len(self.counts):
+            np.add.at(self.counts, positions, 1)
+        else:
+            self.counts += np.bincount(positions, minlength=len(self.counts))
+    
+    def keys(self):
+        """Keys of non-empty bins with their counts, ascending"""
+        filled = np.flatnonzero(self.counts)
+        return filled + self.offset, self.counts[filled]
+
+class QuantileSketch:
+    """Mergeable streaming quantiles with bounded memory (DDSketch).
+    
+    Values map to logarithmic bins ``ceil(log_gamma |x|)``, so any quantile is
+    within ``relative_accuracy`` of the true value; positive and negative
+    values have their own bins and near-zero values share one counter.
+    Once a sign needs more than ``max_bins`` bins the smallest magnitudes are
+    folded together, so accuracy is only given up near zero, never in the
+    tails. Sketches with the same accuracy merge exactly by adding bin counts.
+    """
+    
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY, max_bins=SKETCH_MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.positive = _SketchStore(max_bins)
+        self.negative = _SketchStore(max_bins)
+        self.zero_count = 0
+        self.count = 0
+        self.min, self.max = np.inf, -np.inf
+    
+    def _keys(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+    
+    def _values(self, keys):
+        """Representative value of each bin, within the relative accuracy of everything in it"""
+        return 2 * self.gamma ** keys.astype(np.float64) / (self.gamma + 1)
+    
+    def add(self, value):
+        self.extend([value])
+    
+    def extend(self, values):
+        """Add a batch of values; NaNs are ignored"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        positive = values[values > SKETCH_MIN_VALUE]
+        negative = -values[values < -SKETCH_MIN_VALUE]
+        self.zero_count += len(values) - len(positive) - len(negative)
+        self.positive.add(self._keys(positive))
+        self.negative.add(self._keys(negative))
+    
+    def merge(self, other):
+        """Add the contents of another sketch of the same accuracy to this one"""
+        if other.gamma != self.gamma:
+            raise ValueError("CANNOT MERGE SKETCHES OF DIFFERENT ACCURACY")
+        self.positive.add(*other.positive.keys())
+        self.negative.add(*other.negative.keys())
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+    
+    def _bins(self):
+        """(values, counts) of every non-empty bin in ascending value order"""
+        neg_keys, neg_counts = self.negative.keys()
+        pos_keys, pos_counts = self.positive.keys()
+        values = np.concatenate([-self._values(neg_keys[::-1]), [0.0], self._values(pos_keys)])
+        counts = np.concatenate([neg_counts[::-1], [self.zero_count], pos_counts])
+        return values, counts
+    
+    def quantiles(self, qs):
+        """Values at quantiles ``qs`` (fractions in [0, 1]), clamped to the exact min and max"""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        values, counts = self._bins()
+        ranks = qs * (self.count - 1)
+        positions = np.searchsorted(np.cumsum(counts), ranks, side='right')
+        return np.clip(values[np.minimum(positions, len(values) - 1)], self.min, self.max)
+    
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+    
+    def tail_mean(self, q):
+        """Mean of the values at or below the ``q`` quantile (expected shortfall for returns)"""
+        if self.count == 0:
+            return np.nan
+        values, counts = self._bins()
+        cumulative = np.cumsum(counts)
+        cut = min(int(np.searchsorted(cumulative, q * (self.count - 1), side='right')), len(values) - 1)
+        weights = counts[:cut + 1].astype(np.float64)
+        return float(np.dot(np.clip(values[:cut + 1], self.min, self.max), weights) / weights.sum())
+    
+    @property
+    def nbytes(self):
+        return self.positive.counts.nbytes + self.negative.counts.nbytes
+
+# Price histograms count fixed-width bins, starting at a hundredth of a cent and doubling past HISTOGRAM_MAX_BINS
+HISTOGRAM_BIN_WIDTH = 0.0001
+HISTOGRAM_MAX_BINS = 4096
+
+class PriceHistogram:
+    """Streaming histogram of prices in linear bins with bounded memory.
+    
+    Bin ``k`` holds the count, sum, min and max of the prices in
+    [k * width, (k + 1) * width). When the range needs more than ``max_bins``
+    bins the width doubles and neighbouring bins are combined, so bins stay
+    narrower than 2 / max_bins of the range seen. The log bins of
+    QuantileSketch are wider than a whole bar for a well-pegged series; here
+    only a bin straddling a bar edge can land on the wrong side, and a bin
+    holding a single distinct price (cent-rounded feeds) never does.
+    """
+    
+    def __init__(self, width=HISTOGRAM_BIN_WIDTH, max_bins=HISTOGRAM_MAX_BINS):
+        self.base_width = width
+        self.max_bins = max_bins
+        self.shift = 0
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums, self.lows, self.highs = np.zeros(0), np.zeros(0), np.zeros(0)
+        self.count = 0
+        self.min, self.max = np.inf, -np.inf
+    
+    @property
+    def width(self):
+        return self.base_width * 2 ** self.shift
+    
+    def _resize(self, lo, hi, step=0):
+        """Re-bin into keys [lo, hi] after combining each ``2 ** step`` neighbouring bins"""
+        positions = ((np.arange(len(self.counts)) + self.offset) >> step) - lo
+        size = hi - lo + 1
+        self.counts = np.bincount(positions, self.counts, size).astype(np.int64)
+        self.sums = np.bincount(positions, self.sums, size).astype(np.float64)
+        lows, highs = np.full(size, np.inf), np.full(size, -np.inf)
+        np.minimum.at(lows, positions, self.lows)
+        np.maximum.at(highs, positions, self.highs)
+        self.lows, self.highs = lows, highs
+        self.offset = lo
+        self.shift += step
+    
+    def extend(self, values):
+        """Add a batch of prices; non-finite values are ignored"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        
+        # Keys at the base width, shifted, so combining bins maps every key exactly as a fresh add would
+        base_keys = np.floor(values / self.base_width).astype(np.int64)
+        lo = int(base_keys.min()) >> self.shift
+        hi = int(base_keys.max()) >> self.shift
+        if len(self.counts):
+            lo, hi = min(lo, self.offset), max(hi, self.offset + len(self.counts) - 1)
+        step = 0
+        while (hi >> step) - (lo >> step) >= self.max_bins:
+            step += 1
+        if step or not len(self.counts) or lo < self.offset or hi >= self.offset + len(self.counts):
+            self._resize(lo >> step, hi >> step, step)
+        
+        positions = (base_keys >> self.shift) - self.offset
+        self.counts += np.bincount(positions, minlength=len(self.counts))
+        self.sums += np.bincount(positions, values, len(self.sums))
+        np.minimum.at(self.lows, positions, values)
+        np.maximum.at(self.highs, positions, values)
+    
+    def histogram(self, bins=20):
+        """(counts, edges) of equal-width bins over [min, max], placing each linear bin at its mean"""
+        if self.count == 0:
+            return np.zeros(bins, dtype=np.int64), np.linspace(0, 1, bins + 1)
+        filled = np.flatnonzero(self.counts)
+        lows, highs = self.lows[filled], self.highs[filled]
+        means = np.where(lows == highs, lows, np.clip(self.sums[filled] / self.counts[filled], lows, highs))
+        low, high = (self.min, self.max) if self.max > self.min else (self.min - 0.5, self.max + 0.5)
+        counts, edges = np.histogram(means, bins=bins, range=(low, high), weights=self.counts[filled])
+        return counts.astype(np.int64), edges
+    
+    @property
+    def nbytes(self):
+        return self.counts.nbytes + self.sums.nbytes + self.lows.nbytes + self.highs.nbytes
+
+class IndicatorEngine:
+    """Summary statistics and rolling indicators maintained incrementally.
+    
+    ``update`` costs O(1) per price; ``extend`` vectorizes large batches and
+    leaves the engine in the same state, so a refresh only pays for new ticks.
+    Summary moments of a batch are merged at once, while its rolling columns
+    are computed on first use, so a text summary never pays for them.
+    """
+    
+    MA_WINDOWS = (5, 10, 20)
+    EMA_SPANS = (12, 26)
+    BAND_WINDOW = 20
+    BATCH_THRESHOLD = 256
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.count = 0
+        self.first = self.last = self.previous = np.nan
+        self.high, self.low = -np.inf, np.inf
+        self.mean, self.m2 = 0.0, 0.0
+        self.return_count, self.return_mean, self.return_m2 = 0, 0.0, 0.0
+        self.windows = {size: _RollingWindow(size) for size in self.MA_WINDOWS}
+        self.emas = {span: np.nan for span in self.EMA_SPANS}
+        self.series = _IndicatorColumns()
+        self._pending = []
+        self.price_sketch = QuantileSketch()
+        self.return_sketch = QuantileSketch()
+        self.price_histogram = PriceHistogram()
+    
+    def update(self, price):
+        """Add one price point"""
+        self._flush()
+        price = float(price)
+        if self.count == 0:
+            self.first = price
+        else:
+            ret = (price - self.last) / self.last * 100 if self.last != 0 else np.nan
+            if np.isfinite(ret):
+                self.return_count, self.return_mean, self.return_m2 = _merge_moments(
+                    self.return_count, self.return_mean, self.return_m2, 1, ret, 0.0)
+                self.return_sketch.add(ret)
+        self.price_sketch.add(price)
+        self.price_histogram.extend([price])
+        self.previous, self.last = self.last, price
+        self.count, self.mean, self.m2 = _merge_moments(self.count, self.mean, self.m2, 1, price, 0.0)
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        
+        row = {}
+        for size, window in self.windows.items():
+            window.push(price)
+            row[f'ma{size}'] = [window.mean]
+        band = self.windows[self.BAND_WINDOW]
+        row['std20'], row['min20'], row['max20'] = [band.std], [band.min], [band.max]
+        for span in self.EMA_SPANS:
+            alpha = 2.0 / (span + 1)
+            previous = self.emas[span]
+            self.emas[span] = price if np.isnan(previous) else alpha * price + (1 - alpha) * previous
+            row[f'ema{span}'] = [self.emas[span]]
+        self.series.extend(row)
+    
+    @instrumented('indicators.extend')
+    def extend(self, prices, summary_only=False):
+        """Add a batch of prices, vectorized when the batch is large.
+        
+        ``summary_only`` skips the rolling columns, for one-off summaries of long ranges that never plot them.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(prices) == 0:
+            return
+        if len(prices) < self.BATCH_THRESHOLD and not summary_only:
+            for price in prices:
+                self.update(price)
+            return
+        
+        # Summary moments of prices and percentage returns, merged into the running state
+        if self.count:
+            chained = np.concatenate([[self.last], prices])
+        else:
+            chained = prices
+            self.first = prices[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(chained) / chained[:-1] * 100
+        returns = returns[np.isfinite(returns)]
+        self.return_sketch.extend(returns)
+        self.price_sketch.extend(prices)
+        self.price_histogram.extend(prices)
+        if len(returns):
+            self.return_count, self.return_mean, self.return_m2 = _merge_moments(
+                self.return_count, self.return_mean, self.return_m2,
+                len(returns), returns.mean(), ((returns - returns.mean()) ** 2).sum())
+        self.count, self.mean, self.m2 = _merge_moments(
+            self.count, self.mean, self.m2,
+            len(prices), prices.mean(), ((prices - prices.mean()) ** 2).sum())
+        self.high = max(self.high, prices.max())
+        self.low = min(self.low, prices.min())
+        self.previous, self.last = (chained[-2] if len(chained) > 1 else np.nan), prices[-1]
+        if not summary_only:
+            self._pending.append(prices)
+    
+    @instrumented('indicators.rolling')
+    def _flush(self):
+        """Compute the rolling columns of batches added by ``extend``"""
+        if not self._pending:
+            return
+        prices = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        self._pending = []
+        
+        # Rolling windows see the tail of the previous data followed by the batch
+        columns = {}
+        for size, window in self.windows.items():
+            history = np.concatenate([np.fromiter(window.values, np.float64, len(window.values)), prices])
+            rolling = pd.Series(history).rolling(window=size)
+            columns[f'ma{size}'] = rolling.mean().to_numpy()[-len(prices):]
+            if size == self.BAND_WINDOW:
+                columns['std20'] = rolling.std().to_numpy()[-len(prices):]
+                columns['min20'] = rolling.min().to_numpy()[-len(prices):]
+                columns['max20'] = rolling.max().to_numpy()[-len(prices):]
+            fresh = _RollingWindow(size)
+            fresh._index = window._index + len(prices) - min(size, len(history))
+            for value in history[-size:]:
+                fresh.push(value)
+            self.windows[size] = fresh
+        
+        # EMA recurrence y[n] = a*x[n] + (1-a)*y[n-1], seeded by prepending the previous EMA
+        for span in self.EMA_SPANS:
+            alpha = 2.0 / (span + 1)
+            seed = self.emas[span]
+            if np.isnan(seed):
+                ema = pd.Series(prices).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+            else:
+                ema = pd.Series(np.concatenate([[seed], prices])).ewm(
+                    alpha=alpha, adjust=False).mean().to_numpy()[1:]
+            columns[f'ema{span}'] = ema
+            self.emas[span] = ema[-1]
+        self.series.extend(columns)
+    
+    def column(self, name):
+        """Per-tick indicator values as a zero-copy view"""
+        self._flush()
+        return self.series.column(name)
+    
+    def statistics(self):
+        """Summary statistics in the shape returned by get_statistics"""
+        if self.count == 0:
+            return None
+        if self.count > 1:
+            day_change = self.last - self.previous
+            day_change_pct = (day_change / self.previous * 100) if self.previous != 0 else 0
+        else:
+            day_change = 0
+            day_change_pct = 0
+        variance = self.m2 / self.count
+        percentiles = self.price_sketch.quantiles(np.array(SUMMARY_PERCENTILES) / 100)
+        
+        # Value at risk: the per-tick loss (in %) exceeded only 5% / 1% of the time
+        if self.return_sketch.count:
+            var_95, var_99 = -self.return_sketch.quantiles([0.05, 0.01])
+            shortfall_95 = -self.return_sketch.tail_mean(0.05)
+        else:
+            var_95 = var_99 = shortfall_95 = 0
+        stats = {
+            'current_price': self.last,
+            'open_price': self.first,
+            'high_price': self.high,
+            'low_price': self.low,
+            'average_price': self.mean,
+            'std_dev': np.sqrt(variance),
+            'volatility': np.sqrt(self.return_m2 / self.return_count) if self.return_count else 0,
+            'total_return': ((self.last - self.first) / self.first * 100) if self.count > 1 and self.first != 0 else 0,
+            'day_change': day_change,
+            'day_change_pct': day_change_pct,
+            'total_points': self.count,
+            'variance': variance
+        }
+        stats.update({f'p{p}': value for p, value in zip(SUMMARY_PERCENTILES, percentiles)})
+        stats.update({'var_95': var_95, 'var_99': var_99, 'expected_shortfall_95': shortfall_95})
+        return stats
+
+# Risk analytics: deviation from the peg against the marketConditions factors and 24h volume
+PEG_PRICE = 100.0
+RISK_FACTORS = {
+    'concentration_risk': 'CONCENTRATION',
+    'velocity_risk': 'VELOCITY',
+    'large_transfer_risk': 'LARGE TRANSFER',
+    'volume24h': 'VOLUME 24H',
+}
+RISK_WINDOW = 50
+RISK_Z_ALERT = 2.0
+RISK_Z_LIMIT = 4.0
+
+def _signed(value):
+    """Format a risk metric with its sign, or N/A when undefined (e.g. a flat window)"""
+    return f"{value:+.2f}" if np.isfinite(value) else "N/A"
+
+class _RiskColumns(PriceSeriesStore):
+    """Growable per-tick risk analytics, aligned with the price column"""
+    
+    COLUMNS = {name: np.float64 for name in ['deviation', 'z_deviation'] + [
+        f'{kind}_{factor}' for factor in RISK_FACTORS for kind in ('corr', 'z')]}
+
+def _merge_comoments(a, b):
+    """Combine (count, mean_x, mean_y, M2_x, M2_y, C_xy) of two paired samples"""
+    count_a, mean_xa, mean_ya, m2_xa, m2_ya, c_a = a
+    count_b, mean_xb, mean_yb, m2_xb, m2_yb, c_b = b
+    count = count_a + count_b
+    if count == 0:
+        return a
+    delta_x, delta_y = mean_xb - mean_xa, mean_yb - mean_ya
+    weight = count_a * count_b / count
+    return (count, mean_xa + delta_x * count_b / count, mean_ya + delta_y * count_b / count,
+            m2_xa + m2_xb + delta_x * delta_x * weight, m2_ya + m2_yb + delta_y * delta_y * weight,
+            c_a + c_b + delta_x * delta_y * weight)
+
+class RiskAnalytics:
+    """Rolling analytics of the deviation from the peg against each risk factor.
+    
+    Per tick: the deviation (price - PEG_PRICE) and its rolling z-score, and
+    per factor its rolling z-score and rolling correlation with the deviation.
+    ``extend`` computes a batch with vectorized rolling windows over the batch
+    and the ``window - 1`` rows before it, so a refresh only pays for new
+    ticks. Full-history correlations come from co-moments merged per batch.
+    """
+    
+    def __init__(self, window=RISK_WINDOW):
+        self.window = window
+        self.reset()
+    
+    def reset(self):
+        self.count = 0
+        self.series = _RiskColumns()
+        self.latest_inputs = None
+        self._tail = np.empty((0, len(RISK_FACTORS) + 1))
+        self.comoments = {factor: (0, 0.0, 0.0, 0.0, 0.0, 0.0) for factor in RISK_FACTORS}
+    
+    @instrumented('risk.extend')
+    def extend(self, columns):
+        """Add a batch of store columns (price plus every RISK_FACTORS column)"""
+        prices = np.asarray(columns['price'], dtype=np.float64)
+        if len(prices) == 0:
+            return
+        inputs = np.column_stack([prices - PEG_PRICE] +
+                                 [np.asarray(columns[factor], dtype=np.float64) for factor in RISK_FACTORS])
+        # Column-major, like the blocks pandas returns, so every column op runs over contiguous memory
+        history = np.asfortranarray(np.concatenate([self._tail, inputs]))
+        
+        # Windows are shift-invariant, and centering keeps the rolling sums well conditioned
+        finite = np.isfinite(history)
+        counts = finite.sum(axis=0)
+        offsets = np.where(counts > 0, np.where(finite, history, 0).sum(axis=0) / np.maximum(counts, 1), 0)
+        centered = history - offsets
+        mean = pd.DataFrame(centered).rolling(self.window).mean().to_numpy()
+        std = pd.DataFrame(centered).rolling(self.window).std().to_numpy()
+        products = pd.DataFrame(centered[:, 1:] * centered[:, :1]).rolling(self.window).mean().to_numpy()
+        
+        # A window is flat when no value changed inside it (exact, unlike the std's rounding residue)
+        changes = np.cumsum(np.vstack([np.zeros((1, centered.shape[1]), np.int64),
+                                       (np.diff(history, axis=0) != 0)]), axis=0)
+        flat = np.zeros(centered.shape, dtype=bool)
+        if len(history) >= self.window:
+            flat[self.window - 1:] = changes[self.window - 1:] == changes[:len(changes) - self.window + 1]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.where(flat, 0.0, (centered - mean) / std)
+            covariance = (products - mean[:, 1:] * mean[:, :1]) * self.window / (self.window - 1)
+            corr = np.clip(covariance / (std[:, 1:] * std[:, :1]), -1, 1)
+        # Correlation with a flat series is undefined
+        corr[flat[:, 1:] | flat[:, :1]] = np.nan
+        
+        fresh = slice(len(self._tail), None)
+        batch = {'deviation': inputs[:, 0], 'z_deviation': z[fresh, 0]}
+        for k, factor in enumerate(RISK_FACTORS, start=1):
+            batch[f'z_{factor}'] = z[fresh, k]
+            batch[f'corr_{factor}'] = corr[fresh, k - 1]
+            
+            valid = np.isfinite(inputs[:, 0]) & np.isfinite(inputs[:, k])
+            if valid.any():
+                x, y = inputs[valid, 0], inputs[valid, k]
+                mean_x, mean_y = x.mean(), y.mean()
+                self.comoments[factor] = _merge_comoments(self.comoments[factor], (
+                    len(x), mean_x, mean_y, ((x - mean_x) ** 2).sum(), ((y - mean_y) ** 2).sum(),
+                    ((x - mean_x) * (y - mean_y)).sum()))
+        self.series.extend(batch)
+        self._tail = history[max(len(history) - (self.window - 1), 0):] if self.window > 1 else history[:0]
+        self.latest_inputs = inputs[-1]
+        self.count += len(prices)
+    
+    def column(self, name):
+        """Per-tick values of a _RiskColumns column as a zero-copy view"""
+        return self.series.column(name)
+    
+    def full_correlation(self, factor):
+        """Correlation of the deviation with ``factor`` over every tick seen"""
+        _, _, _, m2_x, m2_y, c_xy = self.comoments[factor]
+        return c_xy / np.sqrt(m2_x * m2_y) if m2_x > 0 and m2_y > 0 else np.nan
+    
+    def summary(self):
+        """Latest rolling values and full-history correlation per factor, or None before any tick"""
+        if self.count == 0:
+            return None
+        factors = {}
+        for k, (factor, label) in enumerate(RISK_FACTORS.items(), start=1):
+            factors[factor] = {
+                'label': label,
+                'value': self.latest_inputs[k],
+                'correlation': self.series.column(f'corr_{factor}')[-1],
+                'z_score': self.series.column(f'z_{factor}')[-1],
+                'full_correlation': self.full_correlation(factor),
+            }
+        return {
+            'window': self.window,
+            'deviation': self.latest_inputs[0],
+            'z_deviation': self.series.column('z_deviation')[-1],
+            'factors': factors,
+        }
+
+# Monte Carlo: forward paths of the deviation from the peg, stepped in fixed-size chunks of paths
+SIMULATION_PATHS = 100_000
+SIMULATION_HORIZON = 500
+# Chunks and their seed streams depend only on the path count, so results do not depend on the workers
+SIMULATION_CHUNK = 65_536
+SIMULATION_MIN_RETURNS = 10
+SIMULATION_BANDS = (0.5, 1.0, 2.0, 5.0)
+SIMULATION_REVERT_BAND = 0.1
+SIMULATION_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+SIMULATION_FAN_STEPS = 100
+SIMULATION_FAN_BINS = 2000
+
+_simulation_model = None
+
+def _init_simulation_worker(model):
+    """Pool initializer: keep the calibrated model (and its shock sample) for every chunk"""
+    global _simulation_model
+    _simulation_model = model
+
+def _simulate_peg_chunk(job):
+    """Step one chunk of paths over the horizon, returning only mergeable tallies.
+    
+    Deviations are fractions of the peg. Each step draws a shock from the
+    calibrated sample and applies the mean reversion to the price, so
+    x' = x + r * (1 + x) with r = shock + reversion * x. Returns the paths
+    outside each band at some simulated tick, the paths reverted by each step and a histogram
+    of deviations at every fan step.
+    """
+    paths, seed = job
+    model = _simulation_model
+    rng = np.random.default_rng(seed)
+    shocks, reversion = model['shocks'], model['reversion']
+    bands = np.asarray(model['bands'])
+    fan_steps, low, width, bins = model['fan_steps'], model['bin_low'], model['bin_width'], model['bins']
+    
+    x = np.full(paths, model['start'])
+    step_return = np.empty(paths)
+    magnitude = np.abs(x)
+    peak = np.zeros(paths)
+    reverted = magnitude <= model['revert_band']
+    inside = np.empty(paths, dtype=bool)
+    reverted_by_step = np.empty(model['horizon'] + 1, dtype=np.int64)
+    reverted_by_step[0] = np.count_nonzero(reverted)
+    histogram = np.zeros((len(fan_steps), bins), dtype=np.int64)
+    fan = 0
+    for step in range(1, model['horizon'] + 1):
+        np.take(shocks, rng.integers(0, len(shocks), paths), out=step_return)
+        if reversion:
+            step_return += reversion * x
+        step_return *= 1 + x
+        x += step_return
+        np.abs(x, out=magnitude)
+        np.maximum(peak, magnitude, out=peak)
+        np.less_equal(magnitude, model['revert_band'], out=inside)
+        reverted |= inside
+        reverted_by_step[step] = np.count_nonzero(reverted)
+        if fan < len(fan_steps) and fan_steps[fan] == step:
+            positions = np.clip(((x - low) / width).astype(np.int64), 0, bins - 1)
+            histogram[fan] = np.bincount(positions, minlength=bins)
+            fan += 1
+    breaches = np.array([np.count_nonzero(peak >= band) for band in bands], dtype=np.int64)
+    return breaches, reverted_by_step, histogram
+
+def _histogram_quantiles(histogram, quantiles, low, width):
+    """Quantiles of each histogram row, interpolated linearly within the bin they fall in"""
+    cumulative = np.cumsum(histogram, axis=1)
+    result = np.empty((len(quantiles), len(histogram)))
+    for row, counts in enumerate(cumulative):
+        targets = np.asarray(quantiles) * counts[-1]
+        positions = np.minimum(np.searchsorted(counts, targets, side='left'), len(counts) - 1)
+        before = np.where(positions > 0, counts[positions - 1], 0)
+        in_bin = np.maximum(histogram[row, positions], 1)
+        result[:, row] = low + (positions + (targets - before) / in_bin) * width
+    return result
+
+class PegSimulator:
+    """Monte Carlo paths of the price around the peg, calibrated on the loaded return series.
+    
+    The per-tick returns are the ones get_statistics derives. They are
+    regressed on the previous tick's deviation from the peg, which gives
+    the speed of mean reversion. The residuals (with the drift) form the
+    shock sample that paths bootstrap from, so its fat tails and price
+    granularity carry over. Paths run as batched NumPy arrays, one chunk at
+    a time, spread over a process pool. Only per-band counts, revert counts
+    and fan histograms ever leave a worker, so memory stays bounded at any
+    path count.
+    """
+    
+    def __init__(self, prices, timestamps_ns=None, peg=PEG_PRICE):
+        prices = np.asarray(prices, dtype=np.float64)
+        self.peg = peg
+        self.start_price = prices[-1] if len(prices) else np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(prices) / prices[:-1]
+        deviations = prices[:-1] / peg - 1
+        finite = np.isfinite(returns)
+        returns, deviations = returns[finite], deviations[finite]
+        if len(returns) < SIMULATION_MIN_RETURNS:
+            raise ValueError(f"AT LEAST {SIMULATION_MIN_RETURNS + 1} PRICES ARE NEEDED TO CALIBRATE")
+        
+        # Least squares of the return on the deviation; a fitted drift away from the peg is not extrapolated
+        spread = deviations - deviations.mean()
+        variance = spread @ spread
+        slope = (spread @ (returns - returns.mean())) / variance if variance > 0 else 0.0
+        self.reversion = float(np.clip(slope, -1.0, 0.0))
+        self.shocks = returns - self.reversion * deviations
+        self.half_life = np.log(0.5) / np.log1p(self.reversion) if self.reversion < 0 else np.inf
+        
+        self.tick_seconds = 1.0
+        if timestamps_ns is not None and len(timestamps_ns) > 1:
+            self.tick_seconds = float(timestamps_ns[-1] - timestamps_ns[0]) / 1e9 / (len(timestamps_ns) - 1) or 1.0
+    
+    def _model(self, horizon):
+        start = self.start_price / self.peg - 1
+        stride = max(horizon // SIMULATION_FAN_STEPS, 1)
+        fan_steps = np.unique(np.append(np.arange(stride, horizon + 1, stride), horizon))
+        
+        # Deviations are binned over a range wide enough for an unchecked random walk over the horizon
+        reach = max(6 * self.shocks.std() * np.sqrt(horizon), 2 * max(SIMULATION_BANDS) / 100)
+        low = min(start, 0) - reach
+        width = (max(start, 0) + reach - low) / SIMULATION_FAN_BINS
+        return {'shocks': self.shocks, 'reversion': self.reversion, 'start': start, 'horizon': horizon,
+                'bands': np.array(SIMULATION_BANDS) / 100, 'revert_band': SIMULATION_REVERT_BAND / 100,
+                'fan_steps': fan_steps, 'bin_low': low, 'bin_width': width, 'bins': SIMULATION_FAN_BINS}
+    
+    @instrumented('simulation.run')
+    def run(self, paths=SIMULATION_PATHS, horizon=SIMULATION_HORIZON, seed=None, workers=None):
+        """Simulate ``paths`` paths of ``horizon`` ticks and summarize them.
+        
+        The same ``seed`` reproduces a run exactly, whatever the number of
+        workers; without one, fresh entropy is drawn and reported as the seed.
+        """
+        if paths < 1 or horizon < 1:
+            raise ValueError("PATHS AND HORIZON MUST BE POSITIVE")
+        model = self._model(horizon)
+        seeds = np.random.SeedSequence(seed)
+        sizes = [min(SIMULATION_CHUNK, paths - start) for start in range(0, paths, SIMULATION_CHUNK)]
+        jobs = list(zip(sizes, seeds.spawn(len(sizes))))
+        
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers == 1:
+            _init_simulation_worker(model)
+            results = map(_simulate_peg_chunk, jobs)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_simulation_worker,
+                                       initargs=(model,))
+            results = pool.map(_simulate_peg_chunk, jobs)
+        try:
+            breaches, reverted, histogram = next(results)
+            for chunk_breaches, chunk_reverted, chunk_histogram in results:
+                breaches += chunk_breaches
+                reverted += chunk_reverted
+                histogram += chunk_histogram
+        finally:
+            if workers > 1:
+                pool.shutdown()
+        return self._summary(model, paths, seeds.entropy, breaches, reverted, histogram)
+    
+    def _summary(self, model, paths, seed, breaches, reverted, histogram):
+        # First-revert times are the increments of the cumulative revert counts
+        first_reverts = np.diff(reverted, prepend=0)
+        reverting = reverted[-1]
+        steps = np.arange(len(reverted))
+        if reverting:
+            expected = float(steps @ first_reverts / reverting)
+            median = int(np.searchsorted(reverted, reverting / 2, side='left'))
+        else:
+            expected = median = np.nan
+        
+        quantiles = _histogram_quantiles(histogram, SIMULATION_QUANTILES, model['bin_low'], model['bin_width'])
+        fan = np.column_stack([np.full(len(SIMULATION_QUANTILES), self.start_price), (1 + quantiles) * self.peg])
+        return {
+            'paths': paths,
+            'horizon': model['horizon'],
+            'seed': seed,
+            'start_price': self.start_price,
+            'peg': self.peg,
+            'reversion': self.reversion,
+            'half_life_ticks': self.half_life,
+            'shock_volatility': self.shocks.std() * 100,
+            'tick_seconds': self.tick_seconds,
+            'breach_probability': {band: count / paths for band, count in zip(SIMULATION_BANDS, breaches)},
+            'revert_band': SIMULATION_REVERT_BAND,
+            'revert_probability': reverting / paths,
+            'expected_revert_ticks': expected,
+            'median_revert_ticks': median,
+            'expected_revert_seconds': expected * self.tick_seconds,
+            'fan_steps': np.append(0, model['fan_steps']),
+            'fan_quantiles': SIMULATION_QUANTILES,
+            'fan': fan,
+        }
+
+# OHLCV bar intervals in ns; each must be a multiple of the one before, which it is built from
+RESAMPLE_INTERVALS = {
+    '1s': 1_000_000_000,
+    '1m': 60_000_000_000,
+    '5m': 300_000_000_000,
+    '1h': 3_600_000_000_000,
+}
+CANDLE_MAX_BARS = 600
+
+class _BarColumns(PriceSeriesStore):
+    """Growable OHLCV bars of one interval; volume and transactions are those traded within the bar"""
+    
+    COLUMNS = {
+        'start_ns': np.int64,
+        'open': np.float64,
+        'high': np.float64,
+        'low': np.float64,
+        'close': np.float64,
+        'volume': np.float64,
+        'transactions': np.int64,
+        'ticks': np.int64,
+    }
+    TIME_COLUMN = 'start_ns'
+
+def _aggregate_bars(rows, interval_ns):
+    """Group time-ordered bar rows into bars of ``interval_ns`` with one reduceat per column"""
+    buckets = rows['start_ns'] // interval_ns
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.append(starts[1:], len(buckets)) - 1
+    return {
+        'start_ns': buckets[starts] * interval_ns,
+        'open': rows['open'][starts],
+        'high': np.maximum.reduceat(rows['high'], starts),
+        'low': np.minimum.reduceat(rows['low'], starts),
+        'close': rows['close'][ends],
+        'volume': np.add.reduceat(rows['volume'], starts),
+        'transactions': np.add.reduceat(rows['transactions'], starts),
+        'ticks': np.add.reduceat(rows['ticks'], starts),
+    }
+
+class OHLCVResampler:
+    """OHLCV bars at several intervals, maintained incrementally from ticks.
+    
+    New ticks are grouped into bars of the finest interval, and each coarser
+    interval is grouped from the bars of the one below it, never from ticks.
+    A partial bar that continues the last stored bar is merged into it, so
+    ``extend`` costs O(new ticks) however long the history is.
+    """
+    
+    def __init__(self, intervals=tuple(RESAMPLE_INTERVALS)):
+        self.intervals = [(name, RESAMPLE_INTERVALS[name]) for name in intervals]
+        for (_, finer), (name, coarser) in zip(self.intervals, self.intervals[1:]):
+            if coarser % finer:
+                raise ValueError(f"INTERVAL {name} IS NOT A MULTIPLE OF THE ONE BELOW IT")
+        self.reset()
+    
+    def reset(self):
+        self.count = 0
+        self.last_volume = np.nan
+        self.last_transactions = None
+        self.bars = {name: _BarColumns() for name, _ in self.intervals}
+    
+    def extend(self, columns):
+        """Add time-ordered ticks given as store columns (price, timestamp_ns, volume24h, total_transactions)"""
+        prices = np.asarray(columns['price'], dtype=np.float64)
+        if not len(prices):
+            return
+        
+        # Per-tick traded volume and transactions are the increases of the running totals
+        volume = np.asarray(columns['volume24h'], dtype=np.float64)
+        transactions = np.asarray(columns['total_transactions'], dtype=np.int64)
+        previous_volume = volume[0] if np.isnan(self.last_volume) else self.last_volume
+        previous_transactions = transactions[0] if self.last_transactions is None else self.last_transactions
+        rows = {
+            'start_ns': np.asarray(columns['timestamp_ns'], dtype=np.int64),
+            'open': prices, 'high': prices, 'low': prices, 'close': prices,
+            'volume': np.fmax(np.diff(volume, prepend=previous_volume), 0),
+            'transactions': np.maximum(np.diff(transactions, prepend=previous_transactions), 0),
+            'ticks': np.ones(len(prices), dtype=np.int64),
+        }
+        if not np.isnan(volume[-1]):
+            self.last_volume = volume[-1]
+        self.last_transactions = transactions[-1]
+        self.count += len(prices)
+        
+        for name, interval_ns in self.intervals:
+            rows = _aggregate_bars(rows, interval_ns)
+            self._merge(self.bars[name], rows)
+    
+    @staticmethod
+    def _merge(bars, rows):
+        """Append ``rows`` to ``bars``, folding a first row that continues the last stored bar into it"""
+        if len(bars) and rows['start_ns'][0] == bars.column('start_ns')[-1]:
+            bars._reserve(len(bars))
+            last = len(bars) - 1
+            stored = bars.columns(last)
+            stored['high'][0] = max(stored['high'][0], rows['high'][0])
+            stored['low'][0] = min(stored['low'][0], rows['low'][0])
+            stored['close'][0] = rows['close'][0]
+            for name in ('volume', 'transactions', 'ticks'):
+                stored[name][0] += rows[name][0]
+            rows = {name: column[1:] for name, column in rows.items()}
+        if len(rows['start_ns']):
+            bars.extend(rows)
+    
+    def interval_for(self, start_ns, end_ns, max_bars=CANDLE_MAX_BARS):
+        """Finest interval that covers [start_ns, end_ns] in at most ``max_bars`` bars"""
+        for name, interval_ns in self.intervals:
+            if (end_ns - start_ns) // interval_ns < max_bars:
+                return name
+        return self.intervals[-1][0]
+
+# inotify constants (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+class FileWatcher:
+    """Detects rewrites of a file via inotify on Linux, falling back to stat polling.
+    
+    The containing directory is watched, so both in-place rewrites
+    (fs.writeFileSync) and atomic renames are seen.
+    """
+    
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.method = 'STAT POLLING'
+        self._fd = None
+        self._signature = self._stat()
+        self._init_inotify()
+    
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    
+    def _init_inotify(self):
+        if not sys.platform.startswith('linux'):
+            return
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+            if libc.inotify_add_watch(fd, os.path.dirname(self.path).encode(), mask) < 0:
+                os.close(fd)
+                return
+        except (OSError, AttributeError):
+            return
+        self._fd = fd
+        self.method = 'INOTIFY'
+    
+    def _drain_events(self):
+        """Read pending inotify events, returning True if any concerned the watched file"""
+        name = os.path.basename(self.path).encode()
+        touched = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return touched
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                if data[offset:offset + length].rstrip(b'\0') == name:
+                    touched = True
+                offset += length
+    
+    def changed(self):
+        """Return True if the file changed since the previous call; never blocks"""
+        if self._fd is not None and not self._drain_events():
+            return False
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
+    
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+class _FrameThrottle:
+    """Coalesce bursts of view changes into one apply-and-redraw per frame.
+    
+    Backends without an event loop (Agg) have inert timers, so requests apply at once there.
+    """
+    
+    def __init__(self, canvas, apply, interval_ms=FRAME_INTERVAL_MS):
+        from matplotlib.backend_bases import TimerBase
+        self.canvas = canvas
+        self.apply = apply
+        self.timer = canvas.new_timer(interval=interval_ms)
+        self.timer.single_shot = True
+        self.timer.add_callback(self._fire)
+        self.immediate = type(self.timer) is TimerBase
+        self.pending = False
+    
+    def request(self):
+        if self.immediate:
+            self._fire()
+        elif not self.pending:
+            self.pending = True
+            self.timer.start()
+    
+    def _fire(self):
+        self.pending = False
+        self.apply()
+        self.canvas.draw_idle()
 
 class ProfessionalPHXAnalyzer:
     def __init__(self, data_file="phx_price.json"):
-        self.data_file = data_file
+        # Several files (one per central bank / wallet instance) are merged into one series
+        self.data_files = [data_file] if isinstance(data_file, str) else list(data_file)
+        self.data_file = self.data_files[0]
+        self.sources = []
+        if len(self.data_files) > 1:
+            self.sources = [ProfessionalPHXAnalyzer(path) for path in self.data_files]
+        self.cache_dir = self.data_file + CACHE_SUFFIX
+        self.archive = PriceArchive(self.data_file + ARCHIVE_SUFFIX)
+        self._archived_rows = 0
+        # (history_epoch, generation, rows) the sidecar holds, so refreshes only append new rows
+        self._sidecar_state = None
+        self.history_range = None
         self.price_data = None
-        self.price_history = []
-        self.timestamps = []
+        self.store = PriceSeriesStore()
+        self.indicators = IndicatorEngine()
+        self.bars = OHLCVResampler()
+        self.risk = RiskAnalytics()
+        self._file_signature = None
+        self._torn_signature = None
+        self._last_entry_key = None
+        self._timestamp_cache = {}
+        self._timestamp_format = None
+        self.rejected_rows = []
+        self.data_version = 0
+        self.history_epoch = 0
+        self._date_column = (None, None)
+        self._pyramids = {}
+        self._returns = (None, None)
+        self._simulation = (None, None)
+        self._smooth_cache = OrderedDict()
+        self.smoothing_method = 'pchip'
         self.colors = {
             'background': '#0A0A0A',
             'panel': '#1A1A1A',
@@ -31,86 +1902,765 @@ class ProfessionalPHXAnalyzer:
             'grid': '#2A2A2A',
             'accent': '#8B5CF6'
         }
+    
+    @property
+    def price_history(self):
+        """Price column as a zero-copy float64 view"""
+        return self.store.prices
+    
+    @property
+    def timestamps(self):
+        """Timestamp column as a zero-copy datetime64[ns] view"""
+        return self.store.timestamps
+        
+    def _detect_timestamp_format(self, samples):
+        """Return the first known format that parses any of the sample strings"""
+        for sample in samples:
+            for fmt in TIMESTAMP_FORMATS:
+                try:
+                    datetime.strptime(sample, fmt)
+                    return fmt
+                except (TypeError, ValueError):
+                    continue
+        return None
+    
+    @instrumented('parse_timestamps')
+    def parse_timestamps(self, values):
+        """Parse a column of timestamp strings into epoch-ns int64 values.
+        
+        Each distinct string is parsed once and memoized; unparseable values
+        come back as NAT_NS.
+        """
+        cache = self._timestamp_cache
+        pending = [value for value in dict.fromkeys(values) if value not in cache]
+        if pending and len(cache) + len(pending) > TIMESTAMP_CACHE_SIZE:
+            cache.clear()
+            pending = list(dict.fromkeys(values))
+        INSTRUMENTATION.count('timestamps.new', len(pending))
         
+        if pending:
+            normalized = [value.replace('\u202f', ' ') if isinstance(value, str) else ''
+                          for value in pending]
+            if self._timestamp_format is None:
+                self._timestamp_format = self._detect_timestamp_format(normalized[:50])
+            
+            parsed = np.full(len(pending), NAT_NS, dtype=np.int64)
+            formats = [self._timestamp_format] if self._timestamp_format else []
+            formats += [fmt for fmt in TIMESTAMP_FORMATS if fmt not in formats]
+            
+            # Vectorized parse with the detected format, retrying leftovers with the others
+            for fmt in formats:
+                remaining = np.flatnonzero(parsed == NAT_NS)
+                if len(remaining) == 0:
+                    break
+                converted = pd.to_datetime([normalized[i] for i in remaining],
+                                           format=fmt, errors='coerce')
+                parsed[remaining] = np.asarray(converted, dtype='datetime64[ns]').view(np.int64)
+            
+            cache.update(zip(pending, parsed.tolist()))
+        
+        return np.fromiter((cache[value] for value in values), np.int64, len(values))
+    
     def parse_timestamp(self, timestamp_str):
-        """Parse timestamp with AM/PM format"""
+        """Parse a single timestamp, returning None when no known format matches.
+        
+        One string is parsed with strptime, which is far cheaper than a pandas call;
+        columns go through parse_timestamps.
+        """
+        value = self._timestamp_cache.get(timestamp_str)
+        if value is None:
+            normalized = timestamp_str.replace('\u202f', ' ') if isinstance(timestamp_str, str) else ''
+            formats = [self._timestamp_format] if self._timestamp_format else []
+            formats += [fmt for fmt in TIMESTAMP_FORMATS if fmt not in formats]
+            value = NAT_NS
+            for fmt in formats:
+                try:
+                    parsed = datetime.strptime(normalized, fmt)
+                except ValueError:
+                    continue
+                value = (parsed - datetime(1970, 1, 1)) // timedelta(microseconds=1) * 1000
+                break
+            if len(self._timestamp_cache) >= TIMESTAMP_CACHE_SIZE:
+                self._timestamp_cache.clear()
+            self._timestamp_cache[timestamp_str] = value
+        if value == NAT_NS:
+            return None
+        return datetime(1970, 1, 1) + timedelta(microseconds=value // 1000)
+    
+    def _entry_key(self, entry):
+        """Identity of a priceHistory record, used to find where new records start"""
+        return (entry.get('timestamp'), entry.get('price'),
+                entry.get('totalTransactions'), entry.get('volume24h'))
+    
+    def _iter_price_entries(self, path):
+        """Yield priceHistory records, streaming large files instead of parsing them whole"""
+        if os.path.getsize(path) < STREAMING_THRESHOLD:
+            with open(path, 'r') as f:
+                document = json.load(f)
+            history = document.pop('priceHistory', [])
+            self.price_data = document
+            yield from history
+        else:
+            self.price_data = {}
+            yield from iter_price_history(path, self.price_data)
+    
+    def _read_new_entries(self, path, anchor):
+        """Parse ``path``, returning whether ``anchor`` was found and the records after it"""
+        anchor_found = False
+        new_entries = []
+        
+        # Only records after the last occurrence of the anchor are new
+        for entry in self._iter_price_entries(path):
+            if anchor is not None and self._entry_key(entry) == anchor:
+                anchor_found = True
+                new_entries = []
+            else:
+                new_entries.append(entry)
+        return anchor_found, new_entries
+    
+    def _file_signature_of(self, path):
+        """Cheap change signature (size, mtime, inode), or None if the file is missing"""
         try:
-            return datetime.strptime(timestamp_str, '%m/%d/%Y, %I:%M:%S %p')
-        except ValueError:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    
+    def _tail_complete(self, path, signature):
+        """Check the document ends with its closing brace, i.e. no write is half done"""
+        if not signature or signature[0] == 0:
+            return False
+        with open(path, 'rb') as f:
+            f.seek(max(signature[0] - TAIL_CHECK_BYTES, 0))
+            return f.read().rstrip().endswith(b'}')
+    
+    @instrumented('read_json')
+    def _read_snapshot(self, path, anchor):
+        """Read a file the JS writers may be rewriting in place.
+        
+        A read only counts if the tail is complete and the signature did not
+        change while parsing; otherwise it is retried with exponential backoff.
+        Returns (signature, anchor_found, new_entries), or None if every attempt failed.
+        """
+        delay = READ_BACKOFF
+        for attempt in range(READ_RETRIES):
+            if attempt:
+                time.sleep(delay)
+                delay *= 2
+            before = self._file_signature_of(path)
             try:
-                return datetime.strptime(timestamp_str, '%m/%d/%Y, %H:%M:%S')
-            except ValueError:
-                print(f"WARNING: Could not parse timestamp: {timestamp_str}")
-                return datetime.now()
+                if not self._tail_complete(path, before):
+                    continue
+                anchor_found, new_entries = self._read_new_entries(path, anchor)
+            except (OSError, ValueError):
+                continue
+            if self._file_signature_of(path) == before:
+                return before, anchor_found, new_entries
+        return None
+    
+    def _fallback_paths(self):
+        """Snapshot files to use when the live data file cannot be read, newest first"""
+        directory = os.path.dirname(os.path.abspath(self.data_file))
+        candidates = [self.data_file + '.fallback']
+        candidates += [os.path.join(directory, name) for name in FALLBACK_FILES]
+        existing = [path for path in dict.fromkeys(candidates) if os.path.exists(path)]
+        return sorted(existing, key=os.path.getmtime, reverse=True)
+    
+    def _load_sidecar(self):
+        """Memory-map the cached columns, returning the metadata or None when unusable"""
+        meta_path = os.path.join(self.cache_dir, 'meta.json')
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if meta.get('version') != CACHE_VERSION:
+                return None
+            columns = {}
+            for name, dtype in PriceSeriesStore.COLUMNS.items():
+                path = os.path.join(self.cache_dir, f"{name}-{meta['generation']}.bin")
+                # Rows past meta['rows'] belong to an append that never reached the metadata
+                if os.path.getsize(path) < meta['rows'] * np.dtype(dtype).itemsize:
+                    return None
+                columns[name] = (np.memmap(path, dtype, 'r', shape=(meta['rows'],)) if meta['rows']
+                                 else np.empty(0, dtype))
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        self.store.attach(columns)
+        self._file_signature = tuple(meta['signature']) if meta['signature'] else None
+        self._last_entry_key = tuple(meta['last_entry']) if meta['last_entry'] else None
+        self._timestamp_format = meta.get('timestamp_format')
+        return meta
+    
+    def _write_sidecar(self):
+        """Bring the binary sidecar up to date with the store, then swap the metadata.
+        
+        Rows loaded since the last write are appended to the raw column files
+        of the current generation, so a refresh costs O(new rows). When the
+        store was rebuilt (history_epoch changed) or the sidecar is not the
+        one this analyzer wrote, every column is written under a new generation.
+        """
+        meta_path = os.path.join(self.cache_dir, 'meta.json')
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            on_disk = None
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r') as f:
+                    on_disk = json.load(f)
+            
+            appended = False
+            if self._sidecar_state is not None and on_disk is not None:
+                epoch, generation, rows = self._sidecar_state
+                appended = (epoch == self.history_epoch and rows <= len(self.store) and
+                            on_disk.get('version') == CACHE_VERSION and
+                            (on_disk.get('generation'), on_disk.get('rows')) == (generation, rows))
+            if appended:
+                for name, column in self.store.columns(rows).items():
+                    with open(os.path.join(self.cache_dir, f"{name}-{generation}.bin"), 'r+b') as f:
+                        f.truncate(rows * column.itemsize)
+                        f.seek(0, os.SEEK_END)
+                        f.write(np.ascontiguousarray(column).tobytes())
+            else:
+                generation = on_disk.get('generation', 0) + 1 if on_disk else 0
+                for name, column in self.store.columns().items():
+                    with open(os.path.join(self.cache_dir, f"{name}-{generation}.bin"), 'wb') as f:
+                        f.write(np.ascontiguousarray(column).tobytes())
+            
+            meta = {
+                'version': CACHE_VERSION,
+                'generation': generation,
+                'rows': len(self.store),
+                'signature': list(self._file_signature) if self._file_signature else None,
+                'last_entry': list(self._last_entry_key) if self._last_entry_key else None,
+                'timestamp_format': self._timestamp_format,
+            }
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + '.tmp', meta_path)
+            self._sidecar_state = (self.history_epoch, generation, len(self.store))
+            if appended:
+                return
+            
+            # Older generations (and .npy columns of version 2) may still be mapped, and locked on Windows;
+            # retry next time
+            current = {f"{name}-{generation}.bin" for name in PriceSeriesStore.COLUMNS}
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith(('.bin', '.npy')) and filename not in current:
+                    try:
+                        os.remove(os.path.join(self.cache_dir, filename))
+                    except OSError:
+                        pass
+        except (OSError, ValueError) as e:
+            print(f"WARNING: COULD NOT WRITE CACHE '{self.cache_dir}': {e}")
+    
+    @instrumented('load_data')
+    def load_data(self, full_reload=False, verbose=True, persist=True):
+        """Load price data from JSON file, appending only records added since the last load.
         
-    def load_data(self):
-        """Load price data from JSON file"""
+        ``persist`` controls whether the binary sidecar is updated afterwards.
+        """
+        if self.sources:
+            return self._load_sources(full_reload, verbose, persist)
         try:
-            if not os.path.exists(self.data_file):
+            signature = self._file_signature_of(self.data_file)
+            if signature is None and not self._fallback_paths():
                 print(f"DATA FILE '{self.data_file}' NOT FOUND.")
                 print("PLEASE ENSURE PHX WALLET OR CENTRAL BANK HAS BEEN RUN FIRST.")
                 return False
-                
-            with open(self.data_file, 'r') as f:
-                self.price_data = json.load(f)
-                
-            self.price_history = []
-            self.timestamps = []
             
-            for entry in self.price_data.get('priceHistory', []):
-                self.price_history.append(entry['price'])
-                self.timestamps.append(self.parse_timestamp(entry['timestamp']))
+            # Cold start: resume from the binary sidecar, then only parse what changed since
+            from_cache = False
+            meta = None if full_reload or len(self.store) else self._load_sidecar()
+            if meta:
+                from_cache = True
+                self.indicators.reset()
+                self.bars.reset()
+                self.risk.reset()
+                self.history_epoch += 1
+                self._sidecar_state = (self.history_epoch, meta['generation'], meta['rows'])
+                if signature == self._file_signature:
+                    self.data_version += 1
+                    if verbose:
+                        print(f"LOADED {len(self.store)} PRICE POINTS FROM CACHE")
+                    return True
+            
+            if not full_reload and len(self.store) and signature == self._file_signature:
+                if verbose:
+                    print(f"NO NEW DATA - {len(self.price_history)} PRICE POINTS")
+                return True
+            if not full_reload and len(self.store) and signature == self._torn_signature:
+                if verbose:
+                    print("DATA FILE STILL INCOMPLETE - KEEPING PREVIOUS DATA")
+                return True
+            
+            anchor = None if full_reload else self._last_entry_key
+            snapshot = None
+            if signature is not None:
+                snapshot = self._read_snapshot(self.data_file, anchor)
+            
+            if snapshot is None:
+                # Remember the torn version so polling does not re-parse it until it changes
+                self._torn_signature = signature
+                if len(self.store):
+                    print("WARNING: DATA FILE INCOMPLETE OR BEING REWRITTEN - KEEPING PREVIOUS DATA")
+                    return True
+                for path in self._fallback_paths():
+                    snapshot = self._read_snapshot(path, anchor)
+                    if snapshot is not None:
+                        print(f"WARNING: USING FALLBACK SNAPSHOT '{path}'")
+                        # Leave the signature unset so the next refresh retries the live file
+                        snapshot = (None,) + snapshot[1:]
+                        break
+                else:
+                    print(f"ERROR LOADING DATA: '{self.data_file}' IS INCOMPLETE AND NO FALLBACK IS READABLE")
+                    return False
+            
+            signature, anchor_found, new_entries = snapshot
+            self._torn_signature = None
+            
+            if not anchor_found:
+                # First load, forced reload or the file no longer overlaps what we hold
+                self.store.clear()
+                self.indicators.reset()
+                self.bars.reset()
+                self.risk.reset()
+                self.history_epoch += 1
+                self._archived_rows = 0
+                self.history_range = None
+            
+            if new_entries:
+                self._last_entry_key = self._entry_key(new_entries[-1])
+            elif not anchor_found:
+                self._last_entry_key = None
+            self._file_signature = signature
+            
+            self.rejected_rows = []
+            if new_entries:
+                timestamps = self.parse_timestamps([entry.get('timestamp') for entry in new_entries])
+                valid = timestamps != NAT_NS
+                if not valid.all():
+                    self.rejected_rows = [(new_entries[i].get('price'), new_entries[i].get('timestamp'))
+                                          for i in np.flatnonzero(~valid)]
+                    new_entries = [entry for entry, ok in zip(new_entries, valid) if ok]
+                    timestamps = timestamps[valid]
+                if new_entries:
+                    self.store.extend_entries(new_entries, timestamps)
             
-            print(f"LOADED {len(self.price_history)} PRICE POINTS")
+            if self.rejected_rows and verbose:
+                self.print_rejected_summary()
+            
+            if persist:
+                self._archive_new_rows()
+                # Archived history is not cached; it is read back from the archive
+                if self.history_range is None:
+                    self._write_sidecar()
+            self.data_version += 1
+            
+            if verbose:
+                if from_cache and anchor_found:
+                    print(f"LOADED {len(self.store)} PRICE POINTS FROM CACHE "
+                          f"(+{len(new_entries)} NEW)")
+                elif anchor_found:
+                    print(f"APPENDED {len(new_entries)} NEW PRICE POINTS "
+                          f"({len(self.price_history)} TOTAL)")
+                else:
+                    print(f"LOADED {len(self.price_history)} PRICE POINTS")
             return True
             
         except Exception as e:
             print(f"ERROR LOADING DATA: {e}")
             return False
     
-    def smooth_data(self, x, y, smoothing_factor=300):
-        """Create smooth interpolated curve"""
+    def _load_sources(self, full_reload, verbose, persist):
+        """Refresh every source and merge their histories into this analyzer's store"""
+        before = [(len(source.store), source.history_epoch) for source in self.sources]
+        loaded = [source.load_data(full_reload, verbose=False, persist=persist) for source in self.sources]
+        if not any(loaded):
+            print("ERROR LOADING DATA: NO SOURCE COULD BE READ")
+            return False
+        
+        changed = [(len(source.store), source.history_epoch) != state
+                   for source, state in zip(self.sources, before)]
+        if not full_reload and len(self.store) and not any(changed):
+            if verbose:
+                print(f"NO NEW DATA - {len(self.store)} PRICE POINTS")
+            return True
+        
+        # New rows strictly after everything merged so far can simply be appended
+        rebuilt = full_reload or len(self.store) == 0 or any(
+            source.history_epoch != epoch for source, (_, epoch) in zip(self.sources, before))
+        duplicates = 0
+        if not rebuilt:
+            fresh, duplicates = merge_price_columns(
+                [source.store.columns(count) for source, (count, _) in zip(self.sources, before)])
+            last_ns = self.store.column('timestamp_ns')[-1]
+            if len(fresh['price']) and fresh['timestamp_ns'][0] <= last_ns:
+                rebuilt = True
+            else:
+                self.store.extend(fresh)
+        
+        if rebuilt:
+            merged, duplicates = merge_price_columns([source.store.columns() for source in self.sources])
+            self.store.clear()
+            self.store.extend(merged)
+            self.indicators.reset()
+            self.bars.reset()
+            self.risk.reset()
+            self.history_epoch += 1
+            self.history_range = None
+        
+        self.data_version += 1
+        if verbose:
+            print(f"LOADED {len(self.store)} PRICE POINTS FROM {sum(loaded)}/{len(self.sources)} SOURCES "
+                  f"({duplicates} DUPLICATES DROPPED)")
+        return True
+    
+    def _archive_new_rows(self):
+        """Offer the rows loaded since the last call to the history archive"""
+        if self._archived_rows > len(self.store):
+            self._archived_rows = 0
+        try:
+            self.archive.append(self.store.columns(self._archived_rows))
+        except (OSError, ValueError) as e:
+            print(f"WARNING: COULD NOT ARCHIVE TO '{self.archive.directory}': {e}")
+        self._archived_rows = len(self.store)
+    
+    def _archives(self):
+        return [source.archive for source in self.sources] if self.sources else [self.archive]
+    
+    def _history_chunks(self, start=None, end=None):
+        """Yield archived columns with timestamps in [start, end] in time order, a segment at a time.
+        
+        Several sources are merged span by span over the union of their segment boundaries.
+        """
+        start_ns = None if start is None else _to_epoch_ns(start)
+        stop_ns = None if end is None else _to_epoch_ns(end) + 1
+        archives = self._archives()
+        if len(archives) == 1:
+            for records in archives[0].chunks(start_ns, stop_ns):
+                yield {name: records[name] for name in PriceSeriesStore.COLUMNS}
+            return
+        bounds = sorted({bound for archive in archives
+                         for segment in archive.segments() for bound in segment[:2]})
+        for lo, hi in zip(bounds, bounds[1:]):
+            lo = lo if start_ns is None else max(lo, start_ns)
+            hi = hi if stop_ns is None else min(hi, stop_ns)
+            if hi <= lo:
+                continue
+            parts = [{name: records[name] for name in PriceSeriesStore.COLUMNS}
+                     for archive in archives for records in archive.chunks(lo, hi)]
+            merged, _ = merge_price_columns(parts)
+            if len(merged['price']):
+                yield merged
+    
+    def load_history(self, start=None, end=None, verbose=True):
+        """Replace the loaded series with the archived history in [start, end].
+        
+        Only the segments overlapping the window are read. Later refreshes
+        append new ticks as usual, but no longer rewrite the binary sidecar.
+        """
+        chunks = list(self._history_chunks(start, end))
+        if not chunks:
+            if verbose:
+                print("NO ARCHIVED HISTORY IN THE REQUESTED RANGE")
+            return False
+        self.store.clear()
+        self.store._reserve(sum(len(chunk['price']) for chunk in chunks))
+        for chunk in chunks:
+            self.store.extend(chunk)
+        self.indicators.reset()
+        self.bars.reset()
+        self.risk.reset()
+        self.history_epoch += 1
+        self.data_version += 1
+        self._archived_rows = len(self.store)
+        self.history_range = (start, end)
+        if verbose:
+            print(f"LOADED {len(self.store)} ARCHIVED PRICE POINTS")
+        return True
+    
+    def _summarize(self, start=None, end=None, history=False):
+        """Summary-only indicator engine over a window, plus its first and last timestamps (ns).
+        
+        ``history`` reads the archive a segment at a time, so memory stays bounded on long ranges.
+        """
+        if history:
+            chunks = self._history_chunks(start, end)
+        else:
+            rows = self.store.range_slice(start, end)
+            chunks = [self.store.columns(rows.start, rows.stop)]
+        engine = IndicatorEngine()
+        first_ns = last_ns = None
+        for columns in chunks:
+            if len(columns['price']) == 0:
+                continue
+            engine.extend(columns['price'], summary_only=True)
+            first_ns = columns['timestamp_ns'][0] if first_ns is None else first_ns
+            last_ns = columns['timestamp_ns'][-1]
+        return engine, first_ns, last_ns
+    
+    def print_rejected_summary(self, limit=5):
+        """Report rows dropped during the last load because their timestamp could not be parsed"""
+        print(f"WARNING: REJECTED {len(self.rejected_rows)} ROWS WITH UNPARSEABLE TIMESTAMPS")
+        for price, raw in self.rejected_rows[:limit]:
+            print(f"  PRICE {price}  TIMESTAMP {raw!r}")
+        if len(self.rejected_rows) > limit:
+            print(f"  ... AND {len(self.rejected_rows) - limit} MORE")
+    
+    @instrumented('smooth_data')
+    def smooth_data(self, x, y, smoothing_factor=300, method=None, key=None):
+        """Create smooth interpolated curve.
+        
+        Uses a local-support smoother from SMOOTHING_METHODS, so the cost is
+        linear in the input and the output has ``smoothing_factor`` points.
+        Results are cached when ``key`` names the series being smoothed.
+        """
         if len(x) < 4:
             return x, y
         
         try:
             # Convert datetime to numeric for interpolation
-            x_numeric = mdates.date2num(x)
+            is_dates = not np.issubdtype(np.asarray(x).dtype, np.number)
+            x_numeric = mdates.date2num(x) if is_dates else np.asarray(x, dtype=np.float64)
+            method = method or self.smoothing_method
+            
+            cache_key = None
+            if key is not None:
+                cache_key = (key, method, smoothing_factor, len(x_numeric),
+                             x_numeric[0], x_numeric[-1], self.data_version)
+                if cache_key in self._smooth_cache:
+                    self._smooth_cache.move_to_end(cache_key)
+                    x_smooth, y_smooth = self._smooth_cache[cache_key]
+                    return (mdates.num2date(x_smooth) if is_dates else x_smooth), y_smooth
+            
+            # Interpolators need strictly increasing x; bound the input by the output size
+            x_fit, y_fit = _collapse_duplicates(x_numeric, np.asarray(y, dtype=np.float64))
+            x_fit, y_fit = _bucket_means(x_fit, y_fit, 2 * smoothing_factor)
+            if len(x_fit) < 4:
+                return x, y
             
             # Create smooth curve
-            x_smooth = np.linspace(x_numeric.min(), x_numeric.max(), smoothing_factor)
-            spl = make_interp_spline(x_numeric, y, k=min(3, len(x)-1))
-            y_smooth = spl(x_smooth)
+            x_smooth = np.linspace(x_fit[0], x_fit[-1], smoothing_factor)
+            INSTRUMENTATION.count('smooth.fits')
+            y_smooth = SMOOTHING_METHODS[method](x_fit, y_fit, x_smooth)
+            
+            if cache_key is not None:
+                self._smooth_cache[cache_key] = (x_smooth, y_smooth)
+                if len(self._smooth_cache) > SMOOTH_CACHE_SIZE:
+                    self._smooth_cache.popitem(last=False)
             
             # Convert back to datetime
+            if not is_dates:
+                return x_smooth, y_smooth
             x_smooth_dates = mdates.num2date(x_smooth)
             
             return x_smooth_dates, y_smooth
-        except:
+        except Exception:
             return x, y
     
-    def _enable_zoom(self, ax, fig):
-        """Enable scroll wheel zoom and click-drag pan"""
+    def _date_numbers(self):
+        """Timestamps as matplotlib date numbers, converted only for points added since last call"""
+        if self._date_column[0] != self.history_epoch:
+            self._date_column = (self.history_epoch, _DerivedColumns())
+        column = self._date_column[1]
+        if len(column) < len(self.store):
+            column.extend({'date_num': mdates.date2num(self.timestamps[len(column):])})
+        return column.column('date_num')
+    
+    def _pyramid(self, key, y):
+        """Decimation pyramid of the series ``key``, extended to the current ``y``"""
+        epoch, pyramid = self._pyramids.get(key, (None, None))
+        if epoch != self.history_epoch or pyramid.size > len(y):
+            pyramid = DecimationPyramid(y)
+            self._pyramids[key] = (self.history_epoch, pyramid)
+        elif pyramid.size < len(y):
+            pyramid.extend(y)
+        return pyramid
+    
+    def _visible_range(self, ax, x):
+        """Positions [start, stop) of ``x`` inside the x-range of ``ax``, plus one point either side"""
+        x0, x1 = ax.get_xlim() if getattr(ax, '_lod_ready', False) else (x[0], x[-1])
+        start = max(np.searchsorted(x, x0, side='left') - 1, 0)
+        stop = np.searchsorted(x, x1, side='right') + 1
+        return start, stop
+    
+    def _lod_indices(self, ax, key, x, y):
+        """Positions of a series worth drawing for the visible x-range and pixel width of ``ax``"""
+        pyramid = self._pyramid(key, y)
+        start, stop = self._visible_range(ax, x)
+        return pyramid.indices(start, stop, self._axes_buckets(ax))
+    
+    def _register_extent(self, ax, key, source, baseline=None):
+        """Let ``source`` (returning x, y) bound the fitted y-range of ``ax``, optionally with a baseline"""
+        if not hasattr(ax, '_extent_sources'):
+            ax._extent_sources = []
+        ax._extent_sources.append((key, source, baseline))
+    
+    def _fit_ylim(self, ax):
+        """Fit the y-range of ``ax`` to its registered series within the visible x-range.
+        
+        Each series answers from its decimation pyramid in O(log n), so this can run on every zoom event.
+        """
+        low, high = np.inf, -np.inf
+        for key, source, baseline in getattr(ax, '_extent_sources', ()):
+            x, y = source()[:2]
+            if len(y) == 0:
+                continue
+            start, stop = self._visible_range(ax, x)
+            series_low, series_high = self._pyramid(key, y).extrema(y, start, stop)
+            if baseline is not None:
+                series_low, series_high = min(series_low, baseline), max(series_high, baseline)
+            low, high = min(low, series_low), max(high, series_high)
+        if not np.isfinite(low) or not np.isfinite(high):
+            return False
+        margin = (high - low) * Y_FIT_MARGIN or abs(high) * Y_FIT_MARGIN or 1
+        ax.set_ylim(low - margin, high + margin)
+        return True
+    
+    def _axes_buckets(self, ax):
+        """Output resolution for series drawn on ``ax``: one bucket per pixel of width"""
+        return max(int(ax.get_window_extent().width), 100)
+    
+    def _price_source(self):
+        """Current (x, y) of the price series for _plot_lod"""
+        return self._date_numbers(), self.price_history
+    
+    def _indicator_source(self, name, window):
+        """Source for _plot_lod over an indicator column, skipping its warm-up NaNs"""
+        return lambda: (self._date_numbers()[window - 1:], self.indicators.column(name)[window - 1:])
+    
+    def _risk_source(self, name):
+        """Source for _plot_lod over a risk analytics column"""
+        def source():
+            self._sync_risk()
+            return self._date_numbers(), self.risk.column(name)
+        return source
+    
+    def _percent_returns(self):
+        """Percentage returns between consecutive prices and their largest magnitude, recomputed only after new data"""
+        key = (self.history_epoch, len(self.store))
+        if self._returns[0] != key:
+            prices = self.price_history
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = np.diff(prices) / prices[:-1] * 100
+            returns[~np.isfinite(returns)] = 0
+            largest = np.abs(returns).max() if len(returns) else 0
+            self._returns = (key, (returns, largest))
+        return self._returns[1]
+    
+    def _returns_source(self):
+        """Percentage returns with their date numbers and largest magnitude"""
+        returns, largest = self._percent_returns()
+        return self._date_numbers()[1:], returns, largest
+    
+    def _lod_artists(self, ax):
+        """Artists on ``ax`` that are redrawn by the level-of-detail updates"""
+        return [artist for artist in ax.get_children() if getattr(artist, '_phx_lod', False)]
+    
+    def _plot_lod(self, ax, key, source, smooth=True, fill=None, fit=True, **plot_kwargs):
+        """Plot a series decimated to the axes' pixel width, re-decimating as the view changes.
+        
+        ``source`` returns the current (x, y) arrays, so points appended later are picked up.
+        ``fit`` lets the series bound the fitted y-range.
+        """
+        line, = ax.plot([], [], **plot_kwargs)
+        line._phx_lod = True
+        artists = {}
+        if fit:
+            self._register_extent(ax, key, source)
+        
+        def update():
+            x, y = source()
+            if len(y) == 0:
+                return
+            idx = self._lod_indices(ax, key, x, y)
+            INSTRUMENTATION.count('lod.points', len(idx))
+            xs, ys = x[idx], y[idx]
+            if smooth:
+                xs, ys = self.smooth_data(xs, ys, self._axes_buckets(ax), key=key)
+            line.set_data(xs, ys)
+            if fill is not None:
+                if 'fill' in artists:
+                    artists['fill'].remove()
+                artists['fill'] = ax.fill_between(xs, ys, animated=line.get_animated(), **fill)
+                artists['fill']._phx_lod = True
+        
+        self._register_lod(ax, update)
+    
+    def _register_lod(self, ax, update):
+        """Run ``update`` now and, once the axes is finished, whenever its x-range changes"""
+        update()
+        if not hasattr(ax, '_lod_updates'):
+            ax._lod_updates = []
+        ax._lod_updates.append(update)
+    
+    def _finish_lod(self, ax):
+        """Fix the x-range to the plotted data and start re-decimating on view changes"""
+        ax.relim()
+        ax.autoscale_view()
+        ax.get_xlim()
+        ax.set_autoscalex_on(False)
+        ax._lod_ready = True
+        ax._lod_busy = False
+        
+        self._fit_ylim(ax)
+        
+        def on_xlim_changed(changed_ax):
+            if changed_ax._lod_busy:
+                return
+            changed_ax._lod_busy = True
+            try:
+                for callback in changed_ax._lod_updates:
+                    callback()
+                self._fit_ylim(changed_ax)
+            finally:
+                changed_ax._lod_busy = False
+        
+        ax.callbacks.connect('xlim_changed', instrumented('zoom.relevel')(on_xlim_changed))
+    
+    def _instrument_draw(self, fig):
+        """Time every full redraw of ``fig`` (layout and rasterization) as the 'figure.draw' stage"""
+        if not getattr(fig, '_phx_timed', False):
+            fig.draw = instrumented('figure.draw')(fig.draw)
+            fig._phx_timed = True
+    
+    def _enable_zoom(self, ax, fig, zoom_y=True):
+        """Enable scroll wheel zoom and click-drag pan.
+        
+        Events only update a pending view, applied once per frame. Axes with
+        registered series refit their y-range to the visible data as x changes;
+        ``zoom_y=False`` keeps a fixed scale such as a correlation's [-1, 1].
+        """
         # Store original limits
         ax._original_xlim = ax.get_xlim()
         ax._original_ylim = ax.get_ylim()
         ax._pan_start = None
+        pending = {'xlim': None, 'ylim': None}
+        
+        def apply_view():
+            if pending['xlim'] is None:
+                return
+            xlim, ylim = pending['xlim'], pending['ylim']
+            pending['xlim'] = pending['ylim'] = None
+            ax.set_xlim(xlim)
+            if zoom_y and not getattr(ax, '_extent_sources', None):
+                ax.set_ylim(ylim)
+        
+        throttle = _FrameThrottle(fig.canvas, apply_view)
+        
+        def view():
+            """Limits including changes not applied yet, so a burst of events composes"""
+            return pending['xlim'] or ax.get_xlim(), pending['ylim'] or ax.get_ylim()
         
         def on_scroll(event):
             """Handle scroll wheel zoom"""
             if event.inaxes != ax:
-                return
-            
-            # Get current axis limits
-            cur_xlim = ax.get_xlim()
-            cur_ylim = ax.get_ylim()
+                return
             
-            # Get event location
-            xdata = event.xdata
-            ydata = event.ydata
+            # Get current axis limits
+            cur_xlim, cur_ylim = view()
             
-            if xdata is None or ydata is None:
-                return
+            # Event location as a fraction of the axes, valid for pending limits too
+            x_ratio, y_ratio = ax.transAxes.inverted().transform((event.x, event.y))
             
             # Zoom factor
             zoom_factor = 1.2 if event.button == 'down' else 0.8
@@ -120,15 +2670,12 @@ class ProfessionalPHXAnalyzer:
             y_range = (cur_ylim[1] - cur_ylim[0]) * zoom_factor
             
             # Center zoom on mouse position
-            x_ratio = (xdata - cur_xlim[0]) / (cur_xlim[1] - cur_xlim[0])
-            y_ratio = (ydata - cur_ylim[0]) / (cur_ylim[1] - cur_ylim[0])
-            
-            new_xlim = [xdata - x_range * x_ratio, xdata + x_range * (1 - x_ratio)]
-            new_ylim = [ydata - y_range * y_ratio, ydata + y_range * (1 - y_ratio)]
+            xdata = cur_xlim[0] + (cur_xlim[1] - cur_xlim[0]) * x_ratio
+            ydata = cur_ylim[0] + (cur_ylim[1] - cur_ylim[0]) * y_ratio
             
-            ax.set_xlim(new_xlim)
-            ax.set_ylim(new_ylim)
-            fig.canvas.draw_idle()
+            pending['xlim'] = [xdata - x_range * x_ratio, xdata + x_range * (1 - x_ratio)]
+            pending['ylim'] = [ydata - y_range * y_ratio, ydata + y_range * (1 - y_ratio)]
+            throttle.request()
         
         def on_press(event):
             """Handle mouse button press"""
@@ -140,69 +2687,121 @@ class ProfessionalPHXAnalyzer:
                 ax._pan_start = (event.xdata, event.ydata)
             # Double-click to reset
             elif event.dblclick:
-                ax.set_xlim(ax._original_xlim)
-                ax.set_ylim(ax._original_ylim)
-                fig.canvas.draw_idle()
+                pending['xlim'], pending['ylim'] = ax._original_xlim, ax._original_ylim
+                throttle.request()
         
         def on_motion(event):
             """Handle mouse motion for panning"""
             if ax._pan_start is None or event.inaxes != ax:
                 return
             
+            # Offsets are measured against the applied limits, so the latest event replaces earlier ones
             dx = event.xdata - ax._pan_start[0]
             dy = event.ydata - ax._pan_start[1]
             
             cur_xlim = ax.get_xlim()
             cur_ylim = ax.get_ylim()
             
-            ax.set_xlim([cur_xlim[0] - dx, cur_xlim[1] - dx])
-            ax.set_ylim([cur_ylim[0] - dy, cur_ylim[1] - dy])
-            
-            fig.canvas.draw_idle()
+            pending['xlim'] = [cur_xlim[0] - dx, cur_xlim[1] - dx]
+            pending['ylim'] = [cur_ylim[0] - dy, cur_ylim[1] - dy]
+            throttle.request()
         
         def on_release(event):
             """Handle mouse button release"""
             ax._pan_start = None
         
         # Connect events
-        fig.canvas.mpl_connect('scroll_event', on_scroll)
-        fig.canvas.mpl_connect('button_press_event', on_press)
-        fig.canvas.mpl_connect('motion_notify_event', on_motion)
-        fig.canvas.mpl_connect('button_release_event', on_release)
-    
-    def get_statistics(self):
-        """Calculate comprehensive price statistics"""
-        if not self.price_history:
+        fig.canvas.mpl_connect('scroll_event', instrumented('zoom.scroll')(on_scroll))
+        fig.canvas.mpl_connect('button_press_event', instrumented('zoom.press')(on_press))
+        fig.canvas.mpl_connect('motion_notify_event', instrumented('zoom.pan')(on_motion))
+        fig.canvas.mpl_connect('button_release_event', instrumented('zoom.release')(on_release))
+        self._instrument_draw(fig)
+    
+    def _sync_indicators(self):
+        """Feed prices the indicator engine has not seen yet; a no-op when it is current"""
+        seen = self.indicators.count
+        if seen < len(self.store):
+            self.indicators.extend(self.store.prices[seen:])
+    
+    def _sync_bars(self):
+        """Feed ticks the OHLCV resampler has not seen yet; a no-op when it is current"""
+        seen = self.bars.count
+        if seen < len(self.store):
+            self.bars.extend(self.store.columns(seen))
+    
+    def _sync_risk(self):
+        """Feed ticks the risk analytics have not seen yet; a no-op when they are current"""
+        seen = self.risk.count
+        if seen < len(self.store):
+            self.risk.extend(self.store.columns(seen))
+    
+    def get_risk_analytics(self):
+        """Peg deviation against each risk factor: latest rolling correlation and z-scores, full-history correlation"""
+        if len(self.store) == 0:
             return None
-            
-        prices = np.array(self.price_history)
+        self._sync_risk()
+        return self.risk.summary()
+    
+    def risk_series(self):
+        """Per-tick risk analytics columns (see _RiskColumns) as zero-copy views"""
+        self._sync_risk()
+        return self.risk.series.columns()
+    
+    def run_simulation(self, paths=SIMULATION_PATHS, horizon=SIMULATION_HORIZON, seed=None, workers=None):
+        """Monte Carlo paths from the latest price (see PegSimulator), kept for the price chart's fan.
         
-        if len(prices) > 1:
-            returns = np.diff(prices) / prices[:-1] * 100
-            volatility = np.std(returns) if len(returns) > 0 else 0
-            day_change = prices[-1] - prices[-2]
-            day_change_pct = (day_change / prices[-2] * 100) if prices[-2] != 0 else 0
-        else:
-            returns = np.array([0])
-            volatility = 0
-            day_change = 0
-            day_change_pct = 0
+        Returns the simulation summary, or None when there are too few prices to calibrate on.
+        """
+        try:
+            simulator = PegSimulator(self.price_history, self.store.column('timestamp_ns'))
+        except ValueError:
+            return None
+        result = simulator.run(paths, horizon, seed, workers)
+        self._simulation = ((self.history_epoch, len(self.store)), result)
+        return result
+    
+    def _current_simulation(self):
+        """The last simulation, if it started from the series as it is now"""
+        key, result = self._simulation
+        return result if key == (self.history_epoch, len(self.store)) else None
+    
+    def get_bars(self, interval):
+        """OHLCV bars of ``interval`` (a RESAMPLE_INTERVALS key) as zero-copy column views"""
+        self._sync_bars()
+        return self.bars.bars[interval].columns()
+    
+    @instrumented('get_statistics')
+    def get_statistics(self, start=None, end=None, history=False):
+        """Calculate comprehensive price statistics.
         
-        stats = {
-            'current_price': prices[-1] if len(prices) > 0 else 0,
-            'open_price': prices[0] if len(prices) > 0 else 0,
-            'high_price': np.max(prices) if len(prices) > 0 else 0,
-            'low_price': np.min(prices) if len(prices) > 0 else 0,
-            'average_price': np.mean(prices) if len(prices) > 0 else 0,
-            'std_dev': np.std(prices) if len(prices) > 0 else 0,
-            'volatility': volatility,
-            'total_return': ((prices[-1] - prices[0]) / prices[0] * 100) if len(prices) > 1 and prices[0] != 0 else 0,
-            'day_change': day_change,
-            'day_change_pct': day_change_pct,
-            'total_points': len(prices),
-            'variance': np.var(prices) if len(prices) > 0 else 0
-        }
-        return stats
+        ``start``/``end`` restrict them to a time window; ``history`` summarizes
+        the archived history (in that window) rather than the loaded series.
+        """
+        if start is not None or end is not None or history:
+            return self._summarize(start, end, history)[0].statistics()
+        if len(self.store) == 0:
+            return None
+        
+        self._sync_indicators()
+        return self.indicators.statistics()
+    
+    def statistics_record(self, label=None, start=None, end=None, history=False):
+        """get_statistics() plus source and time range as plain JSON-serializable values"""
+        if start is not None or end is not None or history:
+            engine, first_ns, last_ns = self._summarize(start, end, history)
+            stats = engine.statistics()
+        else:
+            stats = self.get_statistics()
+            if stats is not None:
+                first_ns, last_ns = self.store.column('timestamp_ns')[[0, -1]]
+        if stats is None:
+            return None
+        record = {'file': label or ', '.join(self.data_files)}
+        for key, value in stats.items():
+            record[key] = int(value) if key == 'total_points' else round(float(value), 6)
+        timestamps = np.datetime_as_string(np.array([first_ns, last_ns], dtype='datetime64[ns]'), unit='s')
+        record['first_timestamp'], record['last_timestamp'] = timestamps.tolist()
+        return record
     
     def print_terminal_header(self):
         """Print professional terminal header"""
@@ -213,7 +2812,7 @@ class ProfessionalPHXAnalyzer:
     
     def print_market_summary(self):
         """Print market summary in professional format"""
-        if not self.price_history:
+        if len(self.store) == 0:
             print("NO DATA AVAILABLE")
             return
             
@@ -243,6 +2842,15 @@ class ProfessionalPHXAnalyzer:
               f"DATA POINTS: {stats['total_points']:4d}   "
               f"BASE PEG: $100.00")
         
+        print(f"P1:        ${stats['p1']:8.2f}   "
+              f"P5:       ${stats['p5']:8.2f}   "
+              f"MEDIAN:   ${stats['p50']:8.2f}")
+        print(f"P95:       ${stats['p95']:8.2f}   "
+              f"P99:      ${stats['p99']:8.2f}")
+        print(f"VAR 95%:   {stats['var_95']:7.2f}%   "
+              f"VAR 99%:  {stats['var_99']:7.2f}%   "
+              f"ES 95%:   {stats['expected_shortfall_95']:7.2f}%   (PER TICK)")
+        
         print("-" * 80)
     
     def create_main_chart(self):
@@ -250,10 +2858,16 @@ class ProfessionalPHXAnalyzer:
         if len(self.price_history) < 2:
             print("INSUFFICIENT DATA FOR CHART ANALYSIS")
             return
-            
+        
+        self._build_main_figure()
+        plt.show()
+    
+    @instrumented('_build_main_figure')
+    def _build_main_figure(self):
+        """Lay out the main dashboard, returning the figure and its price, stats and distribution axes"""
         plt.style.use('dark_background')
         fig = plt.figure(figsize=(18, 10), facecolor=self.colors['background'])
-        gs = GridSpec(3, 2, figure=fig, hspace=0.35, wspace=0.25)
+        gs = gridspec.GridSpec(3, 2, figure=fig, hspace=0.35, wspace=0.25)
         
         # Main price chart
         ax1 = fig.add_subplot(gs[0:2, :])
@@ -276,24 +2890,22 @@ class ProfessionalPHXAnalyzer:
         self._enable_zoom(ax1, fig)
         self._enable_zoom(ax3, fig)
         
-        plt.tight_layout(rect=[0, 0.03, 1, 1])
-        plt.show()
+        with INSTRUMENTATION.stage('tight_layout'):
+            plt.tight_layout(rect=[0, 0.03, 1, 1])
+        return fig, (ax1, ax2, ax3)
     
+    @instrumented('_create_price_chart')
     def _create_price_chart(self, ax):
         """Create main price chart with smooth curves"""
-        prices = np.array(self.price_history)
-        
-        # Smooth the price line
-        x_smooth, y_smooth = self.smooth_data(self.timestamps, prices)
-        
-        # Plot smooth price line with gradient effect
-        ax.plot(x_smooth, y_smooth, 
-                linewidth=2.5, color=self.colors['price_line'], 
-                label='PHX/USD', alpha=0.9, zorder=3)
+        prices = self.price_history
+        ax.xaxis_date()
+        self._sync_indicators()
         
-        # Add subtle fill under curve
-        ax.fill_between(x_smooth, y_smooth, alpha=0.1, 
-                       color=self.colors['price_line'], zorder=1)
+        # Smooth price line decimated to the axes width, with a subtle fill under the curve
+        self._plot_lod(ax, 'price', self._price_source,
+                       fill=dict(alpha=0.1, color=self.colors['price_line'], zorder=1),
+                       linewidth=2.5, color=self.colors['price_line'],
+                       label='PHX/USD', alpha=0.9, zorder=3)
         
         # Add base price line
         ax.axhline(y=100, color=self.colors['text_secondary'], 
@@ -302,16 +2914,19 @@ class ProfessionalPHXAnalyzer:
         
         # Add moving averages with smooth curves
         if len(prices) > 5:
-            ma5 = pd.Series(prices).rolling(window=min(5, len(prices))).mean()
-            ma5_smooth_x, ma5_smooth_y = self.smooth_data(self.timestamps, ma5)
-            ax.plot(ma5_smooth_x, ma5_smooth_y, color='#00FF88', 
-                   linewidth=1.5, alpha=0.6, label='MA5', zorder=2)
+            self._plot_lod(ax, 'ma5', self._indicator_source('ma5', 5), color='#00FF88',
+                           linewidth=1.5, alpha=0.6, label='MA5', zorder=2)
         
         if len(prices) > 10:
-            ma10 = pd.Series(prices).rolling(window=min(10, len(prices))).mean()
-            ma10_smooth_x, ma10_smooth_y = self.smooth_data(self.timestamps, ma10)
-            ax.plot(ma10_smooth_x, ma10_smooth_y, color='#8B5CF6', 
-                   linewidth=1.5, alpha=0.6, label='MA10', zorder=2)
+            self._plot_lod(ax, 'ma10', self._indicator_source('ma10', 10), color='#8B5CF6',
+                           linewidth=1.5, alpha=0.6, label='MA10', zorder=2)
+        
+        # Monte Carlo fan beyond the last tick, while the simulation matches the data
+        simulation = self._current_simulation()
+        if simulation is not None:
+            self._plot_simulation_fan(ax, simulation)
+        
+        self._finish_lod(ax)
         
         # Minimalist styling
         ax.set_facecolor(self.colors['panel'])
@@ -347,12 +2962,47 @@ class ProfessionalPHXAnalyzer:
         
         ax.yaxis.set_major_formatter(ticker.StrMethodFormatter('${x:.0f}'))
     
+    def _plot_simulation_fan(self, ax, simulation):
+        """Shade the simulated quantile bands from the last tick onwards, with the median path"""
+        steps = simulation['fan_steps']
+        x = self._date_numbers()[-1] + steps * simulation['tick_seconds'] / 86400
+        fan = simulation['fan']
+        color = self.colors['accent']
+        outer, inner = (0, len(fan) - 1), (1, len(fan) - 2)
+        ax.fill_between(x, fan[outer[0]], fan[outer[1]], color=color, alpha=0.12, linewidth=0, zorder=1,
+                        label=f"MC {simulation['fan_quantiles'][outer[0]]:.0%}-{simulation['fan_quantiles'][outer[1]]:.0%}")
+        ax.fill_between(x, fan[inner[0]], fan[inner[1]], color=color, alpha=0.25, linewidth=0, zorder=1)
+        ax.plot(x, fan[len(fan) // 2], color=color, linewidth=1.5, linestyle='--', alpha=0.9,
+                label='MC MEDIAN', zorder=2)
+        
+        # The outer quantiles bound the fitted y-range like any other series
+        run = (self._simulation[0], simulation['seed'], simulation['paths'], simulation['horizon'])
+        for row in outer:
+            self._register_extent(ax, ('fan', row, run), lambda row=row: (x, fan[row]))
+    
+    @instrumented('_create_statistics_panel')
     def _create_statistics_panel(self, ax):
         """Create minimalist statistics panel"""
-        stats = self.get_statistics()
         ax.axis('off')
+        ax._stat_values = []
         
-        stats_data = [
+        y_position = 0.9
+        for label, value, color in self._statistics_rows():
+            ax.text(0.1, y_position, label, transform=ax.transAxes,
+                   fontfamily='monospace', fontsize=9, 
+                   color=self.colors['text_secondary'],
+                   verticalalignment='top', fontweight='300')
+            ax._stat_values.append(
+                ax.text(0.95, y_position, value, transform=ax.transAxes,
+                       fontfamily='monospace', fontsize=10, color=color,
+                       verticalalignment='top', fontweight='500',
+                       horizontalalignment='right'))
+            y_position -= 0.11
+    
+    def _statistics_rows(self):
+        """(label, value, color) rows shown in the statistics panel"""
+        stats = self.get_statistics()
+        return [
             ("LAST", f"${stats['current_price']:.2f}", 
              self.colors['positive'] if stats['day_change'] >= 0 else self.colors['negative']),
             ("HIGH", f"${stats['high_price']:.2f}", self.colors['text']),
@@ -361,34 +3011,31 @@ class ProfessionalPHXAnalyzer:
             ("VOLATILITY", f"{stats['volatility']:.2f}%", self.colors['warning']),
             ("RETURN", f"{stats['total_return']:+.2f}%", 
              self.colors['positive'] if stats['total_return'] >= 0 else self.colors['negative']),
+            ("P5 - P95", f"${stats['p5']:.2f} - ${stats['p95']:.2f}", self.colors['text_secondary']),
+            ("VAR 95%", f"{stats['var_95']:.2f}%", self.colors['negative']),
         ]
-        
-        y_position = 0.9
-        for label, value, color in stats_data:
-            ax.text(0.1, y_position, label, transform=ax.transAxes,
-                   fontfamily='monospace', fontsize=9, 
-                   color=self.colors['text_secondary'],
-                   verticalalignment='top', fontweight='300')
-            ax.text(0.95, y_position, value, transform=ax.transAxes,
-                   fontfamily='monospace', fontsize=10, color=color,
-                   verticalalignment='top', fontweight='500',
-                   horizontalalignment='right')
-            y_position -= 0.15
     
+    def _update_statistics_panel(self, ax):
+        """Refresh the value texts of a panel built by _create_statistics_panel"""
+        for text, (label, value, color) in zip(ax._stat_values, self._statistics_rows()):
+            text.set_text(value)
+            text.set_color(color)
+    
+    @instrumented('_create_distribution_panel')
     def _create_distribution_panel(self, ax):
         """Create minimalist distribution panel"""
-        prices = np.array(self.price_history)
+        stats = self.get_statistics()
         
-        # Create smooth histogram
-        n, bins, patches = ax.hist(prices, bins=20, alpha=0.6, 
-                                  color=self.colors['price_line'], 
-                                  edgecolor='none')
+        # Histogram from the streaming price histogram, whose size does not grow with the history,
+        # drawn as one collection with the alpha gradient across bins computed up front
+        counts, edges = self.indicators.price_histogram.histogram(bins=20)
+        _add_bars(ax, edges[:-1], edges[1:], 0, counts,
+                  _rgba(self.colors['price_line'], 0.4 + np.arange(len(counts)) / len(counts) * 0.4))
         
-        # Gradient effect on bars
-        for i, patch in enumerate(patches):
-            patch.set_alpha(0.4 + (i / len(patches)) * 0.4)
+        ax.axvspan(stats['p5'], stats['p95'], color=self.colors['warning'], alpha=0.06,
+                   label=f"P5-P95 ${stats['p5']:.1f}-{stats['p95']:.1f}")
         
-        mean_price = np.mean(prices)
+        mean_price = stats['average_price']
         ax.axvline(mean_price, color=self.colors['accent'], 
                   linestyle='--', linewidth=1.5, alpha=0.7,
                   label=f'MEAN ${mean_price:.1f}')
@@ -422,17 +3069,122 @@ class ProfessionalPHXAnalyzer:
         plt.setp(ax.yaxis.get_majorticklabels(), fontsize=8,
                 color=self.colors['text_secondary'])
     
+    def create_candlestick_chart(self):
+        """Create OHLCV candlestick chart with zoom capability"""
+        if len(self.price_history) < 2:
+            print("INSUFFICIENT DATA FOR CANDLESTICK CHART")
+            return
+        
+        self._build_candlestick_figure()
+        plt.show()
+    
+    @instrumented('_build_candlestick_figure')
+    def _build_candlestick_figure(self):
+        """Lay out candles over volume on a shared time axis, returning the figure and both axes"""
+        plt.style.use('dark_background')
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(18, 10), sharex=True,
+                                       gridspec_kw={'height_ratios': [3, 1]},
+                                       facecolor=self.colors['background'])
+        
+        self._sync_bars()
+        timestamps = self.store.column('timestamp_ns')
+        interval = self.bars.interval_for(timestamps[0], timestamps[-1])
+        self._create_candlestick_chart(ax1, ax2, interval)
+        
+        fig.text(0.5, 0.02, 'INTERACTIVE ZOOM: Scroll to zoom • Right-click drag to pan • Double-click to reset', 
+                ha='center', fontsize=9, color=self.colors['text_secondary'], 
+                style='italic', alpha=0.7)
+        
+        self._enable_zoom(ax1, fig)
+        
+        with INSTRUMENTATION.stage('tight_layout'):
+            plt.tight_layout(rect=[0, 0.03, 1, 1])
+        return fig, (ax1, ax2)
+    
+    @instrumented('_create_candlestick_chart')
+    def _create_candlestick_chart(self, ax, volume_ax, interval):
+        """Draw ``interval`` bars as one wick collection, one body collection and one volume collection"""
+        from matplotlib.collections import LineCollection, PolyCollection
+        
+        bars = self.get_bars(interval)
+        x = mdates.date2num(bars['start_ns'].view('datetime64[ns]'))
+        width = RESAMPLE_INTERVALS[interval] / 86400e9
+        centers = x + width / 2
+        rising = bars['close'] >= bars['open']
+        palette = np.array([mcolors.to_rgba(self.colors['negative']),
+                            mcolors.to_rgba(self.colors['positive'])])
+        colors = palette[rising.astype(np.intp)]
+        
+        wicks = np.stack([np.column_stack([centers, bars['low']]),
+                          np.column_stack([centers, bars['high']])], axis=1)
+        ax.add_collection(LineCollection(wicks, colors=colors, linewidths=0.8, zorder=2))
+        
+        # Flat bars still get a visible body
+        bottom = np.minimum(bars['open'], bars['close'])
+        top = np.maximum(bars['open'], bars['close'])
+        top = np.maximum(top, bottom + (bars['high'].max() - bars['low'].min()) * 1e-3)
+        body_width = width * 0.7
+        left = centers - body_width / 2
+        ax.add_collection(PolyCollection(_bar_vertices(left, left + body_width, bottom, top),
+                                         facecolors=colors, edgecolors='none', zorder=3))
+        ax.axhline(y=100, color=self.colors['text_secondary'], 
+                  linestyle='--', alpha=0.4, linewidth=1.5, zorder=1)
+        
+        volume_colors = colors.copy()
+        volume_colors[:, 3] = 0.6
+        volume_ax.add_collection(PolyCollection(
+            _bar_vertices(left, left + body_width, np.zeros(len(x)), bars['volume']),
+            facecolors=volume_colors, edgecolors='none'))
+        
+        ax.set_xlim(x[0], x[-1] + width)
+        low, high = bars['low'].min(), bars['high'].max()
+        margin = (high - low) * 0.05 or 1
+        ax.set_ylim(low - margin, high + margin)
+        volume_ax.set_ylim(0, max(bars['volume'].max(), 1) * 1.1)
+        
+        ax.set_title(f'PHX/USD {interval.upper()} CANDLES', 
+                    color=self.colors['text'], fontsize=16, 
+                    fontweight='300', pad=20, loc='left')
+        ax.set_ylabel('PRICE', color=self.colors['text_secondary'], 
+                     fontweight='300', fontsize=10)
+        ax.yaxis.set_major_formatter(ticker.StrMethodFormatter('${x:.0f}'))
+        volume_ax.set_ylabel('VOLUME', color=self.colors['text_secondary'], 
+                            fontweight='300', fontsize=10)
+        volume_ax.yaxis.set_major_formatter(ticker.EngFormatter())
+        
+        for axis in (ax, volume_ax):
+            axis.set_facecolor(self.colors['panel'])
+            axis.grid(True, color=self.colors['grid'], alpha=0.2, 
+                     linestyle='-', linewidth=0.5)
+            for spine in axis.spines.values():
+                spine.set_color(self.colors['grid'])
+                spine.set_linewidth(0.5)
+            plt.setp(axis.yaxis.get_majorticklabels(), fontsize=9,
+                    color=self.colors['text_secondary'])
+        
+        volume_ax.xaxis_date()
+        volume_ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d %H:%M'))
+        volume_ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        plt.setp(volume_ax.xaxis.get_majorticklabels(), rotation=45, ha='right',
+                fontsize=8, color=self.colors['text_secondary'])
+    
     def create_technical_analysis(self):
         """Create technical analysis with zoom capability"""
         if len(self.price_history) < 2:
             print("INSUFFICIENT DATA FOR TECHNICAL ANALYSIS")
             return
-            
+        
+        self._build_technical_figure()
+        plt.show()
+    
+    @instrumented('_build_technical_figure')
+    def _build_technical_figure(self):
+        """Lay out the technical analysis figure, returning it with its indicator and returns axes"""
         plt.style.use('dark_background')
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(18, 12), 
                                       facecolor=self.colors['background'])
         
-        prices = np.array(self.price_history)
+        prices = self.price_history
         
         self._create_technical_indicators(ax1, prices)
         self._create_returns_volume_chart(ax2, prices)
@@ -445,41 +3197,265 @@ class ProfessionalPHXAnalyzer:
         self._enable_zoom(ax1, fig)
         self._enable_zoom(ax2, fig)
         
-        plt.tight_layout(rect=[0, 0.03, 1, 1])
+        with INSTRUMENTATION.stage('tight_layout'):
+            plt.tight_layout(rect=[0, 0.03, 1, 1])
+        return fig, (ax1, ax2)
+    
+    def create_risk_analysis(self):
+        """Print the risk factor table and show the risk analytics chart with zoom capability"""
+        if len(self.price_history) < 2:
+            print("INSUFFICIENT DATA FOR RISK ANALYTICS")
+            return
+        
+        self.print_risk_summary()
+        self._build_risk_figure()
         plt.show()
     
+    def print_risk_summary(self):
+        """Print the latest peg deviation and, per risk factor, its value, z-score and correlations"""
+        summary = self.get_risk_analytics()
+        if summary is None:
+            print("NO DATA AVAILABLE")
+            return
+        print(f"\nRISK FACTORS VS PEG DEVIATION (ROLLING WINDOW {summary['window']})")
+        print("-" * 80)
+        print(f"PEG DEVIATION: {_signed(summary['deviation']):>8}   Z-SCORE: {_signed(summary['z_deviation']):>6}")
+        print(f"{'FACTOR':<16}{'VALUE':>14}{'Z-SCORE':>10}{'ROLLING CORR':>15}{'FULL CORR':>12}")
+        for factor in summary['factors'].values():
+            print(f"{factor['label']:<16}{factor['value']:>14.1f}{_signed(factor['z_score']):>10}"
+                  f"{_signed(factor['correlation']):>15}{_signed(factor['full_correlation']):>12}")
+        print("-" * 80)
+    
+    def create_simulation(self, paths=SIMULATION_PATHS, horizon=SIMULATION_HORIZON, seed=None):
+        """Run the peg simulation, print its summary and show the main chart with the fan overlaid"""
+        print(f"\nSIMULATING {paths:,} PATHS OVER {horizon} TICKS...")
+        started = time.perf_counter()
+        result = self.run_simulation(paths, horizon, seed)
+        if result is None:
+            print("INSUFFICIENT DATA FOR SIMULATION")
+            return
+        print(f"DONE IN {time.perf_counter() - started:.2f}s")
+        self.print_simulation_summary(result)
+        self.create_main_chart()
+    
+    def print_simulation_summary(self, result):
+        """Print the calibration, band breach probabilities and time to revert of a simulation"""
+        print(f"\nMONTE CARLO PEG SIMULATION ({result['paths']:,} PATHS, {result['horizon']} TICKS, SEED {result['seed']})")
+        print("-" * 80)
+        half_life = result['half_life_ticks']
+        print(f"START PRICE: ${result['start_price']:.2f}   SHOCK VOLATILITY: {result['shock_volatility']:.4f}%   "
+              f"REVERSION HALF-LIFE: {'NONE' if not np.isfinite(half_life) else f'{half_life:.1f} TICKS'}")
+        for band, probability in result['breach_probability'].items():
+            print(f"P(OUTSIDE ±{band:g}% OF PEG):".ljust(30) + f"{probability * 100:>8.2f}%")
+        print(f"P(BACK WITHIN ±{result['revert_band']:g}%):".ljust(30) + f"{result['revert_probability'] * 100:>8.2f}%")
+        if np.isfinite(result['expected_revert_ticks']):
+            print("EXPECTED TIME TO REVERT:".ljust(30) + f"{result['expected_revert_ticks']:>8.1f} TICKS "
+                  f"(~{result['expected_revert_seconds']:.0f}s, MEDIAN {result['median_revert_ticks']} TICKS)")
+        print("-" * 80)
+    
+    @instrumented('_build_risk_figure')
+    def _build_risk_figure(self):
+        """Lay out peg deviation, rolling correlations and rolling z-scores, returning the figure and axes"""
+        plt.style.use('dark_background')
+        fig, axes = plt.subplots(3, 1, figsize=(18, 12), gridspec_kw={'height_ratios': [2, 1.5, 1.5]},
+                                 facecolor=self.colors['background'])
+        self._create_risk_charts(*axes)
+        
+        fig.text(0.5, 0.02, 'INTERACTIVE ZOOM: Scroll to zoom • Right-click drag to pan • Double-click to reset', 
+                ha='center', fontsize=9, color=self.colors['text_secondary'], 
+                style='italic', alpha=0.7)
+        
+        self._enable_zoom(axes[0], fig)
+        self._enable_zoom(axes[1], fig, zoom_y=False)
+        self._enable_zoom(axes[2], fig, zoom_y=False)
+        
+        with INSTRUMENTATION.stage('tight_layout'):
+            plt.tight_layout(rect=[0, 0.03, 1, 1])
+        return fig, tuple(axes)
+    
+    @instrumented('_create_risk_charts')
+    def _create_risk_charts(self, deviation_ax, corr_ax, z_ax):
+        """Draw the peg deviation and, per risk factor, its rolling correlation and z-score"""
+        summary = self.get_risk_analytics()
+        window = summary['window']
+        factor_colors = (self.colors['accent'], self.colors['warning'],
+                         self.colors['negative'], self.colors['positive'])
+        
+        for ax in (deviation_ax, corr_ax, z_ax):
+            ax.xaxis_date()
+        
+        self._plot_lod(deviation_ax, 'risk.deviation', self._risk_source('deviation'), smooth=False, fit=False,
+                       fill=dict(alpha=0.08, color=self.colors['price_line']),
+                       linewidth=1.5, color=self.colors['price_line'],
+                       label=f"PRICE - PEG  {_signed(summary['deviation'])}")
+        self._register_extent(deviation_ax, 'risk.deviation', self._risk_source('deviation'), baseline=0)
+        self._finish_lod(deviation_ax)
+        deviation_ax.axhline(y=0, color=self.colors['text_secondary'], 
+                            linestyle='--', alpha=0.4, linewidth=1.5)
+        
+        # Bounded series keep a fixed scale, so their lines do not take part in y-fitting
+        for (factor, info), color in zip(summary['factors'].items(), factor_colors):
+            self._plot_lod(corr_ax, f'risk.corr_{factor}', self._risk_source(f'corr_{factor}'),
+                           smooth=False, fit=False, color=color, linewidth=1.2, alpha=0.85,
+                           label=f"{info['label']}  {_signed(info['correlation'])} "
+                                 f"(ALL {_signed(info['full_correlation'])})")
+            self._plot_lod(z_ax, f'risk.z_{factor}', self._risk_source(f'z_{factor}'),
+                           smooth=False, fit=False, color=color, linewidth=1, alpha=0.6,
+                           label=f"{info['label']}  {_signed(info['z_score'])}")
+        self._plot_lod(z_ax, 'risk.z_deviation', self._risk_source('z_deviation'),
+                       smooth=False, fit=False, color=self.colors['price_line'], linewidth=1.5,
+                       label=f"PEG DEVIATION  {_signed(summary['z_deviation'])}")
+        for ax in (corr_ax, z_ax):
+            self._finish_lod(ax)
+        corr_ax.set_ylim(-1.05, 1.05)
+        corr_ax.axhline(y=0, color=self.colors['text_secondary'], linewidth=1, alpha=0.5)
+        z_ax.set_ylim(-RISK_Z_LIMIT, RISK_Z_LIMIT)
+        for level in (-RISK_Z_ALERT, RISK_Z_ALERT):
+            z_ax.axhline(y=level, color=self.colors['warning'], linestyle='--', alpha=0.4, linewidth=1)
+        
+        titles = (('PEG DEVIATION', 'PRICE - $100'),
+                  (f'ROLLING CORRELATION WITH PEG DEVIATION ({window} TICKS)', 'CORRELATION'),
+                  (f'ROLLING Z-SCORES ({window} TICKS)', 'Z-SCORE'))
+        for ax, (title, label) in zip((deviation_ax, corr_ax, z_ax), titles):
+            ax.set_facecolor(self.colors['panel'])
+            ax.set_title(title, color=self.colors['text'], 
+                        fontsize=14, fontweight='300', pad=15, loc='left')
+            ax.set_ylabel(label, color=self.colors['text_secondary'], 
+                         fontweight='300', fontsize=10)
+            ax.grid(True, color=self.colors['grid'], alpha=0.2, linewidth=0.5)
+            for spine in ax.spines.values():
+                spine.set_color(self.colors['grid'])
+                spine.set_linewidth(0.5)
+            legend = ax.legend(loc='upper left', facecolor=self.colors['panel'], 
+                              edgecolor='none', fontsize=8, framealpha=0.8)
+            for text in legend.get_texts():
+                text.set_color(self.colors['text_secondary'])
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d %H:%M'))
+            plt.setp(ax.xaxis.get_majorticklabels(), fontsize=8,
+                    color=self.colors['text_secondary'])
+            plt.setp(ax.yaxis.get_majorticklabels(), fontsize=8,
+                    color=self.colors['text_secondary'])
+    
+    @instrumented('_build_panel_figure')
+    def _build_panel_figure(self, create_panel):
+        """Render a single dashboard panel on its own figure"""
+        plt.style.use('dark_background')
+        fig, ax = plt.subplots(figsize=(9, 4), facecolor=self.colors['background'])
+        create_panel(ax)
+        with INSTRUMENTATION.stage('tight_layout'):
+            plt.tight_layout()
+        return fig, (ax,)
+    
+    def build_figure(self, name):
+        """Build one of REPORT_FIGURES without showing it"""
+        if name == 'main':
+            return self._build_main_figure()[0]
+        if name == 'technical':
+            return self._build_technical_figure()[0]
+        if name == 'candles':
+            return self._build_candlestick_figure()[0]
+        if name == 'risk':
+            return self._build_risk_figure()[0]
+        if name == 'statistics':
+            return self._build_panel_figure(self._create_statistics_panel)[0]
+        if name == 'distribution':
+            return self._build_panel_figure(self._create_distribution_panel)[0]
+        raise ValueError(f"UNKNOWN FIGURE '{name}'")
+    
+    def profile_render(self, name='main', path=None):
+        """Build and draw one figure under cProfile, saving the stats to ``path``.
+        
+        The .prof file opens in pstats or snakeviz, and flameprof turns it into a flame graph.
+        """
+        import cProfile
+        import pstats
+        path = path or f"phx_{name}_{datetime.now():%Y%m%d_%H%M%S}.prof"
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            fig = self.build_figure(name)
+            fig.canvas.draw()
+        finally:
+            profiler.disable()
+        plt.close(fig)
+        profiler.dump_stats(path)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        print(f"PROFILE OF '{name}' RENDER WRITTEN TO '{path}'")
+        return path
+    
+    def prepare_report(self):
+        """Compute everything the figures share once, so workers inherit it instead of redoing it"""
+        self._sync_indicators()
+        self._sync_bars()
+        self._sync_risk()
+        self._date_numbers()
+        self.get_statistics()
+    
+    @instrumented('_create_technical_indicators')
     def _create_technical_indicators(self, ax, prices):
         """Create smooth technical indicators"""
-        x_smooth, y_smooth = self.smooth_data(self.timestamps, prices)
-        
-        ax.plot(x_smooth, y_smooth, linewidth=2.5, 
-               color=self.colors['price_line'], label='PHX/USD', alpha=0.9)
+        self._sync_indicators()
+        ax.xaxis_date()
         
-        ax.fill_between(x_smooth, y_smooth, alpha=0.08, 
-                       color=self.colors['price_line'])
+        self._plot_lod(ax, 'price', self._price_source,
+                       fill=dict(alpha=0.08, color=self.colors['price_line']),
+                       linewidth=2.5, color=self.colors['price_line'],
+                       label='PHX/USD', alpha=0.9)
         
         if len(prices) > 10:
             window = min(20, len(prices))
-            rolling_mean = pd.Series(prices).rolling(window=window).mean()
-            rolling_std = pd.Series(prices).rolling(window=window).std()
-            
-            upper_band = rolling_mean + (rolling_std * 2)
-            lower_band = rolling_mean - (rolling_std * 2)
+            if window == IndicatorEngine.BAND_WINDOW:
+                band_columns = lambda: (self.indicators.column('ma20'), self.indicators.column('std20'))
+            else:
+                rolling_mean = pd.Series(prices).rolling(window=window).mean().to_numpy()
+                rolling_std = pd.Series(prices).rolling(window=window).std().to_numpy()
+                band_columns = lambda: (rolling_mean, rolling_std)
             
-            # Smooth bollinger bands
             valid_idx = window-1
-            upper_smooth_x, upper_smooth_y = self.smooth_data(
-                self.timestamps[valid_idx:], upper_band[valid_idx:])
-            lower_smooth_x, lower_smooth_y = self.smooth_data(
-                self.timestamps[valid_idx:], lower_band[valid_idx:])
-            ma_smooth_x, ma_smooth_y = self.smooth_data(
-                self.timestamps[valid_idx:], rolling_mean[valid_idx:])
             
-            ax.fill_between(upper_smooth_x, lower_smooth_y, upper_smooth_y, 
-                           alpha=0.1, color=self.colors['accent'])
+            def band_source():
+                rolling_mean, rolling_std = band_columns()
+                return (self._date_numbers()[valid_idx:], rolling_mean[valid_idx:],
+                        rolling_std[valid_idx:])
+            
+            # Band edges for y-fitting, recomputed only when the history changes
+            edges = {'version': None}
+            
+            def band_edge(sign):
+                version = (self.history_epoch, len(self.store))
+                if edges['version'] != version:
+                    band_x, band_mean, band_std = band_source()
+                    edges.update(version=version, x=band_x,
+                                 upper=band_mean + band_std * 2, lower=band_mean - band_std * 2)
+                return edges['x'], edges['upper' if sign > 0 else 'lower']
+            
+            self._register_extent(ax, ('upper', window), lambda: band_edge(1))
+            self._register_extent(ax, ('lower', window), lambda: band_edge(-1))
+            
+            # Smooth bollinger bands, decimated at the same positions as their mean
+            band = {}
             
-            ax.plot(ma_smooth_x, ma_smooth_y, color=self.colors['accent'], 
-                   linewidth=1.5, alpha=0.6, label=f'MA{window}')
+            def update_band():
+                band_x, band_mean, band_std = band_source()
+                idx = self._lod_indices(ax, f'ma{window}', band_x, band_mean)
+                upper_band = band_mean[idx] + (band_std[idx] * 2)
+                lower_band = band_mean[idx] - (band_std[idx] * 2)
+                resolution = self._axes_buckets(ax)
+                upper_smooth_x, upper_smooth_y = self.smooth_data(
+                    band_x[idx], upper_band, resolution, key=('upper', window))
+                lower_smooth_x, lower_smooth_y = self.smooth_data(
+                    band_x[idx], lower_band, resolution, key=('lower', window))
+                if 'fill' in band:
+                    band['fill'].remove()
+                band['fill'] = ax.fill_between(upper_smooth_x, lower_smooth_y, upper_smooth_y,
+                                               alpha=0.1, color=self.colors['accent'])
+                band['fill']._phx_lod = True
+            
+            self._register_lod(ax, update_band)
+            self._plot_lod(ax, f'ma{window}', lambda: band_source()[:2], color=self.colors['accent'],
+                           linewidth=1.5, alpha=0.6, label=f'MA{window}')
+        
+        self._finish_lod(ax)
         
         ax.axhline(y=100, color=self.colors['text_secondary'], 
                   linestyle='--', alpha=0.3, linewidth=1.5, label='BASE PEG')
@@ -507,21 +3483,42 @@ class ProfessionalPHXAnalyzer:
         plt.setp(ax.yaxis.get_majorticklabels(), fontsize=9,
                 color=self.colors['text_secondary'])
     
+    @instrumented('_create_returns_volume_chart')
     def _create_returns_volume_chart(self, ax, prices):
         """Create smooth returns chart"""
         if len(prices) > 1:
-            returns = np.diff(prices) / prices[:-1] * 100
-            return_dates = self.timestamps[1:]
+            ax.xaxis_date()
+            artists = {}
             
-            colors = [self.colors['positive'] if x >= 0 else self.colors['negative'] 
-                     for x in returns]
-            
-            bars = ax.bar(return_dates, returns, color=colors, 
-                         alpha=0.7, width=0.8, edgecolor='none')
+            def update():
+                x, returns, largest = self._returns_source()
+                idx = self._lod_indices(ax, 'returns', x, returns)
+                xs, ys = x[idx], returns[idx]
+                
+                # Sign picks the color and magnitude the opacity, for every bar at once
+                magnitude = np.abs(ys)
+                alpha = 0.5 + magnitude / (largest * 2) if largest > 0 else np.full(len(ys), 0.5)
+                colors = np.where((ys >= 0)[:, None],
+                                  _rgba(self.colors['positive'], alpha),
+                                  _rgba(self.colors['negative'], alpha))
+                
+                # Bars fill 80% of the typical gap between ticks, and at least a pixel once decimated
+                spacing = np.diff(xs)
+                spacing = spacing[spacing > 0]
+                width = 0.8 * (np.median(spacing) if len(spacing) else 1 / 86400)
+                if len(idx) and idx[-1] - idx[0] + 1 > len(idx):
+                    width = max(width, (xs[-1] - xs[0]) / self._axes_buckets(ax))
+                
+                if 'bars' in artists:
+                    artists['bars'].set_verts(_bar_vertices(xs - width / 2, xs + width / 2, 0, ys))
+                    artists['bars'].set_facecolor(colors)
+                else:
+                    artists['bars'] = _add_bars(ax, xs - width / 2, xs + width / 2, 0, ys, colors)
+                    artists['bars']._phx_lod = True
             
-            # Gradient effect
-            for i, bar in enumerate(bars):
-                bar.set_alpha(0.5 + abs(returns[i]) / (max(abs(returns)) * 2))
+            self._register_lod(ax, update)
+            self._register_extent(ax, 'returns', self._returns_source, baseline=0)
+            self._finish_lod(ax)
             
             ax.axhline(y=0, color=self.colors['text_secondary'], 
                       linewidth=1, alpha=0.5)
@@ -546,23 +3543,142 @@ class ProfessionalPHXAnalyzer:
         plt.setp(ax.yaxis.get_majorticklabels(), fontsize=8,
                 color=self.colors['text_secondary'])
     
-    def run_terminal(self):
-        """Main terminal interface"""
+    def _follow_latest(self, ax, previous_count):
+        """Widen the view of ``ax`` to include points appended after ``previous_count``.
+        
+        Limits grow with headroom so most ticks can be blitted; returns True when
+        they changed and the axes needs a full redraw.
+        """
+        x = self._date_numbers()
+        prices = self.price_history
+        x0, x1 = ax.get_xlim()
+        changed = False
+        
+        # Only follow when the previous latest point was in view
+        if previous_count and x1 >= x[previous_count - 1] and x[-1] > x1:
+            ax.set_xlim(x0, x[-1] + (x[-1] - x0) * LIVE_HEADROOM)
+            changed = True
+        
+        # Checked after following, since a new x-range refits the y-range
+        y0, y1 = ax.get_ylim()
+        new_prices = prices[previous_count:]
+        low, high = new_prices.min(), new_prices.max()
+        if low < y0 or high > y1:
+            margin = (max(high, y1) - min(low, y0)) * LIVE_HEADROOM
+            ax.set_ylim(min(low - margin, y0), max(high + margin, y1))
+            changed = True
+        return changed
+    
+    def print_live_tick(self, previous_count):
+        """Print one ticker line for points appended since ``previous_count``"""
+        stats = self.get_statistics()
+        change_symbol = '+' if stats['day_change'] >= 0 else ''
+        print(f"{datetime.now().strftime('%H:%M:%S')}  "
+              f"LAST: ${stats['current_price']:8.2f}   "
+              f"CHANGE: {change_symbol}{stats['day_change']:7.2f}   "
+              f"NEW: {len(self.store) - previous_count:4d}   "
+              f"POINTS: {stats['total_points']:6d}")
+    
+    def run_live(self, interval_ms=LIVE_INTERVAL_MS):
+        """Tail the data file, pushing new points into an open main chart as they arrive"""
+        if len(self.price_history) < 2:
+            print("INSUFFICIENT DATA FOR CHART ANALYSIS")
+            return
+        
+        watchers = [FileWatcher(path) for path in self.data_files]
+        fig, (price_ax, stats_ax, _) = self._build_main_figure()
+        canvas = fig.canvas
+        live = {'background': None}
+        
+        def animated():
+            return self._lod_artists(price_ax) + stats_ax._stat_values
+        
+        for artist in animated():
+            artist.set_animated(True)
+        
+        def on_draw(event):
+            # Full redraws (zoom, resize, layout) refresh the static background
+            live['background'] = canvas.copy_from_bbox(fig.bbox)
+            for artist in animated():
+                artist.axes.draw_artist(artist)
+        
+        def on_tick():
+            # Check every watcher so each one consumes its pending events
+            if not [watcher for watcher in watchers if watcher.changed()]:
+                return
+            previous_count, epoch = len(self.store), self.history_epoch
+            if not self.load_data(verbose=False, persist=False):
+                return
+            if epoch != self.history_epoch:
+                previous_count = 0
+            if len(self.store) == previous_count:
+                return
+            
+            self.print_live_tick(previous_count)
+            self._sync_indicators()
+            redraw = self._follow_latest(price_ax, previous_count) or live['background'] is None
+            for update in price_ax._lod_updates:
+                update()
+            self._update_statistics_panel(stats_ax)
+            for artist in animated():
+                artist.set_animated(True)
+            
+            if redraw:
+                canvas.draw_idle()
+                return
+            canvas.restore_region(live['background'])
+            for artist in animated():
+                artist.axes.draw_artist(artist)
+            canvas.blit(price_ax.bbox)
+            canvas.blit(stats_ax.bbox)
+        
+        canvas.mpl_connect('draw_event', on_draw)
+        timer = canvas.new_timer(interval=interval_ms)
+        timer.add_callback(on_tick)
+        timer.start()
+        
+        print(f"LIVE MODE: WATCHING {', '.join(self.data_files)} ({watchers[0].method}). "
+              "CLOSE THE CHART TO STOP.")
+        try:
+            plt.show()
+        finally:
+            timer.stop()
+            for watcher in watchers:
+                watcher.close()
+            # Archived history is not cached; the sidecar only mirrors the file
+            for analyzer in self.sources or [self]:
+                if analyzer.history_range is None:
+                    analyzer._write_sidecar()
+    
+    def run_terminal(self, history=None):
+        """Main terminal interface; ``history`` is a (start, end) window of the archive to analyze"""
         if not self.load_data():
             return
+        if history is not None:
+            self.load_history(*history)
             
         while True:
             self.print_terminal_header()
             self.print_market_summary()
             
             print("\nANALYSIS OPTIONS:")
+            # Numbers are stable: 1-4 are the original options, later views are numbered after EXIT
             print("1. MAIN CHART (Interactive Zoom)")
             print("2. TECHNICAL ANALYSIS (Interactive Zoom)")
             print("3. REFRESH DATA")
             print("4. EXIT")
+            print("5. LIVE MODE (Auto-refresh)")
+            print("6. CANDLESTICK + VOLUME (OHLCV Bars)")
+            print("7. RISK ANALYTICS (Peg Deviation vs Market Conditions)")
+            print("8. MONTE CARLO PEG SIMULATION (Fan Chart)")
+            options = 8
+            if INSTRUMENTATION.enabled:
+                print("9. STAGE TIMINGS (Instrumentation)")
+                print("10. PROFILE ONE CHART RENDER")
+                options = 10
             print("-" * 80)
             
-            choice = input("SELECT OPTION (1-4): ").strip()
+            choice = input(f"SELECT OPTION (1-{options}): ").strip()
             
             if choice == '1':
                 print("\nLOADING CHART... (Use scroll wheel to zoom, right-click to pan)")
@@ -576,13 +3692,791 @@ class ProfessionalPHXAnalyzer:
             elif choice == '4':
                 print("EXITING TERMINAL")
                 break
+            elif choice == '5':
+                print("\nSTARTING LIVE MODE... (New prices stream into the chart)")
+                self.run_live()
+            elif choice == '6':
+                print("\nLOADING CANDLESTICK CHART... (Use scroll wheel to zoom)")
+                self.create_candlestick_chart()
+            elif choice == '7':
+                print("\nLOADING RISK ANALYTICS... (Use scroll wheel to zoom)")
+                self.create_risk_analysis()
+            elif choice == '8':
+                paths = input(f"PATHS [{SIMULATION_PATHS}]: ").strip()
+                if paths and not (paths.isdigit() and int(paths) > 0):
+                    print("PATHS MUST BE A POSITIVE INTEGER")
+                else:
+                    self.create_simulation(int(paths or SIMULATION_PATHS))
+            elif choice == '9' and INSTRUMENTATION.enabled:
+                print("\nSTAGE TIMINGS SINCE START (inclusive of nested stages)")
+                INSTRUMENTATION.print_breakdown()
+                if input("RESET TIMINGS? (y/N): ").strip().lower() == 'y':
+                    INSTRUMENTATION.reset()
+            elif choice == '10' and INSTRUMENTATION.enabled:
+                name = input(f"FIGURE ({'/'.join(REPORT_FIGURES)}) [main]: ").strip() or 'main'
+                if name not in REPORT_FIGURES:
+                    print(f"UNKNOWN FIGURE '{name}'")
+                elif len(self.price_history) < 2:
+                    print("INSUFFICIENT DATA FOR CHART ANALYSIS")
+                else:
+                    self.profile_render(name)
+            else:
+                print(f"INVALID OPTION. PLEASE SELECT 1-{options}.")
+
+# Headless reports: one file per figure and format, rendered by a process pool
+REPORT_FIGURES = ('main', 'statistics', 'distribution', 'technical', 'candles', 'risk')
+REPORT_DPI = 100
+
+_report_analyzers = None
+
+def _init_report_worker(analyzers):
+    """Pool initializer: switch to Agg and keep the prepared analyzers for every job"""
+    global _report_analyzers
+    plt.switch_backend('Agg')
+    _report_analyzers = analyzers
+
+def _render_report_figure(job):
+    """Render one figure of one analyzer to every requested path"""
+    index, name, paths = job
+    fig = _report_analyzers[index].build_figure(name)
+    try:
+        for path in paths:
+            fig.savefig(path, dpi=REPORT_DPI, facecolor=fig.get_facecolor())
+    finally:
+        plt.close(fig)
+    return paths
+
+def _report_stems(data_files):
+    """Output name stem per data file: its path below the files' common directory, extension dropped.
+    
+    a/phx_price.json and b/phx_price.json become a_phx_price and b_phx_price;
+    a single file keeps just its name, so phx.v2.json gives phx.v2.
+    """
+    paths = [os.path.abspath(path) for path in data_files]
+    parent = os.path.commonpath([os.path.dirname(path) for path in paths])
+    return [os.path.splitext(os.path.relpath(path, parent))[0].replace(os.sep, '_') for path in paths]
+
+def render_reports(data_files, output_dir='reports', formats=('png',), figures=REPORT_FIGURES, workers=None,
+                   history=None):
+    """Render dashboard snapshots for each data file without a display.
+    
+    Every file is loaded and its indicators computed once in this process;
+    the pool workers inherit the prepared analyzers and each job draws a
+    single figure. ``history`` is a (start, end) window of the archive to
+    chart instead of the ticks in the file. Returns the list of written paths.
+    """
+    # Workers write in parallel, so two inputs sharing a stem would overwrite each other's images
+    stems = _report_stems(data_files)
+    if len(set(stems)) < len(stems):
+        duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+        print(f"ERROR: DATA FILES WOULD SHARE REPORT NAMES: {', '.join(duplicates)}")
+        return []
+    plt.switch_backend('Agg')
+    os.makedirs(output_dir, exist_ok=True)
+    
+    analyzers = []
+    jobs = []
+    for path, stem in zip(data_files, stems):
+        analyzer = ProfessionalPHXAnalyzer(path)
+        loaded = analyzer.load_data(verbose=False, persist=False)
+        if loaded and history is not None:
+            loaded = analyzer.load_history(*history, verbose=False)
+        if not loaded or len(analyzer.store) < 2:
+            print(f"SKIPPING '{path}': INSUFFICIENT DATA")
+            continue
+        analyzer.prepare_report()
+        for name in figures:
+            paths = [os.path.join(output_dir, f"{stem}_{name}.{fmt}") for fmt in formats]
+            jobs.append((len(analyzers), name, paths))
+        analyzers.append(analyzer)
+    
+    if not jobs:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers == 1:
+        _init_report_worker(analyzers)
+        results = [_render_report_figure(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_report_worker,
+                                 initargs=(analyzers,)) as pool:
+            results = list(pool.map(_render_report_figure, jobs))
+    
+    written = [path for paths in results for path in paths]
+    print(f"RENDERED {len(written)} FILES FOR {len(analyzers)} DATA FILES TO '{output_dir}'")
+    return written
+
+# Service mode: one loaded analyzer answers many local HTTP and WebSocket clients
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_CACHE_SIZE = 256
+SERVER_DEFAULT_POINTS = 1000
+SERVER_MAX_POINTS = 20000
+SERVER_BACKLOG = 1024
+SERVER_MAX_REQUEST = 16 * 1024
+# WebSocket clients further behind than this are disconnected rather than buffered for
+SERVER_MAX_BUFFER = 4 * 1024 * 1024
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _json_ready(value):
+    """Convert NumPy scalars, arrays and NaN (as null) for a strict JSON encoder"""
+    if isinstance(value, dict):
+        return {key: _json_ready(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_json_ready(item) for item in (value.tolist() if isinstance(value, np.ndarray) else value)]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+def _iso_seconds(timestamps_ns):
+    return np.datetime_as_string(np.asarray(timestamps_ns).view('datetime64[ns]'), unit='s').tolist()
+
+def _websocket_frame(payload, opcode=0x1):
+    """One unmasked, unfragmented server frame"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+async def _read_websocket_frame(reader):
+    """(opcode, payload) of the next client frame; clients must mask, and may not send large frames"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack('!Q', await reader.readexactly(8))
+    if not second & 0x80 or length > SERVER_MAX_REQUEST:
+        raise ValueError("UNMASKED OR OVERSIZED WEBSOCKET FRAME")
+    mask = await reader.readexactly(4)
+    payload = await reader.readexactly(length)
+    unmasked = int.from_bytes(payload, 'big') ^ int.from_bytes((mask * (length // 4 + 1))[:length], 'big')
+    return first & 0x0F, unmasked.to_bytes(length, 'big')
+
+class PriceServer:
+    """Serve one analyzer's summary, series and bars to many local clients over HTTP and WebSocket.
+    
+    The data is loaded and indexed once. Responses are kept in an LRU cache
+    keyed by (endpoint, indicator, range, resolution), which is cleared when
+    a watched file changes; every WebSocket client is then pushed the new
+    ticks. Everything runs on one event loop, so the analyzer is never
+    shared between threads.
+    """
+    
+    STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+    
+    def __init__(self, analyzer, host=SERVER_HOST, port=SERVER_PORT, poll_interval=0.5,
+                 cache_size=SERVER_CACHE_SIZE):
+        self.analyzer = analyzer
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self.clients = set()
+        self.routes = {
+            '/': self._index,
+            '/summary': self._summary,
+            '/series': self._series_response,
+            '/bars': self._bars,
+        }
+        self._published = (analyzer.history_epoch, len(analyzer.store))
+    
+    def series_names(self):
+        names = [name for name in PriceSeriesStore.COLUMNS if name != PriceSeriesStore.TIME_COLUMN]
+        return names + ['returns'] + list(_IndicatorColumns.COLUMNS) + list(_RiskColumns.COLUMNS)
+    
+    def _series(self, name):
+        """(timestamps_ns, values) of a served series over the whole loaded history"""
+        analyzer = self.analyzer
+        timestamps = analyzer.store.column(PriceSeriesStore.TIME_COLUMN)
+        if name in PriceSeriesStore.COLUMNS and name != PriceSeriesStore.TIME_COLUMN:
+            return timestamps, analyzer.store.column(name)
+        if name == 'returns':
+            return timestamps[1:], analyzer._percent_returns()[0]
+        if name in _IndicatorColumns.COLUMNS:
+            analyzer._sync_indicators()
+            return timestamps, analyzer.indicators.column(name)
+        if name in _RiskColumns.COLUMNS:
+            analyzer._sync_risk()
+            return timestamps, analyzer.risk.column(name)
+        raise _HTTPError(404, f"UNKNOWN SERIES '{name}'")
+    
+    @staticmethod
+    def _points(query):
+        try:
+            points = int(query.get('points', SERVER_DEFAULT_POINTS))
+        except ValueError:
+            raise _HTTPError(400, "POINTS MUST BE AN INTEGER")
+        if not 2 <= points <= SERVER_MAX_POINTS:
+            raise _HTTPError(400, f"POINTS MUST BE BETWEEN 2 AND {SERVER_MAX_POINTS}")
+        return points
+    
+    @staticmethod
+    def _span(timestamps, query):
+        """Row range [lo, hi) of ``timestamps`` inside the query's start/end (ISO 8601)"""
+        try:
+            lo = 0 if 'start' not in query else np.searchsorted(timestamps, _to_epoch_ns(query['start']), 'left')
+            hi = len(timestamps) if 'end' not in query else \
+                np.searchsorted(timestamps, _to_epoch_ns(query['end']), 'right')
+        except ValueError:
+            raise _HTTPError(400, "START AND END MUST BE ISO 8601 TIMESTAMPS")
+        return int(lo), int(hi)
+    
+    def _index(self, query):
+        return {'endpoints': sorted(self.routes) + ['/status', '/ws'],
+                'series': self.series_names(), 'intervals': list(RESAMPLE_INTERVALS)}
+    
+    def _summary(self, query):
+        record = self.analyzer.statistics_record()
+        if record is None:
+            raise _HTTPError(404, "NO DATA LOADED")
+        record['risk'] = self.analyzer.get_risk_analytics()
+        return record
+    
+    def _series_response(self, query):
+        """A series over the range, min/max-decimated to at most ``points`` values"""
+        name = query.get('indicator', 'price')
+        points = self._points(query)
+        timestamps, values = self._series(name)
+        lo, hi = self._span(timestamps, query)
+        if hi - lo > points:
+            pyramid = self.analyzer._pyramid(('series', name), values)
+            rows = pyramid.indices(lo, hi, points // 2)
+            # Whole blocks are decimated, so the first and last may reach outside the range
+            rows = rows[(rows >= lo) & (rows < hi)]
+        else:
+            rows = np.arange(lo, hi)
+        return {'indicator': name, 'rows': hi - lo, 'timestamp': _iso_seconds(timestamps[rows]),
+                'value': _json_ready(values[rows])}
+    
+    def _bars(self, query):
+        """OHLCV bars over the range; without an interval, the finest one giving at most ``points`` bars"""
+        analyzer = self.analyzer
+        points = self._points(query)
+        analyzer._sync_bars()
+        interval = query.get('interval')
+        if interval is None:
+            timestamps = analyzer.store.column(PriceSeriesStore.TIME_COLUMN)
+            lo, hi = self._span(timestamps, query)
+            if hi <= lo:
+                interval = next(iter(RESAMPLE_INTERVALS))
+            else:
+                interval = analyzer.bars.interval_for(timestamps[lo], timestamps[hi - 1], max_bars=points)
+        elif interval not in RESAMPLE_INTERVALS:
+            raise _HTTPError(400, f"INTERVAL MUST BE ONE OF {', '.join(RESAMPLE_INTERVALS)}")
+        bars = analyzer.get_bars(interval)
+        lo, hi = self._span(bars[_BarColumns.TIME_COLUMN], query)
+        if hi - lo > points:
+            raise _HTTPError(400, f"{hi - lo} BARS IN RANGE; NARROW IT OR USE A COARSER INTERVAL")
+        response = {'interval': interval, 'timestamp': _iso_seconds(bars[_BarColumns.TIME_COLUMN][lo:hi])}
+        response.update({name: _json_ready(column[lo:hi]) for name, column in bars.items()
+                         if name != _BarColumns.TIME_COLUMN})
+        return response
+    
+    def _status(self):
+        return {'clients': len(self.clients), 'cache_entries': len(self.cache), 'cache_hits': self.hits,
+                'cache_misses': self.misses, 'data_version': self.analyzer.data_version,
+                'points': len(self.analyzer.store)}
+    
+    def respond(self, method, target):
+        """(status, JSON body) for one request; successful responses come from the LRU cache when possible"""
+        from urllib.parse import parse_qs, urlsplit
+        if method != 'GET':
+            return 405, self._encode({'error': "ONLY GET IS SUPPORTED"})
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == '/status':
+            return 200, self._encode(self._status())
+        route = self.routes.get(url.path)
+        if route is None:
+            return 404, self._encode({'error': f"UNKNOWN PATH '{url.path}'"})
+        
+        key = (url.path, tuple(sorted(query.items())))
+        body = self.cache.get(key)
+        if body is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return 200, body
+        self.misses += 1
+        try:
+            body = self._encode(route(query))
+        except _HTTPError as e:
+            return e.status, self._encode({'error': str(e)})
+        self.cache[key] = body
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return 200, body
+    
+    @staticmethod
+    def _encode(payload):
+        return json.dumps(_json_ready(payload), allow_nan=False).encode()
+    
+    def _http_response(self, status, body, keep_alive):
+        head = (f"HTTP/1.1 {status} {self.STATUS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                "Access-Control-Allow-Origin: *\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode() + body
+    
+    async def _handle_connection(self, reader, writer):
+        """Answer requests on one keep-alive connection, or hand it over to the WebSocket loop"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    writer.write(self._http_response(400, self._encode({'error': "MALFORMED REQUEST"}), False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                if headers.get('upgrade', '').lower() == 'websocket':
+                    await self._handle_websocket(reader, writer, headers)
+                    break
+                status, body = self.respond(method, target)
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                writer.write(self._http_response(status, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+    
+    async def _handle_websocket(self, reader, writer, headers):
+        """Complete the handshake, send a snapshot, then keep the client subscribed to deltas"""
+        import base64
+        import hashlib
+        key = headers.get('sec-websocket-key')
+        if not key:
+            writer.write(self._http_response(400, self._encode({'error': "MISSING SEC-WEBSOCKET-KEY"}), False))
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        writer.write(_websocket_frame(self._encode(
+            {'type': 'snapshot', 'data_version': self.analyzer.data_version, 'summary': self._summary_or_none()})))
+        self.clients.add(writer)
+        
+        # Clients only listen; their frames are read to answer pings and closes
+        try:
+            while True:
+                opcode, payload = await _read_websocket_frame(reader)
+                if opcode == 0x8:
+                    writer.write(_websocket_frame(payload[:2], opcode=0x8))
+                    break
+                if opcode == 0x9:
+                    writer.write(_websocket_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.clients.discard(writer)
+    
+    def _summary_or_none(self):
+        try:
+            return self._summary({})
+        except _HTTPError:
+            return None
+    
+    def publish(self):
+        """After a reload: drop cached responses and push the new ticks (or a reset) to every client"""
+        analyzer = self.analyzer
+        epoch, count = self._published
+        if (analyzer.history_epoch, len(analyzer.store)) == self._published:
+            return
+        self.cache.clear()
+        message = {'type': 'delta', 'data_version': analyzer.data_version, 'reset': analyzer.history_epoch != epoch}
+        if not message['reset']:
+            columns = analyzer.store.columns(count)
+            message['ticks'] = {name: column for name, column in columns.items()
+                                if name != PriceSeriesStore.TIME_COLUMN}
+            message['ticks']['timestamp'] = _iso_seconds(columns[PriceSeriesStore.TIME_COLUMN])
+        message['summary'] = self._summary_or_none()
+        self._published = (analyzer.history_epoch, len(analyzer.store))
+        
+        # Encoded once for every client; writes are buffered, so a slow client cannot hold up the rest
+        frame = _websocket_frame(self._encode(message))
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > SERVER_MAX_BUFFER:
+                self.clients.discard(writer)
+                writer.close()
             else:
-                print("INVALID OPTION. PLEASE SELECT 1-4.")
+                writer.write(frame)
+    
+    async def _watch(self, watchers):
+        """Reload and publish whenever a data file changes"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not [watcher for watcher in watchers if watcher.changed()]:
+                continue
+            with redirect_stdout(sys.stderr):
+                loaded = self.analyzer.load_data(verbose=False)
+            if loaded:
+                self.publish()
+    
+    async def serve(self, ready=None):
+        """Serve until cancelled; ``ready`` (a Future) receives the bound port"""
+        watchers = [FileWatcher(path) for path in self.analyzer.data_files]
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                            limit=SERVER_MAX_REQUEST, backlog=SERVER_BACKLOG)
+        self.port = server.sockets[0].getsockname()[1]
+        watch = asyncio.ensure_future(self._watch(watchers))
+        print(f"SERVING {len(self.analyzer.store)} PRICE POINTS ON http://{self.host}:{self.port} "
+              f"(WEBSOCKET /ws)", file=sys.stderr)
+        if ready is not None:
+            ready.set_result(self.port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watch.cancel()
+            for writer in list(self.clients):
+                writer.close()
+            for watcher in watchers:
+                watcher.close()
+
+# Scripting interface: subcommands that never import matplotlib unless they draw
+EXPORT_COLUMNS = (
+    ('price', 'price'),
+    ('volume24h', 'volume24h'),
+    ('totalTransactions', 'total_transactions'),
+    ('concentrationRisk', 'concentration_risk'),
+    ('velocityRisk', 'velocity_risk'),
+    ('largeTransferRisk', 'large_transfer_risk'),
+)
+BAR_EXPORT_COLUMNS = tuple((name, name) for name in (
+    'open', 'high', 'low', 'close', 'volume', 'transactions', 'ticks'))
+EXPORT_CHUNK_ROWS = 100000
+
+def _load_quietly(data_file):
+    """Load an analyzer with progress and warnings sent to stderr, keeping stdout machine-readable"""
+    analyzer = ProfessionalPHXAnalyzer(data_file)
+    with redirect_stdout(sys.stderr):
+        loaded = analyzer.load_data(verbose=False)
+    return analyzer if loaded and len(analyzer.store) else None
+
+def _cli_analyzers(files, merge):
+    """One analyzer per file, or a single merged analyzer; (label, analyzer or None) pairs"""
+    if merge and len(files) > 1:
+        return [('+'.join(files), _load_quietly(files))]
+    return [(path, _load_quietly(path)) for path in files]
+
+def _write_records(records, fmt, out=None, header=True):
+    """Write stats records as one JSON object per line or as CSV rows"""
+    out = out or sys.stdout
+    if fmt == 'json':
+        for record in records:
+            out.write(json.dumps(record) + '\n')
+    elif records:
+        writer = csv.DictWriter(out, fieldnames=list(records[0]))
+        if header:
+            writer.writeheader()
+        writer.writerows(records)
+    out.flush()
+
+def _cli_stats(args):
+    records = []
+    failed = 0
+    for label, analyzer in _cli_analyzers(args.files, args.merge):
+        if analyzer is None:
+            print(f"ERROR: NO DATA LOADED FROM '{label}'", file=sys.stderr)
+            failed += 1
+            continue
+        record = analyzer.statistics_record(label, args.start, args.end, args.history)
+        if record is None:
+            print(f"ERROR: NO DATA IN RANGE FOR '{label}'", file=sys.stderr)
+            failed += 1
+            continue
+        records.append(record)
+    _write_records(records, args.format)
+    return 1 if failed else 0
+
+def _cli_export(args):
+    analyzer = _load_quietly(args.files[0] if len(args.files) == 1 else args.files)
+    if analyzer is None:
+        print("ERROR: NO DATA LOADED", file=sys.stderr)
+        return 1
+    if args.history and args.interval:
+        with redirect_stdout(sys.stderr):
+            if not analyzer.load_history(args.start, args.end, verbose=False):
+                print("ERROR: NO ARCHIVED HISTORY IN RANGE", file=sys.stderr)
+                return 1
+    if args.interval:
+        analyzer._sync_bars()
+        store, export_columns = analyzer.bars.bars[args.interval], BAR_EXPORT_COLUMNS
+    else:
+        store, export_columns = analyzer.store, EXPORT_COLUMNS
+    if args.history and not args.interval:
+        # Ticks stream from the archive a segment at a time
+        parts = analyzer._history_chunks(args.start, args.end)
+    else:
+        rows = store.range_slice(args.start, args.end)
+        parts = [store.columns(rows.start, rows.stop)]
+    names = ['timestamp'] + [name for name, _ in export_columns]
+    writer = csv.writer(sys.stdout) if args.format == 'csv' else None
+    if writer:
+        writer.writerow(names)
+    
+    # Format in chunks so memory stays flat on long histories
+    for columns in parts:
+        for start in range(0, len(columns[store.TIME_COLUMN]), EXPORT_CHUNK_ROWS):
+            stop = start + EXPORT_CHUNK_ROWS
+            chunk = [np.datetime_as_string(
+                columns[store.TIME_COLUMN][start:stop].view('datetime64[ns]'), unit='s').tolist()]
+            chunk += [columns[column][start:stop].tolist() for _, column in export_columns]
+            if writer:
+                writer.writerows(zip(*chunk))
+            else:
+                for row in zip(*chunk):
+                    sys.stdout.write(json.dumps(dict(zip(names, row))) + '\n')
+    sys.stdout.flush()
+    return 0
+
+def _cli_render(args):
+    history = (args.start, args.end) if args.history else None
+    written = render_reports(args.files, args.output, tuple(args.formats or ('png',)),
+                             workers=args.workers, history=history)
+    return 0 if written else 1
+
+def _cli_simulate(args):
+    """Print one JSON object summarizing a peg simulation, optionally saving the main chart with its fan"""
+    analyzer = _load_quietly(args.files[0] if len(args.files) == 1 else args.files)
+    if analyzer is None:
+        print("ERROR: NO DATA LOADED", file=sys.stderr)
+        return 1
+    if args.history:
+        with redirect_stdout(sys.stderr):
+            if not analyzer.load_history(args.start, args.end, verbose=False):
+                print("ERROR: NO ARCHIVED HISTORY IN RANGE", file=sys.stderr)
+                return 1
+    if args.paths < 1 or args.horizon < 1:
+        print("ERROR: PATHS AND HORIZON MUST BE POSITIVE", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    result = analyzer.run_simulation(args.paths, args.horizon, args.seed, args.workers)
+    if result is None:
+        print(f"ERROR: AT LEAST {SIMULATION_MIN_RETURNS + 1} PRICES ARE NEEDED TO SIMULATE", file=sys.stderr)
+        return 1
+    record = {key: value for key, value in result.items() if key not in ('fan', 'fan_steps', 'fan_quantiles')}
+    record['breach_probability'] = {f'{band:g}': p for band, p in result['breach_probability'].items()}
+    record['seed'] = str(result['seed'])
+    record['seconds'] = round(time.perf_counter() - started, 3)
+    record['fan'] = {'steps': result['fan_steps'],
+                     **{f'q{q * 100:g}': row for q, row in zip(result['fan_quantiles'], result['fan'])}}
+    print(json.dumps(_json_ready(record)))
+    
+    if args.chart:
+        plt.switch_backend('Agg')
+        fig, _ = analyzer._build_main_figure()
+        fig.savefig(args.chart, dpi=REPORT_DPI, facecolor=fig.get_facecolor())
+        plt.close(fig)
+        print(f"SAVED CHART TO '{args.chart}'", file=sys.stderr)
+    return 0
+
+def _cli_archive(args):
+    """Archive the ticks currently in each file, compact and apply retention, then list the segments"""
+    failed = 0
+    for path in args.files:
+        analyzer = ProfessionalPHXAnalyzer(path)
+        archive = analyzer.archive
+        archive.retention_days = args.retention_days
+        with redirect_stdout(sys.stderr):
+            if not analyzer.load_data(verbose=False):
+                failed += 1
+        compacted, deleted = archive.compact()
+        print(f"COMPACTED {compacted} DAYS, DELETED {deleted} SEGMENTS", file=sys.stderr)
+        segments = archive.segments()
+        rows = 0
+        print(f"{archive.directory}:")
+        for start_ns, end_ns, segment in segments:
+            count = os.path.getsize(segment) // archive.RECORD.itemsize
+            rows += count
+            print(f"  {os.path.basename(segment):<28} {count:>10} ROWS")
+        print(f"  {len(segments)} SEGMENTS, {rows} ROWS")
+    return 1 if failed else 0
 
-def main():
+def _cli_serve(args):
+    analyzer = ProfessionalPHXAnalyzer(args.files[0] if len(args.files) == 1 else args.files)
+    with redirect_stdout(sys.stderr):
+        if not analyzer.load_data(verbose=False) or len(analyzer.store) == 0:
+            print("ERROR: NO DATA LOADED")
+            return 1
+        if args.history:
+            analyzer.load_history(verbose=False)
+    # Indicators and risk analytics are computed up front rather than by the first client
+    analyzer._sync_indicators()
+    analyzer._sync_risk()
+    server = PriceServer(analyzer, args.host, args.port, poll_interval=args.interval)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def _add_history_arguments(parser):
+    parser.add_argument('--history', action='store_true',
+                        help="use the archived history (see the archive command), not just the ticks in the file")
+
+def _cli_watch(args):
+    """Emit a stats record for every file each time it changes, until interrupted"""
+    sources = _cli_analyzers(args.files, args.merge)
+    watchers = [[FileWatcher(path) for path in (analyzer.data_files if analyzer else [label])]
+                for label, analyzer in sources]
+    _write_records([analyzer.statistics_record(label) for label, analyzer in sources if analyzer],
+                   args.format)
+    try:
+        while True:
+            time.sleep(args.interval)
+            records = []
+            for index, ((label, analyzer), file_watchers) in enumerate(zip(sources, watchers)):
+                if not [watcher for watcher in file_watchers if watcher.changed()]:
+                    continue
+                if analyzer is None:
+                    analyzer = _load_quietly(args.files if args.merge and len(args.files) > 1 else label)
+                    sources[index] = (label, analyzer)
+                    if analyzer is None:
+                        continue
+                else:
+                    with redirect_stdout(sys.stderr):
+                        if not analyzer.load_data(verbose=False):
+                            continue
+                records.append(analyzer.statistics_record(label))
+            _write_records(records, args.format, header=False)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        for file_watchers in watchers:
+            for watcher in file_watchers:
+                watcher.close()
+
+def _build_cli_parser():
+    parser = argparse.ArgumentParser(
+        prog='phx_price_terminal.py',
+        description="PHX/USD price analysis for scripts and monitoring. "
+                    "Run without a command for the interactive terminal.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    stats = commands.add_parser('stats', help="print statistics for each file")
+    stats.add_argument('files', nargs='+')
+    stats.add_argument('--format', choices=('json', 'csv'), default='json',
+                       help="one JSON object per line, or CSV with a header (default json)")
+    stats.add_argument('--merge', action='store_true', help="merge all files into one series")
+    stats.add_argument('--start', help="first timestamp to include (ISO 8601)")
+    stats.add_argument('--end', help="last timestamp to include (ISO 8601)")
+    _add_history_arguments(stats)
+    
+    export = commands.add_parser('export', help="print the (merged) price series")
+    export.add_argument('files', nargs='+')
+    export.add_argument('--format', choices=('csv', 'json'), default='csv',
+                        help="CSV with a header, or one JSON object per line (default csv)")
+    export.add_argument('--start', help="first timestamp to include (ISO 8601)")
+    export.add_argument('--end', help="last timestamp to include (ISO 8601)")
+    export.add_argument('--interval', choices=tuple(RESAMPLE_INTERVALS),
+                        help="print OHLCV bars of this interval instead of ticks")
+    _add_history_arguments(export)
+    
+    render = commands.add_parser('render', help="render dashboard images for each file without a display")
+    render.add_argument('files', nargs='+')
+    render.add_argument('--output', default='reports', help="output directory (default reports)")
+    render.add_argument('--format', dest='formats', action='append', choices=('png', 'svg', 'pdf'),
+                        help="image format, repeatable (default png)")
+    render.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    render.add_argument('--start', help="first archived timestamp to chart with --history (ISO 8601)")
+    render.add_argument('--end', help="last archived timestamp to chart with --history (ISO 8601)")
+    _add_history_arguments(render)
+    
+    watch = commands.add_parser('watch', help="print statistics whenever a file changes")
+    watch.add_argument('files', nargs='+')
+    watch.add_argument('--format', choices=('json', 'csv'), default='json')
+    watch.add_argument('--merge', action='store_true', help="merge all files into one series")
+    watch.add_argument('--interval', type=float, default=0.5, help="seconds between checks (default 0.5)")
+    
+    simulate = commands.add_parser('simulate', help="Monte Carlo paths of the price around the peg")
+    simulate.add_argument('files', nargs='+', help="price files; several are merged into one series")
+    simulate.add_argument('--paths', type=int, default=SIMULATION_PATHS, help=f"paths (default {SIMULATION_PATHS})")
+    simulate.add_argument('--horizon', type=int, default=SIMULATION_HORIZON,
+                          help=f"ticks to simulate (default {SIMULATION_HORIZON})")
+    simulate.add_argument('--seed', type=int, help="seed for a reproducible run (default: fresh, and reported)")
+    simulate.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    simulate.add_argument('--chart', help="also save the main chart with the fan overlaid to this image")
+    simulate.add_argument('--start', help="first archived timestamp to calibrate on with --history (ISO 8601)")
+    simulate.add_argument('--end', help="last archived timestamp to calibrate on with --history (ISO 8601)")
+    _add_history_arguments(simulate)
+    
+    serve = commands.add_parser('serve', help="serve statistics, series and live deltas over local HTTP/WebSocket")
+    serve.add_argument('files', nargs='+', help="price files; several are merged into one series")
+    serve.add_argument('--host', default=SERVER_HOST, help=f"address to bind (default {SERVER_HOST})")
+    serve.add_argument('--port', type=int, default=SERVER_PORT, help=f"port to bind (default {SERVER_PORT})")
+    serve.add_argument('--interval', type=float, default=0.5, help="seconds between file checks (default 0.5)")
+    _add_history_arguments(serve)
+    
+    archive = commands.add_parser('archive', help="archive each file's ticks, compact, and list the history segments")
+    archive.add_argument('files', nargs='+')
+    archive.add_argument('--retention-days', type=int, default=ARCHIVE_RETENTION_DAYS,
+                         help=f"days of history to keep, 0 for all (default {ARCHIVE_RETENTION_DAYS})")
+    return parser
+
+CLI_COMMANDS = {
+    'stats': _cli_stats,
+    'export': _cli_export,
+    'render': _cli_render,
+    'watch': _cli_watch,
+    'archive': _cli_archive,
+    'serve': _cli_serve,
+    'simulate': _cli_simulate,
+}
+
+def main(argv=None):
     """Main function"""
-    analyzer = ProfessionalPHXAnalyzer()
-    analyzer.run_terminal()
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in CLI_COMMANDS:
+        args = _build_cli_parser().parse_args(argv)
+        try:
+            return CLI_COMMANDS[args.command](args)
+        except BrokenPipeError:
+            # Reader went away (e.g. piped into head); silence the flush at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+    
+    parser = argparse.ArgumentParser(
+        description="PHX/USD professional trading terminal. "
+                    f"Scripting commands: {', '.join(CLI_COMMANDS)} (see '<command> --help').")
+    parser.add_argument('files', nargs='*', default=["phx_price.json"],
+                        help="price files; several are merged into one series")
+    parser.add_argument('--instrument', action='store_true',
+                        help=f"time load, statistics, smoothing, chart and zoom stages (or set {INSTRUMENT_ENV}=1)")
+    parser.add_argument('--start', help="first archived timestamp to analyze with --history (ISO 8601)")
+    parser.add_argument('--end', help="last archived timestamp to analyze with --history (ISO 8601)")
+    _add_history_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.instrument:
+        INSTRUMENTATION.enabled = True
+    
+    analyzer = ProfessionalPHXAnalyzer(args.files[0] if len(args.files) == 1 else args.files)
+    analyzer.run_terminal(history=(args.start, args.end) if args.history else None)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,12 @@
+# tests/conftest.py
+# Test Setup - make phx_price_terminal importable and keep charts off-screen
+
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
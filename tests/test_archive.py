@@ -0,0 +1,182 @@
+# tests/test_archive.py
+# Price Archive Tests - append, compaction and reload must round-trip the in-memory store
+
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import phx_price_terminal as terminal
+from conftest import ROOT
+
+START = datetime(2025, 11, 17, 21, 30, 0)
+
+def _columns(count, seed=0, start=START, step_seconds=97):
+    """Store columns of ``count`` ticks spanning several hours and days, some sharing a second"""
+    rng = np.random.default_rng(seed)
+    seconds = np.cumsum(rng.integers(0, 2, count)) * step_seconds
+    start_ns = terminal._to_epoch_ns(np.datetime64(start))
+    return {
+        'price': np.round(100 + np.cumsum(rng.normal(0, 0.05, count)), 2),
+        'timestamp_ns': start_ns + seconds * 1_000_000_000,
+        'volume24h': 1_000_000 + np.cumsum(rng.integers(0, 500, count)).astype(np.float64),
+        'total_transactions': 21 + np.arange(count),
+        'concentration_risk': rng.uniform(0, 100, count).round(1),
+        'velocity_risk': rng.uniform(0, 100, count).round(1),
+        'large_transfer_risk': rng.uniform(0, 100, count).round(1),
+    }
+
+def _slice(columns, start, stop):
+    return {name: column[start:stop] for name, column in columns.items()}
+
+def _store(columns):
+    store = terminal.PriceSeriesStore()
+    store.extend(columns)
+    return store
+
+def _assert_same(actual, expected):
+    for name in terminal.PriceSeriesStore.COLUMNS:
+        np.testing.assert_array_equal(actual[name], expected[name], err_msg=name)
+
+def test_overlapping_windows_archive_each_tick_once(tmp_path):
+    columns = _columns(3000)
+    archive = terminal.PriceArchive(str(tmp_path / 'archive'))
+    # The JS writers keep a sliding window of the last 100 ticks, so every load overlaps the previous one
+    for stop in range(100, 3001, 37):
+        archive.append(_slice(columns, max(stop - 100, 0), stop))
+    archive.append(columns)
+    if archive._compactor is not None:
+        archive._compactor.join()
+    
+    assert len(archive) == 3000
+    _assert_same(archive.query(), _store(columns).columns())
+
+def test_compaction_and_reload_round_trip(tmp_path):
+    columns = _columns(3000, seed=1)
+    directory = str(tmp_path / 'archive')
+    archive = terminal.PriceArchive(directory)
+    for start in range(0, 3000, 250):
+        archive.append(_slice(columns, start, start + 250))
+    if archive._compactor is not None:
+        archive._compactor.join()
+    archive.compact()
+    
+    kinds = [os.path.basename(path).split('-')[0] for _, _, path in archive.segments()]
+    days = np.unique(columns['timestamp_ns'] // terminal.DAY_NS)
+    assert kinds.count('day') == len(days) - 1
+    assert not any(name.startswith('hour-') and int(np.datetime64(name[5:18], 'ns').view(np.int64)) <
+                   days[-1] * terminal.DAY_NS for name in os.listdir(directory) if name.endswith('.seg'))
+    
+    reloaded = terminal.PriceArchive(directory)
+    expected = _store(columns).columns()
+    _assert_same(reloaded.query(), expected)
+    
+    # Inclusive range reads only see rows inside the window
+    first, last = columns['timestamp_ns'][[500, 2200]]
+    window = reloaded.query(np.datetime64(int(first), 'ns'), np.datetime64(int(last), 'ns'))
+    inside = (expected['timestamp_ns'] >= first) & (expected['timestamp_ns'] <= last)
+    _assert_same(window, {name: column[inside] for name, column in expected.items()})
+
+def test_torn_trailing_record_is_ignored_then_truncated(tmp_path):
+    columns = _columns(50, seed=2, step_seconds=1)
+    archive = terminal.PriceArchive(str(tmp_path / 'archive'))
+    archive.append(_slice(columns, 0, 30))
+    _, _, path = archive.segments()[-1]
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * (terminal.PriceArchive.RECORD.itemsize // 2))
+    
+    _assert_same(archive.query(), _slice(columns, 0, 30))
+    archive.append(columns)
+    assert os.path.getsize(path) % terminal.PriceArchive.RECORD.itemsize == 0
+    _assert_same(archive.query(), columns)
+
+def test_retention_deletes_expired_days(tmp_path):
+    columns = _columns(2000, seed=3, step_seconds=600)
+    archive = terminal.PriceArchive(str(tmp_path / 'archive'), retention_days=2)
+    archive.append(columns)
+    if archive._compactor is not None:
+        archive._compactor.join()
+    archive.compact()
+    
+    latest_day = columns['timestamp_ns'][-1] // terminal.DAY_NS * terminal.DAY_NS
+    kept = columns['timestamp_ns'] >= latest_day - 2 * terminal.DAY_NS
+    assert 0 < kept.sum() < len(kept)
+    _assert_same(archive.query(), _slice(columns, np.flatnonzero(kept)[0], None))
+
+def _write_price_file(path, columns, start, stop):
+    entries = []
+    for i in range(start, stop):
+        moment = datetime(1970, 1, 1) + timedelta(microseconds=int(columns['timestamp_ns'][i]) // 1000)
+        entries.append({
+            'price': float(columns['price'][i]),
+            'timestamp': moment.strftime('%m/%d/%Y, %I:%M:%S %p').lstrip('0').replace('/0', '/'),
+            'volume24h': float(columns['volume24h'][i]),
+            'totalTransactions': int(columns['total_transactions'][i]),
+            'marketConditions': {'concentrationRisk': f"{columns['concentration_risk'][i]:.1f}",
+                                 'velocityRisk': f"{columns['velocity_risk'][i]:.1f}",
+                                 'largeTransferRisk': f"{columns['large_transfer_risk'][i]:.1f}"},
+        })
+    with open(path, 'w') as f:
+        json.dump({'priceHistory': entries, 'system': 'PHX Central Bank'}, f, indent=2)
+
+def test_analyzer_history_matches_every_loaded_tick(tmp_path):
+    columns = _columns(600, seed=4)
+    path = str(tmp_path / 'phx_price.json')
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    for number, stop in enumerate(range(100, 601, 50)):
+        _write_price_file(path, columns, stop - 100, stop)
+        os.utime(path, ns=(number * 10**9, number * 10**9))
+        assert analyzer.load_data(verbose=False)
+    
+    assert analyzer.load_history(verbose=False)
+    _assert_same(analyzer.store.columns(), columns)
+
+@pytest.mark.filterwarnings('ignore:This figure includes Axes')
+def test_live_mode_over_history_keeps_the_file_cache(tmp_path):
+    columns = _columns(600, seed=5)
+    path = str(tmp_path / 'phx_price.json')
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    for number, stop in enumerate(range(100, 601, 100)):
+        _write_price_file(path, columns, stop - 100, stop)
+        os.utime(path, ns=(number * 10**9, number * 10**9))
+        assert analyzer.load_data(verbose=False)
+    assert analyzer.load_history(verbose=False)
+    # Agg has no event loop, so plt.show() returns at once and the chart closes
+    analyzer.run_live()
+    
+    cold = terminal.ProfessionalPHXAnalyzer(path)
+    assert cold.load_data(verbose=False)
+    _assert_same(cold.store.columns(), _slice(columns, 500, 600))
+
+def test_archive_pickles_without_its_lock(tmp_path):
+    columns = _columns(500, seed=4)
+    archive = terminal.PriceArchive(str(tmp_path / 'archive'))
+    archive.append(_slice(columns, 0, 250))
+    copy = pickle.loads(pickle.dumps(archive))
+    if archive._compactor is not None:
+        archive._compactor.join()
+    
+    # The copy gets a lock of its own and keeps appending to the same directory
+    assert copy._lock is not archive._lock and copy._compactor is None
+    copy.append(columns)
+    if copy._compactor is not None:
+        copy._compactor.join()
+    _assert_same(archive.query(), _store(columns).columns())
+
+def test_reports_render_in_spawned_workers(tmp_path):
+    path = str(tmp_path / 'phx_price.json')
+    shutil.copy(os.path.join(ROOT, 'phx_price.json'), path)
+    # The default on Windows and macOS: workers receive the analyzers pickled
+    method = multiprocessing.get_start_method()
+    multiprocessing.set_start_method('spawn', force=True)
+    try:
+        written = terminal.render_reports([path], output_dir=str(tmp_path / 'reports'),
+                                          figures=('main', 'distribution'), workers=2)
+    finally:
+        multiprocessing.set_start_method(method, force=True)
+    assert len(written) == 2 and all(os.path.getsize(path) > 0 for path in written)
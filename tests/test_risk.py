@@ -0,0 +1,43 @@
+# tests/test_risk.py
+# Risk Analytics Tests - batched rolling windows agree with one pass over the whole history
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import phx_price_terminal as terminal
+
+def _columns(count):
+    rng = np.random.default_rng(11)
+    columns = {'price': terminal.PEG_PRICE + np.cumsum(rng.normal(0, 0.05, count))}
+    for factor in terminal.RISK_FACTORS:
+        columns[factor] = rng.random(count)
+    return columns
+
+def _extend_in_batches(columns, sizes):
+    risk = terminal.RiskAnalytics()
+    start = 0
+    for size in sizes:
+        risk.extend({name: values[start:start + size] for name, values in columns.items()})
+        start += size
+    return risk
+
+@pytest.mark.parametrize('count', [1, 10, 26, 30, 48, 49, 50, 51, 100])
+def test_histories_around_the_window_size(count):
+    risk = _extend_in_batches(_columns(count), [count])
+    assert risk.count == count and len(risk.column('deviation')) == count
+    assert risk.summary()['window'] == terminal.RISK_WINDOW
+
+@pytest.mark.parametrize('sizes', [[30, 30, 40], [1] * 60, [10, 20, 5, 40, 25], [49, 1, 50]])
+def test_batches_smaller_than_the_window(sizes):
+    columns = _columns(sum(sizes))
+    whole = _extend_in_batches(columns, [sum(sizes)])
+    batched = _extend_in_batches(columns, sizes)
+    for name in terminal._RiskColumns.COLUMNS:
+        np.testing.assert_allclose(batched.column(name), whole.column(name), rtol=1e-7, atol=1e-9)
+    
+    # Rolling correlations match pandas over the same history
+    deviation = pd.Series(columns['price'] - terminal.PEG_PRICE)
+    for factor in terminal.RISK_FACTORS:
+        expected = deviation.rolling(terminal.RISK_WINDOW).corr(pd.Series(columns[factor])).to_numpy()
+        np.testing.assert_allclose(batched.column(f'corr_{factor}'), expected, rtol=1e-7, atol=1e-9)
@@ -0,0 +1,151 @@
+# tests/test_server.py
+# Service Mode Tests - HTTP responses, WebSocket framing and live deltas of PriceServer
+
+import asyncio
+import json
+import os
+import shutil
+import struct
+
+import pytest
+
+import phx_price_terminal as terminal
+from conftest import ROOT
+
+# The example handshake of RFC 6455, section 1.3
+WEBSOCKET_KEY = 'dGhlIHNhbXBsZSBub25jZQ=='
+WEBSOCKET_ACCEPT = 's3pPLMBiTxaQ9kYGzzhZRbK+xOo='
+
+def _masked_frame(payload, opcode=0x1, mask=b'\x37\xfa\x21\x3d'):
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, 0x80 | length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, length)
+    return header + mask + bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+async def _read_frame(reader):
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack('!Q', await reader.readexactly(8))
+    return first & 0x0F, await reader.readexactly(length)
+
+def _feed(data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+@pytest.mark.parametrize('length', [0, 1, 125, 126, 127, 65535, 65536, 70000])
+def test_server_frames_round_trip(length):
+    payload = bytes(range(256)) * (length // 256) + bytes(length % 256)
+    
+    async def run():
+        return await _read_frame(_feed(terminal._websocket_frame(payload, opcode=0x2)))
+    assert asyncio.run(run()) == (0x2, payload)
+
+@pytest.mark.parametrize('length', [0, 5, 125, 126, 1000])
+def test_masked_client_frames_are_unmasked(length):
+    payload = os.urandom(length)
+    
+    async def run():
+        return await terminal._read_websocket_frame(_feed(_masked_frame(payload, opcode=0x9)))
+    assert asyncio.run(run()) == (0x9, payload)
+
+def test_unmasked_or_oversized_client_frames_are_rejected():
+    async def run(data):
+        return await terminal._read_websocket_frame(_feed(data))
+    with pytest.raises(ValueError):
+        asyncio.run(run(terminal._websocket_frame(b'hello')))
+    with pytest.raises(ValueError):
+        asyncio.run(run(_masked_frame(bytes(terminal.SERVER_MAX_REQUEST + 1))))
+
+@pytest.fixture
+def analyzer(tmp_path):
+    path = str(tmp_path / 'phx_price.json')
+    shutil.copy(os.path.join(ROOT, 'phx_price.json'), path)
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    assert analyzer.load_data(verbose=False)
+    return analyzer
+
+async def _request(reader, writer, target, method='GET'):
+    writer.write(f'{method} {target} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    headers = dict(line.lower().split(': ', 1) for line in head[1:] if line)
+    body = await reader.readexactly(int(headers['content-length']))
+    return int(head[0].split()[1]), json.loads(body)
+
+def _serve(analyzer, client):
+    """Run ``client(port)`` against a PriceServer on a free port"""
+    async def run():
+        server = terminal.PriceServer(analyzer, port=0, poll_interval=0.02)
+        ready = asyncio.get_running_loop().create_future()
+        serving = asyncio.ensure_future(server.serve(ready))
+        try:
+            return server, await asyncio.wait_for(client(server, await ready), 30)
+        finally:
+            serving.cancel()
+            await asyncio.gather(serving, return_exceptions=True)
+    return asyncio.run(run())
+
+def test_http_endpoints_and_cache(analyzer):
+    async def client(server, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        # One keep-alive connection carries every request
+        responses = [await _request(reader, writer, target) for target in (
+            '/summary', '/summary', '/series?indicator=ma20&points=10', '/bars?interval=1m',
+            '/series?indicator=nope', '/series?points=x', '/missing', '/status')]
+        responses.append(await _request(reader, writer, '/summary', method='POST'))
+        writer.close()
+        return responses
+    server, responses = _serve(analyzer, client)
+    
+    (status, summary), (_, again), (_, series), (_, bars) = responses[:4]
+    assert status == 200 and summary == again
+    assert summary['current_price'] == pytest.approx(analyzer.price_history[-1])
+    assert series['indicator'] == 'ma20' and len(series['value']) <= 10
+    assert bars['interval'] == '1m' and len(bars['timestamp']) == len(bars['close'])
+    assert [status for status, _ in responses[4:7]] == [404, 400, 404]
+    assert responses[7][1]['cache_hits'] == 1
+    assert responses[8][0] == 405
+
+def test_websocket_snapshot_then_delta_on_rewrite(analyzer):
+    path = analyzer.data_file
+    
+    async def client(server, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(('GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Key: {WEBSOCKET_KEY}\r\nSec-WebSocket-Version: 13\r\n\r\n').encode())
+        head = (await reader.readuntil(b'\r\n\r\n')).decode()
+        snapshot = json.loads((await _read_frame(reader))[1])
+        
+        with open(path) as f:
+            document = json.load(f)
+        tick = dict(document['priceHistory'][-1], price=123.45, totalTransactions=10**6)
+        document['priceHistory'] = document['priceHistory'][1:] + [tick]
+        with open(path + '.tmp', 'w') as f:
+            json.dump(document, f, indent=2)
+        os.replace(path + '.tmp', path)
+        delta = json.loads((await _read_frame(reader))[1])
+        
+        writer.write(_masked_frame(b'still there?', opcode=0x9))
+        pong = await _read_frame(reader)
+        writer.write(_masked_frame(struct.pack('!H', 1000), opcode=0x8))
+        closing = await _read_frame(reader)
+        writer.close()
+        return head, snapshot, delta, pong, closing
+    server, (head, snapshot, delta, pong, closing) = _serve(analyzer, client)
+    
+    assert head.startswith('HTTP/1.1 101') and f'Sec-WebSocket-Accept: {WEBSOCKET_ACCEPT}' in head
+    assert snapshot['type'] == 'snapshot'
+    assert delta['type'] == 'delta' and not delta['reset']
+    assert delta['ticks']['price'] == [123.45]
+    assert delta['summary']['current_price'] == 123.45
+    assert pong == (0xA, b'still there?')
+    assert closing == (0x8, struct.pack('!H', 1000))
@@ -0,0 +1,100 @@
+# tests/test_sidecar.py
+# Binary Sidecar Tests - refreshes append new rows, rebuilt stores get a new generation
+
+import json
+import os
+
+import numpy as np
+
+import phx_price_terminal as terminal
+
+def _document(count, first=0):
+    entries = [{'price': 100 + i % 97 / 100, 'timestamp': f'11/17/2025, 1:{i // 60 % 60:02d}:{i % 60:02d} PM',
+                'volume24h': 1_000_000 + i, 'totalTransactions': 21 + i,
+                'marketConditions': {'concentrationRisk': '10.0', 'velocityRisk': '20.0',
+                                     'largeTransferRisk': '30.0'}}
+               for i in range(first, first + count)]
+    return json.dumps({'priceHistory': entries, 'system': 'PHX Central Bank'}, indent=2)
+
+def _write(path, text, version):
+    with open(path, 'w') as f:
+        f.write(text)
+    os.utime(path, ns=(version * 10**9, version * 10**9))
+
+def _meta(analyzer):
+    with open(os.path.join(analyzer.cache_dir, 'meta.json')) as f:
+        return json.load(f)
+
+def _assert_cold_start_matches(path, analyzer):
+    cold = terminal.ProfessionalPHXAnalyzer(path)
+    assert cold.load_data(verbose=False)
+    for name, column in analyzer.store.columns().items():
+        np.testing.assert_array_equal(cold.store.column(name), column, err_msg=name)
+
+def test_refreshes_append_to_the_current_generation(tmp_path):
+    path = str(tmp_path / 'phx_price.json')
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    # The JS writers keep a sliding window of 100 ticks; every refresh adds 10
+    for version, first in enumerate(range(0, 200, 10), start=1):
+        _write(path, _document(100, first), version)
+        assert analyzer.load_data(verbose=False)
+    
+    meta = _meta(analyzer)
+    assert meta['generation'] == 0 and meta['rows'] == len(analyzer.store) == 290
+    for name, dtype in terminal.PriceSeriesStore.COLUMNS.items():
+        size = os.path.getsize(os.path.join(analyzer.cache_dir, f"{name}-0.bin"))
+        assert size == 290 * np.dtype(dtype).itemsize
+    _assert_cold_start_matches(path, analyzer)
+
+def test_cold_start_keeps_appending_after_loading_the_sidecar(tmp_path):
+    path = str(tmp_path / 'phx_price.json')
+    _write(path, _document(100), 1)
+    assert terminal.ProfessionalPHXAnalyzer(path).load_data(verbose=False)
+    
+    _write(path, _document(100, 30), 2)
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    assert analyzer.load_data(verbose=False)
+    assert _meta(analyzer)['generation'] == 0 and len(analyzer.store) == 130
+    _assert_cold_start_matches(path, analyzer)
+
+def test_rebuilt_store_is_written_under_a_new_generation(tmp_path):
+    path = str(tmp_path / 'phx_price.json')
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    _write(path, _document(100), 1)
+    assert analyzer.load_data(verbose=False)
+    # No overlap with the previous window, so the store starts over
+    _write(path, _document(100, 1000), 2)
+    assert analyzer.load_data(verbose=False)
+    
+    assert _meta(analyzer)['generation'] == 1 and len(analyzer.store) == 100
+    assert sorted(os.listdir(analyzer.cache_dir)) == sorted(
+        ['meta.json'] + [f"{name}-1.bin" for name in terminal.PriceSeriesStore.COLUMNS])
+    _assert_cold_start_matches(path, analyzer)
+
+def test_append_that_missed_the_metadata_is_overwritten(tmp_path):
+    path = str(tmp_path / 'phx_price.json')
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    _write(path, _document(100), 1)
+    assert analyzer.load_data(verbose=False)
+    # A crash after appending to the columns but before swapping meta.json
+    for name in terminal.PriceSeriesStore.COLUMNS:
+        with open(os.path.join(analyzer.cache_dir, f"{name}-0.bin"), 'ab') as f:
+            f.write(b'\xff' * 13)
+    _assert_cold_start_matches(path, analyzer)
+    
+    _write(path, _document(100, 20), 2)
+    assert analyzer.load_data(verbose=False)
+    assert _meta(analyzer)['generation'] == 0
+    _assert_cold_start_matches(path, analyzer)
+
+def test_sidecar_rewritten_by_another_analyzer_is_not_appended_to(tmp_path):
+    path = str(tmp_path / 'phx_price.json')
+    _write(path, _document(100), 1)
+    first, second = terminal.ProfessionalPHXAnalyzer(path), terminal.ProfessionalPHXAnalyzer(path)
+    assert first.load_data(verbose=False)
+    assert second.load_data(verbose=False, full_reload=True)
+    
+    _write(path, _document(100, 10), 2)
+    assert first.load_data(verbose=False)
+    assert _meta(first)['generation'] == 2
+    _assert_cold_start_matches(path, first)
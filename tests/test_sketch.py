@@ -0,0 +1,116 @@
+# tests/test_sketch.py
+# Quantile Sketch Tests - DDSketch answers stay within their relative accuracy, histograms match NumPy
+
+import numpy as np
+import pytest
+
+import phx_price_terminal as terminal
+
+QUANTILES = np.array([0, 0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999, 1])
+
+def _exact(values, qs):
+    """The value at rank q * (n - 1) rounded down, which the sketch approximates"""
+    ordered = np.sort(values)
+    return ordered[np.floor(qs * (len(values) - 1)).astype(np.int64)]
+
+def _samples(kind, count=200_000):
+    rng = np.random.default_rng(7)
+    if kind == 'prices':
+        return 100 + np.cumsum(rng.normal(0, 0.05, count))
+    if kind == 'lognormal':
+        return rng.lognormal(0, 0.7, count)
+    if kind == 'wide':
+        # Thirteen orders of magnitude, far more than SKETCH_MAX_BINS bins can cover
+        return rng.lognormal(0, 3, count)
+    # Returns in %: both signs, magnitudes kept clear of the shared near-zero bin
+    magnitudes = rng.lognormal(-2, 0.7, count) + 1e-6
+    return np.where(rng.random(count) < 0.5, -magnitudes, magnitudes)
+
+@pytest.mark.parametrize('kind', ['prices', 'lognormal', 'returns'])
+def test_quantiles_within_relative_accuracy(kind):
+    values = _samples(kind)
+    sketch = terminal.QuantileSketch()
+    for batch in np.array_split(values, 37):
+        sketch.extend(batch)
+    exact = _exact(values, QUANTILES)
+    error = np.abs(sketch.quantiles(QUANTILES) - exact) / np.abs(exact)
+    assert error.max() <= terminal.SKETCH_ACCURACY * (1 + 1e-9)
+
+def test_merge_equals_one_sketch():
+    values = _samples('returns')
+    whole = terminal.QuantileSketch()
+    whole.extend(values)
+    parts = [terminal.QuantileSketch() for _ in range(4)]
+    for sketch, batch in zip(parts, np.array_split(values, 4)):
+        sketch.extend(batch)
+    merged = parts[0]
+    for sketch in parts[1:]:
+        merged.merge(sketch)
+    assert merged.count == whole.count
+    np.testing.assert_array_equal(merged.quantiles(QUANTILES), whole.quantiles(QUANTILES))
+
+def test_collapsing_gives_up_accuracy_only_near_zero():
+    values = _samples('wide')
+    sketch = terminal.QuantileSketch()
+    for batch in np.array_split(values, 37):
+        sketch.extend(batch)
+    assert len(sketch.positive.counts) == terminal.SKETCH_MAX_BINS
+    
+    # Values above the lowest retained bin keep their own bins, so those quantiles stay within the bound
+    floor = sketch.gamma ** sketch.positive.offset
+    exact = _exact(values, QUANTILES)
+    kept = exact > floor
+    assert 0 < kept.sum() < len(kept)
+    error = np.abs(sketch.quantiles(QUANTILES[kept]) - exact[kept]) / exact[kept]
+    assert error.max() <= terminal.SKETCH_ACCURACY * (1 + 1e-9)
+    # Collapsed quantiles are reported no lower than the truth, and no higher than the floor bin
+    collapsed = sketch.quantiles(QUANTILES[~kept])
+    assert np.all(collapsed >= exact[~kept]) and np.all(collapsed <= floor * sketch.gamma)
+
+def test_statistics_percentiles_match_numpy():
+    prices = _samples('prices', 50_000)
+    engine = terminal.IndicatorEngine()
+    engine.extend(prices)
+    stats = engine.statistics()
+    for p in terminal.SUMMARY_PERCENTILES:
+        exact = _exact(prices, np.array([p / 100]))[0]
+        assert abs(stats[f'p{p}'] - exact) <= terminal.SKETCH_ACCURACY * exact
+
+def _pegged(sigma, count=200_000, decimals=None):
+    prices = terminal.PEG_PRICE + np.random.default_rng(3).normal(0, sigma, count)
+    return prices if decimals is None else np.round(prices, decimals)
+
+@pytest.mark.parametrize('sigma', [0.01, 0.05, 0.5, 2])
+def test_histogram_of_cent_prices_matches_numpy(sigma):
+    # The JS writers round prices to cents, so every linear bin holds one distinct price
+    prices = _pegged(sigma, decimals=2)
+    histogram = terminal.PriceHistogram()
+    for batch in np.array_split(prices, 37):
+        histogram.extend(batch)
+    counts, edges = histogram.histogram(bins=20)
+    expected_counts, expected_edges = np.histogram(prices, bins=20)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_allclose(edges, expected_edges)
+    assert len(histogram.counts) <= terminal.HISTOGRAM_MAX_BINS and histogram.width < 0.01
+
+@pytest.mark.parametrize('sigma', [0.05, 0.5, 50])
+def test_histogram_of_continuous_prices_is_close_to_numpy(sigma):
+    prices = _pegged(sigma)
+    histogram = terminal.PriceHistogram()
+    for batch in np.array_split(prices, 37):
+        histogram.extend(batch)
+    counts, _ = histogram.histogram(bins=20)
+    expected, _ = np.histogram(prices, bins=20)
+    assert np.abs(counts - expected).sum() <= 0.01 * len(prices)
+
+def test_engine_histogram_is_the_same_tick_by_tick_or_batched():
+    prices = _pegged(0.05, count=2000, decimals=2)
+    ticks, batched = terminal.IndicatorEngine(), terminal.IndicatorEngine()
+    for price in prices[:300]:
+        ticks.update(price)
+    batched.extend(prices[:300])
+    ticks.extend(prices[300:])
+    batched.extend(prices[300:])
+    for engine in (ticks, batched):
+        np.testing.assert_array_equal(engine.price_histogram.histogram(bins=20)[0],
+                                      np.histogram(prices, bins=20)[0])
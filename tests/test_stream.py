@@ -0,0 +1,44 @@
+# tests/test_stream.py
+# Streaming Parser Tests - iter_price_history must agree with json.load at every chunk boundary
+
+import json
+import os
+
+import pytest
+
+import phx_price_terminal as terminal
+from conftest import ROOT
+
+CHUNK_SIZES = range(1, 257)
+
+def _synthetic_document():
+    """Top-level numbers before and after priceHistory, so some end at a chunk edge"""
+    history = [{'price': 100 + i * 0.37, 'timestamp': f'11/17/2025, 1:{i:02d}:25 PM', 'volume24h': 1030033.5 + i,
+                'totalTransactions': 21 + i, 'marketConditions': {'concentrationRisk': '12.5'},
+                'priceChangeFromLastTx': '-0.25'} for i in range(12)]
+    return {'lastPrice': 104.77, 'lastTransactionPrice': -1.5e-3, 'count': 12345, 'priceHistory': history,
+            'tail': 99.125, 'flag': True, 'empty': None, 'system': 'PHX Central Bank'}
+
+@pytest.fixture(params=['phx_price.json', 'synthetic'])
+def price_file(request, tmp_path):
+    if request.param == 'synthetic':
+        path = tmp_path / 'phx_price.json'
+        path.write_text(json.dumps(_synthetic_document(), indent=2))
+        return str(path)
+    return os.path.join(ROOT, request.param)
+
+def test_every_chunk_size_matches_json_load(price_file):
+    with open(price_file) as f:
+        expected = json.load(f)
+    history = expected.pop('priceHistory')
+    for chunk_size in CHUNK_SIZES:
+        metadata = {}
+        records = list(terminal.iter_price_history(price_file, metadata, chunk_size=chunk_size))
+        assert records == history, f"priceHistory differs at chunk_size={chunk_size}"
+        assert metadata == expected, f"metadata differs at chunk_size={chunk_size}"
+
+def test_truncated_document_raises(tmp_path):
+    path = tmp_path / 'phx_price.json'
+    path.write_text(json.dumps(_synthetic_document(), indent=2)[:-40])
+    with pytest.raises(ValueError):
+        list(terminal.iter_price_history(str(path), chunk_size=7))
@@ -0,0 +1,77 @@
+# tests/test_torn_reads.py
+# Torn Write Tests - refreshes must never load a half-written phx_price.json
+
+import json
+import os
+
+import pytest
+
+import phx_price_terminal as terminal
+
+def _document(count, first=0):
+    entries = [{'price': 100 + i / 100, 'timestamp': f'11/17/2025, 1:{i // 60 % 60:02d}:{i % 60:02d} PM',
+                'volume24h': 1_000_000 + i, 'totalTransactions': 21 + i,
+                'marketConditions': {'concentrationRisk': '10.0', 'velocityRisk': '20.0',
+                                     'largeTransferRisk': '30.0'}}
+               for i in range(first, first + count)]
+    return json.dumps({'priceHistory': entries, 'system': 'PHX Central Bank'}, indent=2)
+
+def _write(path, text, version):
+    with open(path, 'w') as f:
+        f.write(text)
+    # Distinct mtimes, as successive writes by the JS apps would have
+    os.utime(path, ns=(version * 10**9, version * 10**9))
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(terminal, 'READ_BACKOFF', 0)
+
+def test_torn_rewrite_keeps_previous_data_until_complete(tmp_path, capsys):
+    path = str(tmp_path / 'phx_price.json')
+    _write(path, _document(100), 1)
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    assert analyzer.load_data(verbose=False)
+    assert len(analyzer.store) == 100
+    
+    _write(path, _document(110)[:-200], 2)
+    assert analyzer.load_data(verbose=False)
+    assert len(analyzer.store) == 100
+    assert 'KEEPING PREVIOUS DATA' in capsys.readouterr().out
+    
+    _write(path, _document(110), 3)
+    assert analyzer.load_data(verbose=False)
+    assert len(analyzer.store) == 110
+
+def test_rewrite_during_parse_is_retried(tmp_path, monkeypatch):
+    path = str(tmp_path / 'phx_price.json')
+    _write(path, _document(100), 1)
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    parse = analyzer._read_new_entries
+    calls = []
+    
+    def racing_parse(source, anchor):
+        # The writer replaces the file while the first parse is running
+        calls.append(source)
+        result = parse(source, anchor)
+        if len(calls) == 1:
+            _write(path, _document(120), 2)
+        return result
+    
+    monkeypatch.setattr(analyzer, '_read_new_entries', racing_parse)
+    assert analyzer.load_data(verbose=False)
+    assert len(calls) == 2
+    assert len(analyzer.store) == 120
+
+def test_cold_start_on_torn_file_uses_fallback(tmp_path, capsys):
+    path = str(tmp_path / 'phx_price.json')
+    _write(path, _document(100)[:-50], 2)
+    _write(path + '.fallback', _document(80), 1)
+    analyzer = terminal.ProfessionalPHXAnalyzer(path)
+    assert analyzer.load_data(verbose=False)
+    assert len(analyzer.store) == 80
+    assert 'USING FALLBACK SNAPSHOT' in capsys.readouterr().out
+    
+    # The live file is retried on the next refresh once it is complete
+    _write(path, _document(100), 3)
+    assert analyzer.load_data(verbose=False)
+    assert len(analyzer.store) == 100